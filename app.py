@@ -1,17 +1,25 @@
 import streamlit as st
 import pandas as pd
-import asyncio
 import os
 import logging
 import time
 import json
+import functools
 
 # 1. FORCE WIDE LAYOUT - MUST be the very first Streamlit command
 st.set_page_config(layout="wide", page_title="Intelligence Matrix", page_icon="\U0001f578\ufe0f")
 
 # Modular Imports
-from services.search_agent import SearchAgent
-from services.database import save_scavenged_data, fetch_all_buyers, bulk_upsert_buyers, get_supabase
+from services.database import bulk_upsert_buyers, delete_buyers, fetch_aliases, fetch_buyer_summary, fetch_contacts, query_buyers, get_supabase
+from services.editor_diff import diff_frames
+from services.buyer_frame import EDITOR_COLUMNS, FLAG_COLUMNS, build_buyer_frame, editable
+from services.export import EXPORT_FORMATS, export_bytes, export_file_name, export_mime
+from services.dataset import get_dataset
+from services import name_index
+from services.buyer_sync import get_buyer_sync
+from services.jobs import ACTIVE_STATUSES, get_job_runner, submit_scavenge
+from services.enrichment import EnrichmentLedger, describe_summary, select_candidates, submit_enrichment
+from services.scheduler import get_scheduler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,44 +28,57 @@ logging.basicConfig(level=logging.INFO)
 st.title("\U0001f578\ufe0f Intelligence Matrix: Database Edition")
 
 # --- Load Data (Single Source of Truth: Supabase) ---
-@st.cache_data(ttl=300) 
-def get_data_from_db():
-    raw_data = fetch_all_buyers()
-    if not raw_data:
-        return pd.DataFrame()
-    return pd.DataFrame(raw_data)
+# One process-wide versioned dataset shared by every page: served from the
+# local replica on cold start, then only rows changed since the last
+# updated_at watermark are fetched and merged in the background. The typed
+# frame (services/buyer_frame.py) is rebuilt only when a sync changed the data.
+dataset = get_dataset()
+buyers = dataset.frame("table")
+# Query caches below are keyed on the version, so a write invalidates them
+data_version = dataset.version
+
+def typed_page(rows):
+    # Page frames share the full dataset's country options
+    return build_buyer_frame(rows, categories=buyers.options).frame
+
+# Country filter and name search run in Postgres; only the matching page is fetched
+SEARCH_PAGE_SIZE = 500
+
+@st.cache_data(ttl=60)
+def search_buyers(countries, name_query, version):
+    return query_buyers(countries=list(countries), name_pattern=name_query, limit=SEARCH_PAGE_SIZE)
+
+# Normalized contacts (buyer_contacts) for the profile card; None when unavailable
+@st.cache_data(ttl=60)
+def get_contacts(company_name, version):
+    return fetch_contacts([company_name])
+
+# Duplicate names resolved by resolve_entities.py; None when unavailable
+@st.cache_data(ttl=300)
+def get_aliases(version):
+    return fetch_aliases()
 
 # Fetch Data
-df = get_data_from_db()
-
-# Initialize empty DF if needed to prevent errors
-if df.empty:
-    df = pd.DataFrame({
-        "buyer_name": pd.Series(dtype="str"),
-        "destination_country": pd.Series(dtype="str"),
-        "total_usd": pd.Series(dtype="float"),
-        "email": pd.Series(dtype="str"),
-        "phone": pd.Series(dtype="str"),
-        "website": pd.Series(dtype="str"),
-        "address": pd.Series(dtype="str")
-    })
-else:
-    # Force types to prevent st.data_editor crashes (CRITICAL FIX)
-    try:
-        if "total_usd" in df.columns:
-            df["total_usd"] = pd.to_numeric(df["total_usd"], errors="coerce").fillna(0.0)
-        
-        string_cols = ["buyer_name", "destination_country", "email", "phone", "website", "address"]
-        for col in string_cols:
-            if col in df.columns:
-                df[col] = df[col].astype(str).replace("nan", "").replace("None", "")
-    except Exception as e:
-        logging.error(f"Data type enforcement failed: {e}")
+df = buyers.frame
 
 # --- 1. BOSS VIEW METRICS ---
-total_companies = len(df)
-enriched_count = df[df["email"].apply(lambda x: x is not None and str(x).strip().lower() not in ["", "none", "nan"])].shape[0]
-total_value = df["total_usd"].sum() if "total_usd" in df.columns else 0
+# Aggregated server-side (mousa_summary view); falls back to the local frame
+@st.cache_data(ttl=60)
+def get_summary(version):
+    return fetch_buyer_summary()
+
+summary = get_summary(data_version)
+if summary:
+    total_companies = summary["total_companies"]
+    enriched_count = summary["enriched_count"]
+    total_value = summary["total_value"] or 0
+else:
+    total_companies = len(df)
+    local_summary = dataset.view(
+        "summary", lambda b: {"enriched": int(b.frame["has_email"].sum()), "value": b.frame["total_usd"].sum()}
+    )
+    enriched_count = local_summary["enriched"]
+    total_value = local_summary["value"]
 
 m1, m2, m3 = st.columns(3)
 m1.metric("Total Companies", total_companies)
@@ -68,50 +89,343 @@ st.markdown("---")
 
 # --- Sidebar Actions ---
 with st.sidebar:
-    st.header("Actions")
-    
-    # Export Feature
-    json_str = df.to_json(orient="records", indent=2)
-    st.download_button(
-        label="\U0001f4e5 Download Database as JSON",
-        data=json_str,
-        file_name="mousa_export.json",
-        mime="application/json"
-    )
-    
-    st.divider()
-    
     st.header("Filters")
     country_col = "destination_country"
     
-    if country_col in df.columns:
-        all_countries = sorted(df[country_col].dropna().unique().tolist())
-        selected_countries = st.multiselect("Select Country", options=all_countries)
-    else:
-        selected_countries = []
+    selected_countries = st.multiselect("Select Country", options=buyers.options.get(country_col, []))
         
     st.info(f"Loaded {len(df)} records from Database.")
-
-# --- Apply Filter ---
-if selected_countries and country_col in df.columns:
-    dff = df[df[country_col].isin(selected_countries)].copy()
-else:
-    dff = df.copy()
+    st.caption(buyers.describe())
+    synced_at = get_buyer_sync().freshness()
+    if synced_at:
+        st.caption(f"Data as of {synced_at:%Y-%m-%d %H:%M:%S} (version {data_version})")
 
 # --- Search Bar ---
 col_search, _ = st.columns([1, 2])
 with col_search:
-    search_query = st.text_input("Search Company Name", placeholder="Type to filter table...")
-    if search_query:
-         dff = dff[dff["buyer_name"].str.contains(search_query, case=False, na=False)]
+    search_query = st.text_input(
+        "Search Company Name", placeholder="Type to filter table...", help="Typo-tolerant; best matches first"
+    )
+
+# --- Table Mode ---
+# Paginated: only the visible page is fetched and serialized, sorting and
+# filtering run in Postgres. Full: the whole filtered frame (legacy).
+PAGE_SIZE_OPTIONS = [50, 100, 250, 500]
+SORT_COLUMNS = {
+    "Company": "buyer_name",
+    "Volume (USD)": "total_usd",
+    "Country": "destination_country",
+}
+
+with st.sidebar:
+    st.divider()
+    st.header("Table")
+    paginated = st.toggle("Paginated table", value=True, help="Load and render one page at a time")
+    if paginated:
+        page_size = st.selectbox("Rows per page", PAGE_SIZE_OPTIONS, index=1)
+        sort_label = st.selectbox("Sort by", list(SORT_COLUMNS))
+        sort_column = SORT_COLUMNS[sort_label]
+        sort_desc = st.toggle("Descending", value=False)
+
+@st.cache_data(ttl=60)
+def fetch_page(countries, name_query, order_by, descending, page, page_size, with_count, version):
+    return query_buyers(
+        countries=list(countries),
+        name_pattern=name_query,
+        limit=page_size,
+        offset=page * page_size,
+        order_by=order_by,
+        descending=descending,
+        count="exact" if with_count else None,
+    )
+
+def key_positions(frame):
+    # Row position of each buyer_name in the snapshot
+    positions = pd.Series(range(len(frame)), index=frame["buyer_name"])
+    return positions[~positions.index.duplicated(keep="last")]
+
+def name_matches(name_query, limit=None):
+    # Ranked fuzzy matches over buyer_name and company_name_english from the
+    # in-memory trigram index, patched once per dataset version (None: all)
+    index = dataset.view("name_index", lambda b: name_index.refresh(b.frame))
+    positions = dataset.view("key_positions", lambda b: key_positions(b.frame))
+    hits = positions.reindex([key for key, _ in index.search(name_query, limit=limit)]).dropna()
+    return df.iloc[hits.astype(int).to_numpy()]
+
+def filter_frame(countries, name_query, limit=None):
+    # Country filter and (ranked, typo-tolerant) name search on the shared
+    # snapshot; `limit` caps name matches, None keeps every one (export, enrich)
+    frame = df
+    if name_query:
+        frame = name_matches(name_query, limit and limit * (4 if countries else 1))
+    if countries:
+        frame = frame[frame[country_col].isin(countries)]
+    return frame.iloc[:limit] if name_query and limit else frame
 
-st.markdown(f"**Showing {len(dff)} companies**")
+def filter_locally(limit=None):
+    # Name searches, and everything while the database is unavailable
+    return filter_frame(selected_countries, search_query, limit).copy()
+
+def step_page(delta, last_page):
+    st.session_state["page_number"] = min(max(1, st.session_state.get("page_number", 1) + delta), last_page)
+
+# --- Export (current filter) ---
+# Serialized in chunks only when Download is clicked, on Streamlit's download
+# thread; reruns never touch it.
+with st.sidebar:
+    st.divider()
+    st.header("Export")
+    export_format = st.selectbox(
+        "Format", list(EXPORT_FORMATS), format_func=lambda f: EXPORT_FORMATS[f]["label"]
+    )
+    export_gzip = st.toggle("Gzip", value=False)
+    export_filtered = bool(selected_countries or search_query)
+
+    def build_export(countries, name_query, fmt, compress):
+        rows = filter_frame(countries, name_query).drop(columns=list(FLAG_COLUMNS))
+        return export_bytes(rows, fmt, compress=compress)
+
+    st.download_button(
+        label="\U0001f4e5 Download filtered rows" if export_filtered else "\U0001f4e5 Download Database",
+        data=functools.partial(build_export, tuple(selected_countries), search_query, export_format, export_gzip),
+        file_name=export_file_name("mousa_export", export_format, export_gzip),
+        mime=export_mime(export_format, export_gzip),
+        on_click="ignore",
+    )
+
+# --- Background jobs (services/jobs.py), polled while they run ---
+JOB_POLL_SECONDS = 2
+
+def scavenge_panel(job_id):
+    """Progress of a scavenge job; reruns the app once when it finishes."""
+    job = get_job_runner().store.get(job_id)
+    events = get_job_runner().store.events(job_id)
+
+    if job["status"] in ACTIVE_STATUSES:
+        label = "🔍 Scavenging intelligence from the web..." if job["status"] == "running" else "⏳ Scavenge queued..."
+        with st.status(label, expanded=True, state="running"):
+            for event in events[-8:]:
+                st.write(event["message"])
+        st.caption("Runs in the background; you can keep browsing.")
+        return
+
+    # Finished: pick up the saved row once (the job already bumped the dataset version)
+    seen = st.session_state.setdefault("scavenge_seen", set())
+    if job_id not in seen:
+        seen.add(job_id)
+        if job["status"] == "success":
+            st.rerun()
+
+    result = job.get("result") or {}
+    found = result.get("found") or {}
+    if job["status"] == "success":
+        with st.status("✅ Scavenge Complete!", state="complete", expanded=False):
+            for event in events:
+                st.write(event["message"])
+
+        # Show what we found
+        found_items = []
+        if found.get("emails"):
+            found_items.append(f"{len(found['emails'])} email(s)")
+        if found.get("phones"):
+            found_items.append(f"{len(found['phones'])} phone(s)")
+        if found.get("website"):
+            found_items.append("website")
+        if found.get("address"):
+            found_items.append("address")
+
+        if found_items:
+            st.info(f"📊 Found: {', '.join(found_items)}")
+        else:
+            st.warning("⚠️ No contact information found for this company")
+        st.success(f"✅ {(result.get('save') or {}).get('message', 'Saved successfully!')}")
+        return
+
+    with st.status("❌ Search Failed", state="error", expanded=False):
+        for event in events:
+            st.write(event["message"])
+    if result.get("save"):
+        st.error(f"❌ Save failed: {result['save'].get('message')}")
+    else:
+        st.error(f"❌ {job.get('message') or 'Unknown error occurred'}")
+
+    # Show helpful suggestions
+    with st.expander("💡 Troubleshooting Tips"):
+        st.markdown("""
+        **Possible reasons:**
+        1. Company name might be spelled differently online
+        2. Company might be a smaller/newer business without web presence
+        3. Company might operate under a different legal name
+        4. Search API rate limits (wait a moment and try again)
+        
+        **What to try:**
+        - Check if the company name is exact
+        - Try searching manually on Google first
+        - Look for alternative company names
+        - Try again in a few seconds
+        """)
+
+def enrich_panel(job_id):
+    """Progress and summary of a bulk enrichment job."""
+    job = get_job_runner().store.get(job_id)
+    events = get_job_runner().store.events(job_id)
+    total = len(job["params"].get("buyers") or [])
+    if job["status"] in ACTIVE_STATUSES:
+        # From the ledger: a resumed run skips companies without an event
+        started_at = job.get("started_at")
+        done = EnrichmentLedger().done(job["params"].get("run_id"), since=started_at) if started_at else 0
+        st.progress(min(done / total, 1.0) if total else 0.0, text=f"Enriched {done} of {total}")
+        if events:
+            st.caption(events[-1]["message"])
+        return
+
+    seen = st.session_state.setdefault("enrich_seen", set())
+    if job_id not in seen:
+        seen.add(job_id)
+        if job["status"] == "success":
+            st.rerun()
+    summary = job.get("result") or {}
+    if summary.get("companies") is not None:
+        (st.success if job["status"] == "success" else st.warning)(describe_summary(summary))
+    else:
+        st.error(f"Bulk enrichment failed: {job.get('message')}")
+
+# --- Bulk enrichment (current filter) ---
+# One background job enriches the largest matching buyers without email,
+# many at a time under the shared LLM / search / fetch limits.
+ENRICH_BATCH_SIZES = [25, 100, 500, 2000]
+
+with st.sidebar:
+    st.divider()
+    st.header("Bulk Enrich")
+    enrich_batch = st.selectbox("Companies without email", ENRICH_BATCH_SIZES, index=1,
+                                help="Largest buyers in the current filter first; duplicates are skipped")
+    if st.button("\U0001f680 Enrich in background", use_container_width=True, disabled=df.empty):
+        candidates = select_candidates(
+            filter_frame(selected_countries, search_query),
+            countries=selected_countries or None,
+            aliases=get_aliases(data_version),
+            country_column=country_col,
+            limit=enrich_batch,
+        )
+        if candidates.empty:
+            st.info("Every company in this filter already has an email.")
+        else:
+            st.session_state["enrich_job"] = submit_enrichment(candidates)
+    enrich_job = st.session_state.get("enrich_job")
+    if enrich_job:
+        job = get_job_runner().store.get(enrich_job)
+        if job:
+            st.fragment(enrich_panel, run_every=JOB_POLL_SECONDS if job["status"] in ACTIVE_STATUSES else None)(enrich_job)
+
+    # Process-wide loop feeding the agent the highest-value, stalest leads
+    scheduler = get_scheduler()
+    status = scheduler.status()
+    schedule_help = (
+        f"Every {scheduler.interval / 60:.0f} min, the {scheduler.batch_size} most valuable buyers "
+        f"missing contacts and not scavenged in {scheduler.skip_window.days} days"
+    )
+    if status["stopping"]:
+        st.caption("Auto-enrich stops after the current cycle.")
+    elif status["running"]:
+        if st.button("\u23f9 Stop auto-enrich", use_container_width=True, help=schedule_help):
+            scheduler.stop(timeout=0)
+            st.rerun()
+    elif st.button("\u25b6 Auto-enrich top leads", use_container_width=True, help=schedule_help):
+        scheduler.start()
+        st.rerun()
+    if status["last_summary"]:
+        st.caption(f"Last cycle {status['last_cycle_at']:%H:%M}: {describe_summary(status['last_summary'])}")
+
+total_matches = None
+page_token = "all"
+if paginated:
+    # Back to the first page whenever the query changes
+    page_query = (tuple(selected_countries), search_query, sort_column, sort_desc, page_size)
+    if st.session_state.get("page_query") != page_query:
+        st.session_state["page_query"] = page_query
+        st.session_state["page_number"] = 1
+
+    filtered = bool(selected_countries or search_query)
+    page = st.session_state.get("page_number", 1) - 1
+    # Name searches are served from the in-memory index, ranked by match
+    local_search = bool(search_query) and not df.empty
+    result = None if local_search else fetch_page(tuple(selected_countries), search_query, sort_column, sort_desc, page, page_size, filtered, data_version)
+    if result is not None:
+        total_matches = result["count"] if filtered else total_companies
+        last_page = max(1, -(-(total_matches or 0) // page_size))
+        if page >= last_page:
+            page = last_page - 1
+            st.session_state["page_number"] = last_page
+            result = fetch_page(tuple(selected_countries), search_query, sort_column, sort_desc, page, page_size, filtered, data_version)
+        dff = typed_page(result["rows"]) if result and result["rows"] else df.iloc[0:0].copy()
+    else:
+        local = filter_locally()
+        if not local_search:
+            local = local.sort_values(
+                [sort_column, "buyer_name"], ascending=[not sort_desc, True], na_position="last"
+            )
+        total_matches = len(local)
+        last_page = max(1, -(-total_matches // page_size))
+        page = min(page, last_page - 1)
+        st.session_state["page_number"] = page + 1
+        dff = local.iloc[page * page_size:(page + 1) * page_size]
+    dff = dff.reset_index(drop=True)
+    page_token = f"{hash(page_query) & 0xFFFFFFFF:x}_{page}"
+elif search_query and not df.empty:
+    # Every match is counted (and exported); the table shows the best ones
+    dff = filter_locally().reset_index(drop=True)
+    total_matches = len(dff)
+    dff = dff.iloc[:SEARCH_PAGE_SIZE]
+elif selected_countries or search_query:
+    result = search_buyers(tuple(selected_countries), search_query, data_version)
+    if result is not None:
+        dff = typed_page(result["rows"]) if result["rows"] else df.iloc[0:0].copy()
+        total_matches = result["count"]
+    else:
+        dff = filter_locally()
+else:
+    dff = df.copy()
+
+if paginated:
+    first_row = page * page_size + 1 if len(dff) else 0
+    st.markdown(f"**Showing {first_row}–{page * page_size + len(dff)} of {total_matches} companies**")
+elif total_matches is not None and total_matches > len(dff):
+    st.markdown(f"**Showing {len(dff)} of {total_matches} matching companies**")
+else:
+    st.markdown(f"**Showing {len(dff)} companies**")
+
+# --- Unsaved edits, tracked per page ---
+# token -> {"original": page as loaded, "base": frame handed to the editor,
+#           "edited": latest editor output}. The editor widget forgets its
+# state when its page is not rendered, so returning to a page re-seeds it
+# from the edited frame.
+page_edits = st.session_state.setdefault("page_edits", {})
+editor_key = f"editor_{page_token}"
+entry = page_edits.get(page_token)
+if entry is None or not entry.get("changes"):
+    editor_frame = editable(dff)
+    entry = {"original": editor_frame, "base": editor_frame, "edited": editor_frame}
+elif editor_key not in st.session_state:
+    entry["base"] = entry["edited"]
+page_edits[page_token] = entry
+# Pages left without changes are not worth keeping
+for token in [t for t, e in page_edits.items() if t != page_token and e.get("changes") is None]:
+    del page_edits[token]
 
 # --- Layout: Table (Left) + Profile (Right) ---
 col_table, col_profile = st.columns([0.65, 0.35], gap="large")
 
 with col_table:
     st.subheader("Interactive Database")
+
+    if paginated:
+        nav_prev, nav_page, nav_next = st.columns([1, 2, 1])
+        nav_prev.button("◀ Prev", on_click=step_page, args=(-1, last_page), disabled=page == 0, use_container_width=True)
+        nav_page.number_input(
+            f"Page (of {last_page})", min_value=1, max_value=last_page, key="page_number", label_visibility="collapsed"
+        )
+        nav_next.button("Next ▶", on_click=step_page, args=(1, last_page), disabled=page + 1 >= last_page, use_container_width=True)
     
     column_config = {
         "buyer_name": st.column_config.TextColumn("Company", disabled=True),
@@ -124,59 +438,97 @@ with col_table:
     
     # 2. SELECTION LOGIC IN EDITOR
     event = st.data_editor(
-        dff,
-        column_order=["buyer_name", "destination_country", "total_usd", "email", "phone", "website", "address"],
+        entry["base"],
+        column_order=EDITOR_COLUMNS,
         column_config=column_config,
         height=600,
         use_container_width=True,
         hide_index=True,
         num_rows="dynamic", 
-        key="editor",
-        # on_select="rerun",  # Removed to fix Streamlit Cloud TypeError
-        selection_mode="single-row" 
+        key=editor_key,
     )
+
+    def record_changes():
+        changes = diff_frames(entry["original"], event)
+        entry["changes"] = changes if changes["upserts"] or changes["deletes"] else None
+        return [e["changes"] for e in page_edits.values() if e.get("changes")]
+
+    # Record what changed on this page since it was loaded (the full table
+    # is only diffed on save)
+    entry["edited"] = event
+    if paginated:
+        pending = record_changes()
+        if len(pending) > 1 or (pending and entry["changes"] is None):
+            st.caption(f"Unsaved changes on {len(pending)} page(s); Save writes all of them.")
     
     # Save Button
     if st.button("\U0001f4be Save Changes", type="primary"):
         with st.spinner("Saving changes to Supabase..."):
-            # Get latest data from editor (returned by st.data_editor)
-            records_to_save = event.to_dict("records")
-            res = bulk_upsert_buyers(records_to_save)
+            # Send only the rows that actually changed, across every edited page
+            pending = record_changes()
+            upserts = [row for c in pending for row in c["upserts"]]
+            deletes = [name for c in pending for name in c["deletes"]]
             
-            if res.get("status") == "success":
-                st.success("Changes saved successfully!")
-                time.sleep(1)
-                st.cache_data.clear()
-                st.rerun()
+            if not upserts and not deletes:
+                st.info("No changes to save.")
             else:
-                st.error(f"Save failed: {res.get('message')}")
+                res = {"status": "success"}
+                if upserts:
+                    res = bulk_upsert_buyers(upserts)
+                if res.get("status") == "success" and deletes:
+                    res = delete_buyers(deletes)
+                
+                if res.get("status") == "success":
+                    total = {k: sum(c[k] for c in pending) for k in ("edited", "inserted", "deleted", "skipped", "wire_bytes")}
+                    st.success(
+                        f"Saved {total['edited']} edited, {total['inserted']} new and "
+                        f"{total['deleted']} deleted rows "
+                        f"({len(upserts) + len(deletes)} rows, {total['wire_bytes']:,} bytes sent)."
+                    )
+                    if total["skipped"]:
+                        st.warning(f"{total['skipped']} new rows had no company name and were not saved.")
+                    time.sleep(1)
+                    # New dataset version: every page pulls the changes
+                    dataset.record_write(deleted=deletes)
+                    st.session_state["page_edits"] = {}
+                    st.rerun()
+                else:
+                    st.error(f"Save failed: {res.get('message')}")
+                    if res.get("failed_names"):
+                        st.caption("Not saved: " + ", ".join(map(str, res["failed_names"][:50])))
 
 # --- Profile Logic ---
 with col_profile:
     st.subheader("Entity Profile")
     
-    # Logic to find selected row
-    selected_row_index = None
+    # Resolve the selected company by name, never by position: the table
+    # may be sorted, paged or edited since the selection was made. Offer at
+    # most one search page of names: without pagination dff can be the
+    # whole table, and every option is sent to the browser on each rerun.
+    page_names = dff["buyer_name"].iloc[:SEARCH_PAGE_SIZE].dropna().tolist()
+    previous = st.session_state.get("selected_buyer")
+    if previous is not None and previous not in page_names and (dff["buyer_name"] == previous).any():
+        page_names.insert(0, previous)
+    selected_name = None
     
-    # Check session state for selection keys
-    if "editor" in st.session_state:
-        selection = st.session_state["editor"].get("selection", {})
-        rows = selection.get("rows", [])
-        if rows:
-            selected_row_index = rows[0]
+    if page_names:
+        selected_name = st.selectbox(
+            "Company",
+            page_names,
+            index=page_names.index(previous) if previous in page_names else 0,
+            label_visibility="collapsed",
+        )
+    st.session_state["selected_buyer"] = selected_name
             
-    if selected_row_index is not None:
+    if selected_name is not None:
         try:
-            # Map index to filtered dataframe
-            # Be mindful of index filtering. reset_index() might be needed for mapping if indices are non-sequential?
-            # data_editor operates on the passed dataframe index.
-            # dff.iloc works positionally. BUT the selection index from data_editor is based on the DISPLAYED index (0 to N).
-            # So dff.iloc[selected_row_index] is correct IF dff is the exact input.
-            
-            record = dff.iloc[selected_row_index]
+            record = dff[dff["buyer_name"] == selected_name].iloc[0]
             
             company_name = record["buyer_name"]
-            country = record.get(country_col) or record.get("country") or ""
+            country = record.get(country_col)
+            country = "" if pd.isna(country) else str(country)
+            # Duplicates are enriched under their canonical company
+            canonical_name = (get_aliases(data_version) or {}).get(company_name)
             
             # --- Entity Card ---
             st.markdown(f"""
@@ -186,20 +538,30 @@ with col_profile:
                 <hr style="border-top:1px solid #333;">
             </div>
             """, unsafe_allow_html=True)
+            if canonical_name:
+                st.caption(f"Duplicate of **{canonical_name}**; scavenging enriches that company.")
             
             # --- 3. ROBUST HIDDEN FIELDS ---
             def is_valid(v):
-                if v is None: return False
+                if v is None or (not isinstance(v, str) and pd.isna(v)): return False
                 s = str(v).strip()
                 return s.lower() not in ["none", "nan", "null", ""]
 
             st.write("### \U0001f4ca Contact Info")
             
             has_info = False
+            contacts = get_contacts(company_name, data_version) or []
+            emails = [c["value"] for c in contacts if c["kind"] == "email"]
+            phones = [c["value"] for c in contacts if c["kind"] == "phone"]
             
             # Email
             email_val = record.get("email")
-            if is_valid(email_val):
+            if emails:
+                has_info = True
+                links = ", ".join(f"[{e}](mailto:{e})" for e in emails)
+                st.markdown(f"**Email:** {links}")
+            elif is_valid(email_val):
+                # Not normalized yet (supabase_schema_contacts.sql not applied)
                 has_info = True
                 clean_email = str(email_val).strip()
                 first_email = clean_email.split(',')[0].strip()
@@ -207,7 +569,10 @@ with col_profile:
 
             # Phone
             phone_val = record.get("phone")
-            if is_valid(phone_val):
+            if phones:
+                has_info = True
+                st.markdown("**Phone:** " + ", ".join(f"`{p}`" for p in phones))
+            elif is_valid(phone_val):
                 has_info = True
                 st.markdown(f"**Phone:** `{str(phone_val).strip()}`")
                  
@@ -226,79 +591,22 @@ with col_profile:
             
             st.markdown("---")
             
-            # Scavenge Button
+            # Scavenge Button: runs as a background job (services/jobs.py), so
+            # the page stays usable and the result survives reruns
+            target = canonical_name or company_name
+            jobs = st.session_state.setdefault("scavenge_jobs", {})
             if st.button("\U0001f50d Scavenge Data", type="primary", use_container_width=True, key=f"scavenge_{company_name}"):
-                agent = SearchAgent()
-                status_container = st.status("🔍 Scavenging intelligence from the web...", expanded=True)
-                
-                async def run_scavenge():
-                    def log_status(msg):
-                        status_container.write(msg)
-                    return await agent.find_company_leads(company_name, country, callback=log_status)
-
-                try:
-                    # Run the search
-                    result = asyncio.run(run_scavenge())
-                    
-                    # Check if we got valid data
-                    if result and result.get("status") != "error":
-                        status_container.update(label="✅ Scavenge Complete!", state="complete", expanded=False)
-                        
-                        # Show what we found
-                        found_items = []
-                        if result.get("emails"):
-                            found_items.append(f"{len(result['emails'])} email(s)")
-                        if result.get("phones"):
-                            found_items.append(f"{len(result['phones'])} phone(s)")
-                        if result.get("website"):
-                            found_items.append("website")
-                        if result.get("address"):
-                            found_items.append("address")
-                        
-                        if found_items:
-                            st.info(f"📊 Found: {', '.join(found_items)}")
-                        else:
-                            st.warning("⚠️ No contact information found for this company")
-                        
-                        # Save to Supabase
-                        with st.spinner("💾 Saving to database..."):
-                            db_res = save_scavenged_data(company_name, result)
-                            
-                            if db_res and db_res.get("status") == "success":
-                                st.success(f"✅ {db_res.get('message', 'Saved successfully!')}")
-                                st.toast('🔄 Data saved! Refreshing...', icon='✅')
-                                time.sleep(1)
-                                
-                                # Clear cache and refresh
-                                st.cache_data.clear()
-                                st.rerun()
-                            else:
-                                st.error(f"❌ Save failed: {db_res.get('message')}")
-                    else:
-                        status_container.update(label="❌ Search Failed", state="error", expanded=True)
-                        error_msg = result.get('message', 'Unknown error occurred')
-                        st.error(f"❌ {error_msg}")
-                        
-                        # Show helpful suggestions
-                        with st.expander("💡 Troubleshooting Tips"):
-                            st.markdown("""
-                            **Possible reasons:**
-                            1. Company name might be spelled differently online
-                            2. Company might be a smaller/newer business without web presence
-                            3. Company might operate under a different legal name
-                            4. Search API rate limits (wait a moment and try again)
-                            
-                            **What to try:**
-                            - Check if the company name is exact
-                            - Try searching manually on Google first
-                            - Look for alternative company names
-                            - Try again in a few seconds
-                            """)
-                        
-                except Exception as e:
-                    status_container.update(label="❌ Error Occurred", state="error", expanded=True)
-                    st.error(f"❌ Unexpected error: {str(e)}")
-                    logging.error(f"Scavenge error for {company_name}: {e}")
+                jobs[target] = submit_scavenge(target, country)
+            job_id = jobs.get(target)
+            if job_id is None:
+                # Started from another session
+                active = get_job_runner().store.active("scavenge", target)
+                job_id = active["id"] if active else None
+            if job_id:
+                job = get_job_runner().store.get(job_id)
+                if job:
+                    polling = job["status"] in ACTIVE_STATUSES
+                    st.fragment(scavenge_panel, run_every=JOB_POLL_SECONDS if polling else None)(job_id)
                     
         except Exception as e:
             st.info("Select a company row to view details.")
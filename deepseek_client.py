@@ -2,6 +2,8 @@ import os
 import json
 import asyncio
 import re
+from contextlib import asynccontextmanager, nullcontext
+
 import requests
 from openai import AsyncOpenAI
 from bs4 import BeautifulSoup
@@ -19,8 +21,15 @@ except ImportError:
         SEARCH_ENGINE = "ddgs"
 
 class DeepSeekClient:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, limits=None):
+        """
+        Args:
+            api_key: DeepSeek key (defaults to DEEPSEEK_API_KEY)
+            limits: Optional services.rate_limits.ServiceLimits shared by
+                every session, capping LLM calls, searches and page fetches
+        """
         self.api_key = api_key or os.getenv("DEEPSEEK_API_KEY")
+        self.limits = limits
         self.client = AsyncOpenAI(
             api_key=self.api_key, 
             base_url="https://api.deepseek.com"
@@ -63,6 +72,17 @@ class DeepSeekClient:
             }
         ]
 
+    def _slot(self, kind):
+        return self.limits.slot(kind) if self.limits else nullcontext()
+
+    @asynccontextmanager
+    async def _async_slot(self, kind):
+        if self.limits:
+            async with self.limits.async_slot(kind):
+                yield
+        else:
+            yield
+
     async def extract_company_data(self, system_prompt, buyer_name, country, model="deepseek-chat", callback=None):
         """
         Orchestrates the chat completion with MULTI-TURN tool calling.
@@ -80,12 +100,13 @@ class DeepSeekClient:
 
         while current_turn < max_turns:
             try:
-                response = await self.client.chat.completions.create(
-                    model=model,
-                    messages=messages,
-                    tools=self.tools,
-                    tool_choice="auto"
-                )
+                async with self._async_slot("llm"):
+                    response = await self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        tools=self.tools,
+                        tool_choice="auto"
+                    )
                 
                 message = response.choices[0].message
                 
@@ -99,12 +120,13 @@ class DeepSeekClient:
                         if tool_call.function.name == "web_search":
                             query = args.get('query')
                             if callback: callback(f"Turn {current_turn+1}: Searching for '{query}'...")
-                            result = self._perform_search(query)
+                            # Tools block; run them off the event loop so sessions overlap
+                            result = await asyncio.to_thread(self._perform_search, query)
                             
                         elif tool_call.function.name == "fetch_page":
                             url = args.get('url')
                             if callback: callback(f"Turn {current_turn+1}: Fetching page '{url}'...")
-                            result = self._fetch_page(url)
+                            result = await asyncio.to_thread(self._fetch_page, url)
                         else:
                             result = {"error": "Unknown tool"}
                         
@@ -138,11 +160,12 @@ class DeepSeekClient:
 
         try:
              # Force a non-tool response by NOT sending tools
-            final_response = await self.client.chat.completions.create(
-                model=model,
-                messages=messages
-                # NO tools=self.tools here!
-            )
+            async with self._async_slot("llm"):
+                final_response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages
+                    # NO tools=self.tools here!
+                )
             content = final_response.choices[0].message.content
             return self._clean_json(content), current_turn
         except:
@@ -154,7 +177,8 @@ class DeepSeekClient:
             # Use DuckDuckGo
             from ddgs import DDGS
             ddgs = DDGS(timeout=30)
-            results = list(ddgs.text(query, max_results=10))
+            with self._slot("search"):
+                results = list(ddgs.text(query, max_results=10))
             
             if not results:
                 return [{"error": "No search results found."}]
@@ -250,7 +274,8 @@ class DeepSeekClient:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=15)
+            with self._slot("fetch"):
+                response = requests.get(url, headers=headers, timeout=15)
             response.raise_for_status()
             html = response.text
             
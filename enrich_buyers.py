@@ -0,0 +1,133 @@
+"""Enrich many buyers at once with concurrent agent sessions.
+
+Picks buyers missing contact fields (optionally in some countries), largest
+first and skipping resolved aliases, then runs up to --concurrency
+SearchAgent sessions under global LLM / search / page-fetch limits
+(services/enrichment.py). Each company is saved as soon as it completes;
+an interrupted run continues with --resume.
+
+Usage:
+    python enrich_buyers.py --country USA --country GERMANY --limit 500
+    python enrich_buyers.py --missing email --missing phone --concurrency 16
+    python enrich_buyers.py --resume 3f2a9c1e7b40 --country USA --limit 500
+    python enrich_buyers.py --dry-run --limit 20   # list the candidates only
+"""
+
+import argparse
+import asyncio
+import os
+
+import pandas as pd
+from dotenv import load_dotenv
+
+load_dotenv()
+
+if not os.environ.get("SUPABASE_URL") or not os.environ.get("SUPABASE_KEY"):
+    print("[ERROR] Missing Supabase credentials")
+    exit()
+
+from services.buyer_frame import build_buyer_frame
+from services.database import fetch_aliases, iter_buyers
+from services.enrichment import (
+    DEFAULT_CONCURRENCY,
+    ENRICH_FIELDS,
+    EnrichmentLedger,
+    describe_summary,
+    enrich_buyers,
+    select_candidates,
+)
+from services.rate_limits import DEFAULT_LIMITS, ServiceLimits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enrich buyers missing contact details")
+    parser.add_argument("--country", action="append", help="Only this country (repeatable)")
+    parser.add_argument(
+        "--country-column",
+        default="destination_country",
+        choices=["destination_country", "country_english"],
+    )
+    parser.add_argument(
+        "--missing",
+        action="append",
+        choices=ENRICH_FIELDS,
+        help="Enrich rows missing this field (repeatable, default email)",
+    )
+    parser.add_argument("--limit", type=int, help="At most this many companies")
+    parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Agent sessions at once"
+    )
+    parser.add_argument(
+        "--llm", type=int, default=DEFAULT_LIMITS["llm"][0], help="LLM calls in flight"
+    )
+    parser.add_argument(
+        "--search", type=int, default=DEFAULT_LIMITS["search"][0], help="Searches in flight"
+    )
+    parser.add_argument(
+        "--search-per-minute",
+        type=float,
+        default=DEFAULT_LIMITS["search"][1],
+        help="Searches started per minute (0 = unlimited)",
+    )
+    parser.add_argument(
+        "--fetch", type=int, default=DEFAULT_LIMITS["fetch"][0], help="Page fetches in flight"
+    )
+    parser.add_argument(
+        "--resume", metavar="RUN_ID", help="Continue a run, skipping companies it finished"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="List candidates without enriching")
+    args = parser.parse_args()
+
+    print("[INFO] Reading buyers...")
+    pages = list(iter_buyers(profile="table", as_frame=True))
+    frame = build_buyer_frame(pd.concat(pages, ignore_index=True) if pages else None).frame
+    candidates = select_candidates(
+        frame,
+        missing=args.missing or ["email"],
+        countries=args.country,
+        aliases=fetch_aliases(),
+        country_column=args.country_column,
+        limit=args.limit,
+    )
+    print(f"[INFO] {len(candidates)} of {len(frame)} buyers to enrich")
+
+    if args.dry_run:
+        for row in candidates.head(50).itertuples():
+            print(f"  {row.buyer_name} ({row.country or '-'}): {row.total_usd:,.0f} USD")
+        print("[DONE] Dry run, nothing enriched")
+        return
+
+    ledger = EnrichmentLedger()
+    limits = ServiceLimits(
+        {
+            "llm": (args.llm, DEFAULT_LIMITS["llm"][1]),
+            "search": (args.search, args.search_per_minute),
+            "fetch": (args.fetch, DEFAULT_LIMITS["fetch"][1]),
+        }
+    )
+    summary = asyncio.run(
+        enrich_buyers(
+            candidates,
+            concurrency=args.concurrency,
+            limits=limits,
+            ledger=ledger,
+            run_id=args.resume,
+            progress=lambda message: print(f"  {message}"),
+        )
+    )
+
+    print(f"[INFO] Run {summary['run_id']}: {describe_summary(summary)}")
+    for kind, stats in summary["limits"].items():
+        print(
+            f"[INFO] {kind}: {stats['calls']} calls, peak {stats['peak']}/{stats['max_concurrent']}, "
+            f"waited {stats['wait_s']:.1f}s"
+        )
+    if summary["errors"]:
+        print(
+            f"[WARN] {summary['errors']} companies failed; rerun with --resume {summary['run_id']} to retry them"
+        )
+    print("[DONE] Enrichment complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Print Postgres EXPLAIN plans for the queries services/database.py issues.
+
+Plans are requested through PostgREST (Accept: application/vnd.pgrst.plan),
+built by the same helpers the app uses, so an index that stops being used
+shows up here. PostgREST only serves plans when enabled once per project:
+
+    ALTER ROLE authenticator SET pgrst.db_plan_enabled TO true;
+    NOTIFY pgrst, 'reload config';
+
+Usage:
+    python explain_queries.py            # estimated plans
+    python explain_queries.py --analyze  # run the queries and show timings
+"""
+
+import argparse
+import os
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+if not os.environ.get("SUPABASE_URL") or not os.environ.get("SUPABASE_KEY"):
+    print("[ERROR] Missing Supabase credentials")
+    exit()
+
+from services.database import (
+    DEFAULT_PAGE_SIZE,
+    _buyer_page_query,
+    _buyer_query,
+    get_supabase,
+    profile_columns,
+)
+
+
+def build_queries(supabase):
+    """(label, request builder) for every read path worth watching."""
+    since = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    table_columns = profile_columns("table")
+    return [
+        (
+            "iter_buyers: first keyset page (table profile)",
+            _buyer_page_query(supabase, table_columns, "buyer_name", None, DEFAULT_PAGE_SIZE),
+        ),
+        (
+            "iter_buyers: later keyset page",
+            _buyer_page_query(supabase, table_columns, "buyer_name", "M", DEFAULT_PAGE_SIZE),
+        ),
+        (
+            "BuyerSync delta: updated_at past watermark",
+            _buyer_page_query(
+                supabase, table_columns, "buyer_name", None, DEFAULT_PAGE_SIZE, since=since
+            ),
+        ),
+        (
+            "query_buyers: country filter + name search",
+            _buyer_query(
+                supabase,
+                ["USA", "GERMANY"],
+                "trading",
+                "table",
+                100,
+                0,
+                None,
+                "buyer_name",
+                False,
+                "exact",
+                "destination_country",
+            ),
+        ),
+        (
+            "query_buyers: largest buyers first",
+            _buyer_query(
+                supabase,
+                None,
+                None,
+                "table",
+                100,
+                0,
+                None,
+                "total_usd",
+                True,
+                None,
+                "destination_country",
+            ),
+        ),
+        ("fetch_buyer_summary: mousa_summary view", supabase.table("mousa_summary").select("*")),
+        (
+            "fetch_country_rollup: materialized view",
+            supabase.table("mousa_country_rollup")
+            .select("*")
+            .eq("country_column", "country_english")
+            .order("companies", desc=True)
+            .limit(10),
+        ),
+        (
+            "find_contacts_by_domain",
+            supabase.table("buyer_contacts")
+            .select("buyer_name,value,source_url,found_at")
+            .eq("domain", "example.com")
+            .order("buyer_name"),
+        ),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print EXPLAIN plans for the app's queries")
+    parser.add_argument(
+        "--analyze", action="store_true", help="EXPLAIN ANALYZE (executes the queries)"
+    )
+    parser.add_argument(
+        "--buffers", action="store_true", help="Include buffer usage (with --analyze)"
+    )
+    args = parser.parse_args()
+
+    supabase = get_supabase()
+    if not supabase:
+        print("[ERROR] Could not connect to Supabase")
+        return
+
+    failures = 0
+    for label, query in build_queries(supabase):
+        print(f"=== {label} ===")
+        try:
+            plan = query.explain(analyze=args.analyze, buffers=args.buffers).execute()
+            print(plan.strip() if isinstance(plan, str) else plan)
+        except Exception as e:
+            failures += 1
+            print(f"[ERROR] {e}")
+        print()
+
+    if failures:
+        print(
+            f"[WARN] {failures} plan(s) unavailable; is pgrst.db_plan_enabled on and are migrations applied?"
+        )
+
+
+if __name__ == "__main__":
+    main()
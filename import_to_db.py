@@ -3,7 +3,6 @@ import json
 import os
 import sys
 from dotenv import load_dotenv
-from supabase import create_client
 
 # Load env
 load_dotenv()
@@ -15,7 +14,13 @@ if not url or not key:
     print("[ERROR] Missing Supabase credentials")
     exit()
 
-supabase = create_client(url, key)
+from services.database import (
+    bulk_upsert_buyers,
+    contact_rows,
+    refresh_country_rollup,
+    save_contacts,
+)
+from services.entity_resolution import run_entity_resolution
 
 JSON_PATH = os.path.join("data", "combined_buyers.json")
 
@@ -44,10 +49,10 @@ def import_data():
 
     print(f"[INFO] Found {len(data)} records. Preparing for import...")
 
-    batch_size = 100
     records = []
+    contacts = []
     
-    for i, item in enumerate(data):
+    for item in data:
         # Map JSON fields to DB schema
         record = {
             "buyer_name": item.get("buyer_name", "Unknown"),
@@ -59,24 +64,48 @@ def import_data():
             "address": process_field(item.get("address"))
         }
         records.append(record)
-        
-        # Batch insert
-        if len(records) >= batch_size:
-            try:
-                # Use insert instead of upsert since table is empty and constraint is missing
-                supabase.table("mousa").insert(records).execute()
-                print(f"[SUCCESS] Imported batch {i+1-batch_size} to {i+1}")
-            except Exception as e:
-                print(f"[ERROR] Error inserting batch: {e}")
-            records = []
-
-    # Final batch
-    if records:
-        try:
-            supabase.table("mousa").insert(records).execute()
-            print(f"[SUCCESS] Imported final batch of {len(records)}")
-        except Exception as e:
-            print(f"[ERROR] Error inserting final batch: {e}")
+        contacts.extend(contact_rows(record["buyer_name"], {
+            "email": item.get("email") or [],
+            "phone": item.get("phone") or [],
+            "website": item.get("website") or [],
+        }))
+
+    # Chunked, concurrent upsert; failed chunks are reported by name
+    result = bulk_upsert_buyers(records)
+    for chunk in result.get("chunks", []):
+        if chunk["status"] == "success":
+            print(f"[SUCCESS] Chunk {chunk['index']}: {chunk['rows']} rows ({chunk['attempts']} attempt(s))")
+        else:
+            print(f"[ERROR] Chunk {chunk['index']}: {chunk['rows']} rows failed: {chunk['error']}")
+
+    print(f"[INFO] {result.get('message')}")
+    if result.get("failed_names"):
+        failed_path = os.path.join("data", "import_failed.json")
+        with open(failed_path, "w", encoding="utf-8") as f:
+            json.dump(result["failed_names"], f, ensure_ascii=False, indent=2)
+        print(f"[WARN] {len(result['failed_names'])} buyer names written to {failed_path} for retry")
+
+    # Normalized contacts for the rows that made it in
+    failed = set(result.get("failed_names") or [])
+    contacts = [c for c in contacts if c["buyer_name"] not in failed]
+    contacts_result = save_contacts(contacts)
+    if contacts_result["status"] == "error":
+        print(f"[WARN] Contacts not saved to buyer_contacts: {contacts_result.get('message')}")
+    else:
+        print(f"[INFO] Saved {contacts_result.get('saved', 0)} normalized contacts")
+
+    # Imported names often repeat a company under another spelling
+    aliases_result = run_entity_resolution()
+    if aliases_result["status"] == "error":
+        print(f"[WARN] Duplicate names not resolved: {aliases_result.get('message')}")
+    else:
+        stats = aliases_result["stats"]
+        print(f"[INFO] Resolved {stats['aliases']} duplicate names into {stats['clusters']} companies")
+
+    # The dashboard serves top countries from this rollup while it is fresh
+    rollup_result = refresh_country_rollup()
+    if rollup_result["status"] == "error":
+        print(f"[WARN] Country rollup not refreshed: {rollup_result.get('message')}")
 
     print("\n[DONE] Import Complete!")
 
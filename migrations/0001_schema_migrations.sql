@@ -0,0 +1,12 @@
+-- 0001: Migration bookkeeping
+-- Files in migrations/ are applied in filename order after the
+-- supabase_schema*.sql phase scripts (Supabase SQL Editor or psql -f).
+-- Every file is idempotent and records itself in schema_migrations.
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version text PRIMARY KEY,
+    applied_at timestamptz NOT NULL DEFAULT now()
+);
+
+INSERT INTO schema_migrations (version) VALUES ('0001_schema_migrations')
+ON CONFLICT (version) DO NOTHING;
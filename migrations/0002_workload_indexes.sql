@@ -0,0 +1,41 @@
+-- 0002: Indexes for the access patterns in services/database.py
+-- Requires supabase_schema.sql, supabase_schema_email.sql and
+-- supabase_schema_search.sql (destination_country and trigram indexes).
+
+-- "Has email" as a stored column so enriched-vs-not filters and partial
+-- indexes share one definition (same rule as the mousa_summary view).
+ALTER TABLE mousa
+ADD COLUMN IF NOT EXISTS has_email boolean GENERATED ALWAYS AS (
+    nullif(btrim(email), '') IS NOT NULL
+    AND lower(btrim(email)) NOT IN ('none', 'nan', 'null')
+) STORED;
+
+-- Dashboard country grouping / filters on the English country name
+CREATE INDEX IF NOT EXISTS mousa_country_english_idx
+ON mousa (country_english);
+
+-- query_buyers(order_by="total_usd", descending=True): ORDER BY total_usd DESC, buyer_name
+CREATE INDEX IF NOT EXISTS mousa_total_usd_idx
+ON mousa (total_usd DESC, buyer_name);
+
+-- Email Center audience (has email), highest value first
+CREATE INDEX IF NOT EXISTS mousa_has_email_value_idx
+ON mousa (total_usd DESC, buyer_name)
+WHERE has_email;
+
+-- Enrichment candidates (no email yet), highest value first
+CREATE INDEX IF NOT EXISTS mousa_not_enriched_value_idx
+ON mousa (total_usd DESC, buyer_name)
+WHERE NOT has_email;
+
+-- Recency: "scavenged / contacted in the last N days" and staleness scans
+CREATE INDEX IF NOT EXISTS mousa_last_scavenged_at_idx
+ON mousa (last_scavenged_at);
+
+CREATE INDEX IF NOT EXISTS mousa_last_contacted_at_idx
+ON mousa (last_contacted_at);
+
+ANALYZE mousa;
+
+INSERT INTO schema_migrations (version) VALUES ('0002_workload_indexes')
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,57 @@
+-- 0003: Materialized per-country rollup
+-- Precomputed companies / enriched / value / contacted per country for
+-- both country columns, read by services.database.fetch_top_countries
+-- while fresh (COUNTRY_ROLLUP_MAX_AGE) with the live breakdown RPC as the
+-- fallback. import_to_db.py and finished scavenge/enrichment jobs call the
+-- mousa_refresh_country_rollup RPC; optionally also schedule it with pg_cron:
+--   SELECT cron.schedule('mousa-country-rollup', '*/15 * * * *',
+--                        'SELECT mousa_refresh_country_rollup()');
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mousa_country_rollup AS
+SELECT
+    grouped.country_column,
+    grouped.country,
+    count(*)::bigint AS companies,
+    count(*) FILTER (WHERE grouped.has_email)::bigint AS enriched,
+    count(*) FILTER (WHERE grouped.last_contacted_at IS NOT NULL)::bigint AS contacted,
+    coalesce(sum(grouped.total_usd), 0)::float8 AS total_value,
+    now() AS refreshed_at
+FROM (
+    SELECT 'destination_country'::text AS country_column, destination_country::text AS country,
+           has_email, last_contacted_at, total_usd
+    FROM mousa
+    UNION ALL
+    SELECT 'country_english', country_english::text, has_email, last_contacted_at, total_usd
+    FROM mousa
+) AS grouped
+WHERE nullif(btrim(grouped.country), '') IS NOT NULL
+GROUP BY grouped.country_column, grouped.country
+WITH DATA;
+
+-- Required for REFRESH ... CONCURRENTLY (readers are never blocked)
+CREATE UNIQUE INDEX IF NOT EXISTS mousa_country_rollup_key
+ON mousa_country_rollup (country_column, country);
+
+CREATE INDEX IF NOT EXISTS mousa_country_rollup_companies_idx
+ON mousa_country_rollup (country_column, companies DESC);
+
+CREATE OR REPLACE FUNCTION mousa_refresh_country_rollup()
+RETURNS timestamptz
+LANGUAGE plpgsql SECURITY DEFINER SET search_path = public AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mousa_country_rollup;
+    RETURN now();
+END;
+$$;
+
+GRANT SELECT ON mousa_country_rollup TO anon, authenticated;
+
+-- The refresh runs as the view owner (SECURITY DEFINER), so the public
+-- anon key must not be able to trigger it; functions default to PUBLIC.
+-- With an anon key the refresh RPC fails and readers fall back to the
+-- live breakdown once the rollup is older than COUNTRY_ROLLUP_MAX_AGE.
+REVOKE EXECUTE ON FUNCTION mousa_refresh_country_rollup() FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION mousa_refresh_country_rollup() TO authenticated, service_role;
+
+INSERT INTO schema_migrations (version) VALUES ('0003_country_rollup')
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,24 @@
+-- 0004: Resolved duplicate buyer names
+-- One row per alias pointing at its cluster's canonical buyer_name, written
+-- by resolve_entities.py (services.entity_resolution) and read through
+-- services.database.fetch_aliases. Rows with method 'manual' are curated
+-- by hand and never pruned by a resolution run.
+
+CREATE TABLE IF NOT EXISTS buyer_aliases (
+    alias_name text PRIMARY KEY,
+    canonical_name text NOT NULL,
+    canonical_key text,
+    score real,
+    method text NOT NULL DEFAULT 'fuzzy' CHECK (method IN ('exact', 'fuzzy', 'manual')),
+    resolved_at timestamptz NOT NULL DEFAULT now(),
+    CHECK (alias_name <> canonical_name)
+);
+
+-- "All aliases of a company" and stale-row pruning
+CREATE INDEX IF NOT EXISTS buyer_aliases_canonical_idx ON buyer_aliases (canonical_name);
+CREATE INDEX IF NOT EXISTS buyer_aliases_resolved_at_idx ON buyer_aliases (resolved_at);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON buyer_aliases TO anon, authenticated;
+
+INSERT INTO schema_migrations (version) VALUES ('0004_buyer_aliases')
+ON CONFLICT (version) DO NOTHING;
@@ -9,32 +9,54 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
-from services.database import fetch_all_buyers
+from services.database import fetch_buyer_summary, fetch_top_countries
+from services.dataset import get_dataset
 
 random.seed(42)  # Deterministic mock data
 
 # --- Data loads AFTER title renders ---
+# KPIs and top countries are aggregated in Postgres (supabase_schema_metrics.sql)
 @st.cache_data(ttl=300)
-def get_dashboard_data():
-    return fetch_all_buyers()
-
-raw_data = get_dashboard_data()
-df = pd.DataFrame(raw_data) if raw_data else None
+def get_dashboard_metrics(version):
+    summary = fetch_buyer_summary()
+    # Materialized rollup while fresh; live RPC when stale or not installed
+    breakdown = fetch_top_countries("country_english", limit=10)
+    if summary is None or breakdown is None:
+        return None
+    return {"summary": summary, "top_countries": breakdown}
+
+# Fallback when the metrics view/RPC is not installed: derived from the shared
+# dataset (local replica, reconciled in the background) once per data version
+def local_metrics(buyers):
+    frame = buyers.frame
+    if frame.empty:
+        return None
+    country_counts = frame["country_english"].value_counts().head(10)
+    return {
+        "summary": {"total_companies": len(frame), "total_value": frame["total_usd"].sum()},
+        "top_countries": [
+            {"country": country, "companies": int(count)} for country, count in country_counts.items()
+        ],
+    }
+
+dataset = get_dataset()
+metrics = get_dashboard_metrics(dataset.version)
+if metrics is None:
+    metrics = dataset.view("metrics", local_metrics, profile="dashboard")
 
 st.markdown("### Search Exporters")
 search_query = st.text_input("Enter Exporter Name, ID, or Region", placeholder="Search...")
 
 col1, col2, col3 = st.columns(3)
 
-if df is not None:
-    total_rev_val = df["total_usd"].sum()
+if metrics is not None and metrics["summary"]["total_companies"]:
+    total_rev_val = metrics["summary"]["total_value"] or 0
     total_rev = f"${total_rev_val / 1000000:.1f}M"
-    active_buyers = f"{len(df)}"
+    active_buyers = f"{metrics['summary']['total_companies']}"
     growth = "+12.5%"
 
-    country_counts = df["country_english"].value_counts().head(10).reset_index()
-    country_counts.columns = ["Country", "Value"]
-    df_b = country_counts
+    df_b = pd.DataFrame(metrics["top_countries"], columns=["country", "companies"])
+    df_b.columns = ["Country", "Value"]
 
     # Temporal mock (JSON has no dates)
     dates = pd.date_range(start="2023-01-01", periods=12, freq="M")
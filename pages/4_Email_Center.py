@@ -4,9 +4,11 @@ import asyncio
 import os
 import logging
 import json
+import time
 from datetime import datetime
 from services.search_agent import SearchAgent 
-from services.database import fetch_all_buyers, get_supabase, bulk_upsert_buyers
+from services.database import fetch_aliases, get_supabase, mark_contacted
+from services.dataset import get_dataset
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -16,51 +18,45 @@ st.set_page_config(layout="wide", page_title="Email Center", page_icon="\U0001f4
 st.title("\U0001f4e7 Cold Email Center")
 st.markdown("---")
 
+# Duplicate names resolved by resolve_entities.py; None when unavailable
+@st.cache_data(ttl=300)
+def get_aliases(version):
+    return fetch_aliases()
+
 # --- Load Data (Audience) ---
-@st.cache_data(ttl=60) # Short cache for debugging
-def get_audience():
-    # 1. Fetch RAW data
-    raw_data = fetch_all_buyers()
+def get_audience(profile="email"):
+    # 1. Typed frame (only the columns the audience table and composer use),
+    # served from the local replica and reconciled in the background
+    dataset = get_dataset()
+    buyers = dataset.frame(profile, max_age=60)
+    frame = buyers.frame
     
-    if not raw_data:
+    if frame.empty:
         return pd.DataFrame()
     
-    df = pd.DataFrame(raw_data)
-    
     # --- DEBUGGING START ---
     with st.expander("🔍 Debug: Raw Database Data", expanded=True):
-        st.write(f"Fetched {len(df)} rows from Supabase.")
-        if not df.empty:
-            st.write("Columns:", df.columns.tolist())
-            st.dataframe(df.head(10))
+        st.write(f"Fetched {len(frame)} rows from Supabase ({buyers.describe()}).")
+        st.write("Columns:", frame.columns.tolist())
+        st.dataframe(frame.head(10))
     # --- DEBUGGING END ---
 
-    # Normalize columns to lowercase
-    df.columns = [c.lower() for c in df.columns]
-    
-    if "email" in df.columns:
-        # 2. Filter Logic (Simplified & Looser)
-        # Just remove Nulls/NaNs and empty strings
-        original_count = len(df)
-        
-        # Drop None/NaN
-        df = df.dropna(subset=["email"])
-        
-        # Drop Empty Strings
-        df = df[df["email"].astype(str).str.strip() != ""]
-        
-        # Drop explicit "None" text (sometimes inserted by Python str(None))
-        df = df[~df["email"].astype(str).str.lower().isin(["none", "null", "nan"])]
-        
-        st.caption(f"Filtered from {original_count} to {len(df)} rows with valid emails.")
+    # 2. Blank and "None"/"null"/"nan" emails were normalized away when the
+    # frame was built; the filtered audience is rebuilt once per data version
+    df = dataset.view(
+        "audience", lambda b: b.frame[b.frame["has_email"]].reset_index(drop=True), profile=profile, max_age=60
+    )
+    st.caption(f"Filtered from {len(frame)} to {len(df)} rows with valid emails.")
 
-        # Convert timestamp
-        if "last_contacted_at" in df.columns:
-            df["last_contacted_at"] = pd.to_datetime(df["last_contacted_at"], errors="coerce")
-            
-        return df
-    
-    return pd.DataFrame()
+    # 3. One email per company: drop aliases whose canonical company is also here
+    aliases = get_aliases(dataset.version) or {}
+    if aliases and not df.empty:
+        names = df["buyer_name"]
+        duplicate = names.isin(list(aliases)) & names.map(aliases).isin(names)
+        if duplicate.any():
+            df = df[~duplicate].reset_index(drop=True)
+            st.caption(f"Hid {int(duplicate.sum())} duplicate names of companies already in the list.")
+    return df
 
 df = get_audience()
 
@@ -173,20 +169,17 @@ with col_composer:
             if st.button("🚀 Send Emails (Simulation)", type="primary"):
                 with st.spinner("Sending emails..."):
                     now = datetime.utcnow().isoformat()
-                    updates = []
+                    recipients = []
                     for idx, row in selected_rows.iterrows():
-                        updates.append({
-                            "buyer_name": row["buyer_name"],
-                            "last_contacted_at": now
-                        })
+                        recipients.append(row["buyer_name"])
                         print(f"Sending email to {row['email']} for {row['buyer_name']}...")
                     
-                    res = bulk_upsert_buyers(updates)
+                    res = mark_contacted(recipients, contacted_at=now)
                     
                     if res.get("status") == "success":
-                        st.success(f"Successfully sent {len(updates)} emails!")
+                        st.success(f"Successfully sent {len(recipients)} emails!")
                         time.sleep(1)
-                        st.cache_data.clear()
+                        get_dataset().record_write()
                         st.rerun()
                     else:
                         st.error(f"Failed to update database: {res.get('message')}")
@@ -71,3 +71,55 @@ with st.form("settings_form"):
 
             st.success("Settings saved for this session!")
             st.rerun()
+st.divider()
+st.subheader("Database Connection Pool")
+
+from services.database import get_pool_stats
+
+pool = get_pool_stats()
+if pool["configured"]:
+    p1, p2, p3, p4 = st.columns(4)
+    p1.metric("Open Connections", pool["connections_open"], help=f"Max {pool['max_connections']}")
+    p2.metric("Idle (keep-alive)", pool["connections_idle"], help=f"Max {pool['max_keepalive']}")
+    p3.metric("HTTP Requests", pool["requests"])
+    p4.metric(
+        "Client Reuses", pool["reuses"], help=f"Built {pool['builds']}x, last at {pool['built_at']}"
+    )
+else:
+    st.caption("No Supabase client has been created in this process yet.")
+
+st.divider()
+st.subheader("Database Call Latency")
+
+from services.db_metrics import (
+    SLOW_CALL_SECONDS,
+    get_metrics,
+    get_slow_calls,
+    registry,
+    reset_metrics,
+)
+
+metrics = get_metrics()
+if metrics:
+    import pandas as pd
+
+    st.caption(
+        f"Per operation since {registry.since():%Y-%m-%d %H:%M:%S} (this process). Slowest p95 first."
+    )
+    ops = pd.DataFrame(metrics)
+    ops["KB sent"] = (ops.pop("bytes_sent") / 1024).round(1)
+    ops["KB received"] = (ops.pop("bytes_received") / 1024).round(1)
+    st.dataframe(ops, use_container_width=True, hide_index=True)
+
+    slow = get_slow_calls()
+    st.markdown(f"**Slowest recent calls** (over {SLOW_CALL_SECONDS:.1f}s)")
+    if slow:
+        st.dataframe(pd.DataFrame(slow), use_container_width=True, hide_index=True)
+    else:
+        st.caption("No slow calls recorded.")
+
+    if st.button("Reset Metrics"):
+        reset_metrics()
+        st.rerun()
+else:
+    st.caption("No database calls recorded in this process yet.")
@@ -0,0 +1,68 @@
+"""Merge near-duplicate buyer names into 'buyer_aliases'.
+
+Reads every buyer, clusters names that are the same company
+(services/entity_resolution.py) and upserts one alias row per non-canonical
+member. Needs migrations/0004_buyer_aliases.sql.
+
+Usage:
+    python resolve_entities.py                   # resolve and save
+    python resolve_entities.py --dry-run         # print the merges only
+    python resolve_entities.py --threshold 0.9   # stricter fuzzy matching
+"""
+
+import argparse
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+if not os.environ.get("SUPABASE_URL") or not os.environ.get("SUPABASE_KEY"):
+    print("[ERROR] Missing Supabase credentials")
+    exit()
+
+from services.entity_resolution import DEFAULT_THRESHOLD, run_entity_resolution
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve duplicate buyer names into aliases")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Minimum trigram Dice similarity to merge (default {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Print merges without writing")
+    parser.add_argument("--show", type=int, default=20, help="Aliases to print")
+    args = parser.parse_args()
+
+    result = run_entity_resolution(threshold=args.threshold, dry_run=args.dry_run)
+    if result["status"] == "error" and "stats" not in result:
+        print(f"[ERROR] {result['message']}")
+        return
+
+    stats = result["stats"]
+    print(
+        f"[INFO] {stats['names']} names -> {stats['keys']} keys, {stats['blocks']} blocks, "
+        f"{stats['pairs']} fuzzy pairs, {stats['clusters']} clusters, "
+        f"{stats['aliases']} aliases in {stats['ms'] / 1000:.1f}s"
+    )
+    for alias in result["aliases"][: args.show]:
+        print(
+            f"  {alias['alias_name']!r} -> {alias['canonical_name']!r} ({alias['method']}, {alias['score']})"
+        )
+
+    if args.dry_run:
+        print("[DONE] Dry run, nothing written")
+    elif result["status"] == "error":
+        print(f"[ERROR] Aliases not saved: {result.get('message')}")
+    else:
+        save = result["save"]
+        print(
+            f"[DONE] Saved {save.get('saved', 0)} aliases, pruned {save.get('pruned', 0)}, "
+            f"kept {save.get('manual', 0)} manual"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Keep enriching the most valuable buyers in the background.
+
+Every --interval seconds the scheduler (services/scheduler.py) ranks buyers
+by import volume, missing contact fields and staleness, skips ones
+scavenged within --skip-days or backing off after "not found", and
+enriches the top --batch with the shared LLM / search / fetch limits.
+
+Usage:
+    python schedule_enrichment.py                  # run until interrupted
+    python schedule_enrichment.py --once           # a single cycle
+    python schedule_enrichment.py --show 30        # print the ranking only
+"""
+
+import argparse
+import os
+import time
+from datetime import timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+if not os.environ.get("SUPABASE_URL") or not os.environ.get("SUPABASE_KEY"):
+    print("[ERROR] Missing Supabase credentials")
+    exit()
+
+from services.enrichment import DEFAULT_CONCURRENCY, describe_summary
+from services.scheduler import SCHEDULER_BATCH, SCHEDULER_INTERVAL, SKIP_WINDOW, EnrichmentScheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enrich the highest-value buyers on a schedule")
+    parser.add_argument("--batch", type=int, default=SCHEDULER_BATCH, help="Companies per cycle")
+    parser.add_argument(
+        "--interval", type=float, default=SCHEDULER_INTERVAL, help="Seconds between cycles"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Agent sessions at once"
+    )
+    parser.add_argument(
+        "--skip-days",
+        type=float,
+        default=SKIP_WINDOW.days,
+        help="Skip buyers scavenged within this many days",
+    )
+    parser.add_argument("--once", action="store_true", help="Run one cycle and exit")
+    parser.add_argument("--show", type=int, metavar="N", help="Print the top N candidates and exit")
+    args = parser.parse_args()
+
+    scheduler = EnrichmentScheduler(
+        batch_size=args.show or args.batch,
+        interval=args.interval,
+        concurrency=args.concurrency,
+        skip_window=timedelta(days=args.skip_days),
+        on_cycle=lambda summary: print(f"[INFO] Cycle: {describe_summary(summary)}"),
+    )
+
+    if args.show:
+        for row in scheduler.next_batch().itertuples():
+            print(
+                f"  {row.priority:6.2f}  {row.buyer_name} ({row.country or '-'}): "
+                f"{row.total_usd:,.0f} USD, need {row.need:.2f}, misses {row.misses}"
+            )
+        return
+
+    if args.once:
+        scheduler.run_cycle()
+        return
+
+    print(f"[INFO] Enriching {args.batch} companies every {args.interval:.0f}s (Ctrl+C to stop)")
+    scheduler.start()
+    try:
+        while scheduler.running:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("[INFO] Stopping after the current cycle...")
+        scheduler.stop()
+    print("[DONE] Scheduler stopped")
+
+
+if __name__ == "__main__":
+    main()
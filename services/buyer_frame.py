@@ -0,0 +1,192 @@
+"""Typed, memory-compact buyer DataFrame shared by every page.
+
+Raw 'mousa' records are normalized once per synced dataset:
+
+- text columns become Arrow-backed strings (Python strings without
+  pyarrow) with blanks and "none"/"nan"/"null" turned into missing values,
+- country columns become categoricals,
+- total_usd is float64 (missing -> 0.0), timestamps are parsed,
+- has_email / has_phone / has_website are precomputed booleans,
+- sorted filter option lists are precomputed,
+
+and the build time and memory footprint are reported alongside.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from .buyer_sync import get_buyer_sync
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401
+
+    STRING_DTYPE = pd.StringDtype("pyarrow")
+except ImportError:  # pragma: no cover - pyarrow is in requirements.txt
+    STRING_DTYPE = pd.StringDtype("python")
+
+TEXT_COLUMNS = ["buyer_name", "email", "phone", "website", "address", "company_name_english"]
+CATEGORY_COLUMNS = ["destination_country", "country_english"]
+DATETIME_COLUMNS = ["last_contacted_at", "last_scavenged_at", "updated_at"]
+# Precomputed flag -> source column
+FLAG_COLUMNS = {"has_email": "email", "has_phone": "phone", "has_website": "website"}
+# Columns every built frame has, so pages can rely on them even when empty
+REQUIRED_COLUMNS = [
+    "buyer_name",
+    "destination_country",
+    "total_usd",
+    "email",
+    "phone",
+    "website",
+    "address",
+]
+# Columns shown in (and saved from) the table editor
+EDITOR_COLUMNS = REQUIRED_COLUMNS
+
+MISSING_TEXT = ["", "none", "nan", "null"]
+
+
+class BuyerFrame:
+    """A normalized buyer frame with its filter options and build stats.
+
+    Attributes:
+        frame: The typed DataFrame (treat as read-only; it is shared).
+        options: Sorted distinct values per category column, for filters.
+        stats: rows, memory_bytes, raw_memory_bytes and build_ms.
+    """
+
+    def __init__(self, frame: pd.DataFrame, options: Dict[str, List[str]], stats: Dict[str, Any]):
+        self.frame = frame
+        self.options = options
+        self.stats = stats
+
+    def describe(self) -> str:
+        """One-line memory / build time summary for captions."""
+        return (
+            f"{self.stats['memory_bytes'] / 1_048_576:.1f} MB in memory "
+            f"(raw {self.stats['raw_memory_bytes'] / 1_048_576:.1f} MB), "
+            f"built in {self.stats['build_ms']:.0f} ms"
+        )
+
+
+def _flatten(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(v).strip() for v in value if v is not None and str(v).strip()) or None
+    return value
+
+
+def clean_text(series: pd.Series) -> pd.Series:
+    """Strip text and turn blanks and "none"/"nan"/"null" into missing values."""
+    if series.dtype == object:
+        series = series.map(_flatten)
+    text = series.astype(STRING_DTYPE).str.strip()
+    return text.mask(text.str.lower().isin(MISSING_TEXT))
+
+
+def build_buyer_frame(
+    data: pd.DataFrame | Iterable[Dict[str, Any]] | None,
+    categories: Optional[Dict[str, List[str]]] = None,
+) -> BuyerFrame:
+    """Normalize raw buyer records into a typed BuyerFrame.
+
+    Args:
+        data: Raw records or a raw DataFrame (not modified).
+        categories: Extra categories per category column, e.g. the options
+            of the full dataset when building a single page, so edits can
+            pick any known country.
+
+    Returns:
+        BuyerFrame
+    """
+    started = time.perf_counter()
+    if isinstance(data, pd.DataFrame):
+        frame = data.copy()
+    else:
+        frame = pd.DataFrame(list(data or []))
+    raw_bytes = int(frame.memory_usage(deep=True).sum())
+
+    for col in REQUIRED_COLUMNS:
+        if col not in frame.columns:
+            frame[col] = None
+
+    for col in TEXT_COLUMNS:
+        if col in frame.columns:
+            frame[col] = clean_text(frame[col])
+
+    options = {}
+    for col in CATEGORY_COLUMNS:
+        if col in frame.columns:
+            values = clean_text(frame[col])
+            known = set(values.dropna().unique()) | set((categories or {}).get(col, []))
+            frame[col] = pd.Categorical(values, categories=sorted(known))
+            options[col] = list(frame[col].cat.categories)
+
+    frame["total_usd"] = (
+        pd.to_numeric(frame["total_usd"], errors="coerce").astype("float64").fillna(0.0)
+    )
+
+    for col in DATETIME_COLUMNS:
+        if col in frame.columns:
+            frame[col] = pd.to_datetime(frame[col], utc=True, errors="coerce", format="ISO8601")
+
+    for flag, source in FLAG_COLUMNS.items():
+        frame[flag] = frame[source].notna().to_numpy(dtype=bool)
+
+    stats = {
+        "rows": len(frame),
+        "memory_bytes": int(frame.memory_usage(deep=True).sum()),
+        "raw_memory_bytes": raw_bytes,
+        "build_ms": (time.perf_counter() - started) * 1000,
+    }
+    if len(frame) >= 1000:
+        logger.info(
+            f"Built buyer frame: {len(frame)} rows, {stats['memory_bytes']:,} bytes "
+            f"in {stats['build_ms']:.0f} ms"
+        )
+    return BuyerFrame(frame, options, stats)
+
+
+def editable(frame: pd.DataFrame) -> pd.DataFrame:
+    """Copy of the editor columns with categories as free text.
+
+    Derived flags and parsed timestamps are left out so they are never
+    written back.
+    """
+    columns = [c for c in EDITOR_COLUMNS if c in frame.columns]
+    result = frame[columns].copy()
+    for col in CATEGORY_COLUMNS:
+        if col in result.columns:
+            result[col] = result[col].astype(STRING_DTYPE)
+    return result
+
+
+_frames = {}
+_frames_lock = threading.Lock()
+
+
+def get_buyer_frame(
+    profile: str = "table", max_age: float = 300, background: bool = True
+) -> BuyerFrame:
+    """Typed frame for the process-wide synced dataset of a read profile.
+
+    Rebuilt only when a sync produced a new source frame, so reruns cost
+    nothing.
+
+    Args:
+        profile: Read profile (see database.READ_PROFILES)
+        max_age: Passed to BuyerSync.refresh
+        background: Passed to BuyerSync.refresh
+    """
+    source = get_buyer_sync(profile).refresh(max_age=max_age, background=background)
+    with _frames_lock:
+        cached = _frames.get(profile)
+        if cached is not None and cached[0] is source:
+            return cached[1]
+        built = build_buyer_frame(source)
+        _frames[profile] = (source, built)
+        return built
@@ -0,0 +1,263 @@
+"""Incremental (delta) sync of the buyer table into a cached DataFrame.
+
+The first load reads the whole 'mousa' table. Later refreshes only fetch
+rows whose `updated_at` is past the high-water mark of the previous sync
+and merge them into the cached frame by buyer_name, so a refresh costs
+time proportional to churn rather than table size.
+
+Deletions are invisible to a watermark, so a full reload still runs every
+`full_every` seconds (and rows deleted by this process can be dropped
+immediately with `discard`).
+
+With `replica=True` the frame is also persisted to the local SQLite
+replica after every sync and loaded from it at construction, so a cold
+start renders the last known dataset immediately and reconciles with
+Supabase in the background. After a delta only the changed and discarded
+rows are rewritten there.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+from .database import DEFAULT_PAGE_SIZE, iter_buyers
+from .replica import load_replica, save_replica
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_COLUMN = "updated_at"
+
+# Re-read this much before the watermark: now() in the trigger is the
+# transaction start time, so rows can commit with a slightly older stamp.
+SYNC_OVERLAP_SECONDS = 120
+
+
+class BuyerSync:
+    """Buyer frame kept current by watermark-based delta sync.
+
+    Thread-safe; intended to be shared process-wide (see get_buyer_sync).
+
+    Args:
+        profile: Read profile to sync (see database.READ_PROFILES).
+        key: Unique column used to merge changed rows.
+        full_every: Seconds between full reloads that pick up deletions.
+        replica: Load from and persist to the local on-disk replica.
+    """
+
+    def __init__(
+        self,
+        profile: str = "table",
+        key: str = "buyer_name",
+        full_every: float = 3600,
+        replica: bool = False,
+    ):
+        self.profile = profile
+        self.key = key
+        self.full_every = full_every
+        self.replica = replica
+        self.frame: Optional[pd.DataFrame] = None
+        self.watermark: Optional[str] = None
+        self.last_sync: Optional[float] = None
+        self.last_full: Optional[float] = None
+        self.last_delta_rows = 0
+        self.from_replica = False
+        # mark_stale() bumps the generation; a sync clears only the one it saw
+        self._generations = itertools.count(1)
+        self._stale_gen = 0
+        self._synced_gen = 0
+        # Held for the duration of a sync; background syncs never block readers
+        self._lock = threading.Lock()
+        # Rows and keys the replica has not seen yet; None means rewrite it in full
+        self._replica_rows: Optional[pd.DataFrame] = None
+        self._replica_removed: set = set()
+
+        if replica:
+            snapshot = load_replica(profile)
+            if snapshot is not None:
+                self.frame = snapshot["frame"]
+                self.watermark = snapshot["watermark"]
+                self.last_sync = snapshot["synced_at"]
+                self.last_full = snapshot["last_full"]
+                self.from_replica = True
+                self._replica_rows = self.frame.iloc[0:0]
+
+    def _fetch(self, since: Optional[str] = None) -> pd.DataFrame:
+        chunks = list(
+            iter_buyers(
+                page_size=DEFAULT_PAGE_SIZE,
+                key=self.key,
+                profile=self.profile,
+                prefetch=True,
+                as_frame=True,
+                since=since,
+            )
+        )
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+    def _advance_watermark(self, rows: pd.DataFrame) -> None:
+        if rows.empty or WATERMARK_COLUMN not in rows.columns:
+            return
+        latest = pd.to_datetime(rows[WATERMARK_COLUMN], utc=True, errors="coerce").max()
+        if pd.isna(latest):
+            return
+        current = pd.Timestamp(self.watermark) if self.watermark else None
+        if current is None or latest > current:
+            self.watermark = latest.isoformat()
+
+    def _full_load(self) -> None:
+        frame = self._fetch()
+        self.frame = frame
+        self.watermark = None
+        self._advance_watermark(frame)
+        now = time.time()
+        self.last_sync = self.last_full = now
+        self.last_delta_rows = len(frame)
+        self._replica_rows = None
+        self._replica_removed.clear()
+        if not frame.empty and WATERMARK_COLUMN not in frame.columns:
+            logger.warning(
+                f"'{WATERMARK_COLUMN}' missing from mousa; delta sync falls back to full reloads"
+            )
+        logger.info(f"Buyer sync full load: {len(frame)} rows (watermark={self.watermark})")
+
+    def _delta_load(self) -> None:
+        since = (pd.Timestamp(self.watermark) - timedelta(seconds=SYNC_OVERLAP_SECONDS)).isoformat()
+        changed = self._fetch(since=since)
+        self.frame = merge_rows(self.frame, changed, self.key)
+        if self._replica_rows is not None:
+            self._replica_rows = pd.concat([self._replica_rows, changed], ignore_index=True)
+        self._advance_watermark(changed)
+        self.last_sync = time.time()
+        self.last_delta_rows = len(changed)
+        logger.info(f"Buyer sync delta: {len(changed)} changed rows since {since}")
+
+    @property
+    def _stale(self) -> bool:
+        return self._stale_gen != self._synced_gen
+
+    def _is_due(self, max_age: float) -> bool:
+        return self._stale or self.last_sync is None or time.time() - self.last_sync >= max_age
+
+    def _sync(self) -> None:
+        """Run one full or delta sync. Caller must hold self._lock."""
+        # A write marked stale while this sync fetches stays pending
+        generation = self._stale_gen
+        try:
+            if (
+                self.frame is None
+                or self.watermark is None
+                or time.time() - (self.last_full or 0) >= self.full_every
+            ):
+                self._full_load()
+            else:
+                self._delta_load()
+            self._synced_gen = generation
+            self.from_replica = False
+        except Exception as e:
+            logger.error(f"Buyer sync failed: {e}")
+            return
+
+        if self.replica:
+            self._save_replica()
+
+    def _save_replica(self) -> None:
+        saved = save_replica(
+            self.profile,
+            self.frame,
+            self.watermark,
+            self.last_sync,
+            self.last_full,
+            changed=self._replica_rows,
+            removed=self._replica_removed,
+            key=self.key,
+        )
+        # After a failed write the stored table is unknown, so rewrite it next time
+        self._replica_rows = self.frame.iloc[0:0] if saved else None
+        self._replica_removed = set()
+
+    def _sync_in_background(self) -> None:
+        if not self._lock.acquire(blocking=False):
+            return  # a sync is already running
+
+        def run():
+            try:
+                self._sync()
+            finally:
+                self._lock.release()
+
+        threading.Thread(target=run, name=f"buyer-sync-{self.profile}", daemon=True).start()
+
+    def refresh(self, max_age: float = 300, background: bool = False) -> pd.DataFrame:
+        """Return the synced frame, pulling changes if it is older than max_age seconds.
+
+        With background=True and a frame already in hand (e.g. from the
+        replica), the sync runs on a worker thread and the current frame is
+        returned immediately; after mark_stale() the sync always runs inline
+        so a caller sees its own writes. Network errors are logged and the
+        last good frame is returned.
+        """
+        if self._is_due(max_age):
+            if background and self.frame is not None and not self._stale:
+                self._sync_in_background()
+            else:
+                with self._lock:
+                    if self._is_due(max_age):
+                        self._sync()
+        frame = self.frame
+        return frame if frame is not None else pd.DataFrame()
+
+    def mark_stale(self) -> None:
+        """Force the next refresh to pull changes regardless of age."""
+        self._stale_gen = next(self._generations)
+
+    def discard(self, keys: Iterable[str]) -> None:
+        """Drop rows this process deleted without waiting for a full reload."""
+        keys = set(keys)
+        with self._lock:
+            if self.frame is not None and keys:
+                self.frame = self.frame[~self.frame[self.key].isin(keys)].reset_index(drop=True)
+                self._replica_removed |= keys
+                if self._replica_rows is not None and not self._replica_rows.empty:
+                    rows = self._replica_rows
+                    self._replica_rows = rows[~rows[self.key].isin(keys)]
+
+    def freshness(self) -> Optional[datetime]:
+        """Wall-clock time the frame was last reconciled with Supabase."""
+        return datetime.fromtimestamp(self.last_sync) if self.last_sync else None
+
+
+_syncs = {}
+_syncs_lock = threading.Lock()
+
+
+def get_buyer_sync(profile: str = "table") -> BuyerSync:
+    """Return the process-wide, replica-backed BuyerSync for a read profile."""
+    with _syncs_lock:
+        if profile not in _syncs:
+            _syncs[profile] = BuyerSync(profile, replica=True)
+        return _syncs[profile]
+
+
+def get_buyer_syncs() -> List[BuyerSync]:
+    """Return every BuyerSync created so far in this process."""
+    with _syncs_lock:
+        return list(_syncs.values())
+
+
+def merge_rows(
+    frame: Optional[pd.DataFrame], changed: pd.DataFrame, key: str = "buyer_name"
+) -> pd.DataFrame:
+    """Replace rows of `frame` with `changed` by key, appending new keys."""
+    if frame is None or frame.empty:
+        return changed.reset_index(drop=True)
+    if changed.empty:
+        return frame
+    changed = changed.drop_duplicates(subset=key, keep="last")
+    kept = frame[~frame[key].isin(changed[key])]
+    merged = pd.concat([kept, changed], ignore_index=True)
+    return merged.sort_values(key, kind="stable", ignore_index=True)
@@ -1,26 +1,315 @@
 import os
+import time
+import random
+import hashlib
 import logging
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+
+import httpx
+import pandas as pd
+from postgrest import APIError
+from postgrest.types import CountMethod, ReturnMethod
 from supabase import create_client, Client
+from supabase.lib.client_options import SyncClientOptions
+
+from . import db_metrics
+from .db_metrics import instrumented
+from .write_queue import WriteBehindQueue
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# HTTP connection pool shared by every Supabase call in this process
+POOL_MAX_CONNECTIONS = int(os.environ.get("SUPABASE_POOL_MAX_CONNECTIONS", "20"))
+POOL_MAX_KEEPALIVE = int(os.environ.get("SUPABASE_POOL_MAX_KEEPALIVE", "10"))
+POOL_KEEPALIVE_EXPIRY = float(os.environ.get("SUPABASE_POOL_KEEPALIVE_EXPIRY", "60"))
+HTTP_TIMEOUT = float(os.environ.get("SUPABASE_HTTP_TIMEOUT", "30"))
+
+# Rows per keyset page when streaming the 'mousa' table
+DEFAULT_PAGE_SIZE = 1000
+
+# Chunked bulk upserts: rows per request, chunks in flight, retries per chunk
+UPSERT_CHUNK_SIZE = 500
+UPSERT_MAX_WORKERS = 4
+UPSERT_MAX_RETRIES = 3
+RETRY_BASE_DELAY = 0.5
+
+# Names per mousa_mark_contacted RPC call, and per PATCH when the RPC is
+# missing (those travel in the URL, so the fallback uses smaller chunks)
+CONTACT_CHUNK_SIZE = 5000
+CONTACT_FALLBACK_CHUNK_SIZE = 200
+
+# Kinds of normalized contact rows in 'buyer_contacts'
+CONTACT_KINDS = ("email", "phone", "website")
+
+# Write-behind queue for single-row writes: seconds between flushes, rows per flush
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.environ.get("WRITE_BEHIND_FLUSH_INTERVAL", "1.0"))
+WRITE_BEHIND_MAX_BATCH = int(os.environ.get("WRITE_BEHIND_MAX_BATCH", "500"))
+
+# Seconds after which fetch_top_countries stops trusting the country rollup
+COUNTRY_ROLLUP_MAX_AGE = float(os.environ.get("COUNTRY_ROLLUP_MAX_AGE", "900"))
+
+# HTTP statuses and Postgres/PostgREST error codes that are safe to retry
+TRANSIENT_ERROR_CODES = {
+    "408",
+    "429",
+    "500",
+    "502",
+    "503",
+    "504",
+    "PGRST003",  # timed out acquiring a pool connection
+    "40001",  # serialization failure
+    "40P01",  # deadlock detected
+    "53300",  # too many connections
+    "57014",  # statement timeout
+}
+
+# Named column projections for each consumer of the 'mousa' table.
+# "full" keeps select("*"); the others skip wide columns such as `exporters`.
+# `updated_at` rides along so delta sync can track its high-water mark.
+READ_PROFILES = {
+    "full": ["*"],
+    "table": [
+        "buyer_name",
+        "destination_country",
+        "total_usd",
+        "email",
+        "phone",
+        "website",
+        "address",
+        "company_name_english",
+        "updated_at",
+    ],
+    "dashboard": ["buyer_name", "total_usd", "country_english", "updated_at"],
+    "email": [
+        "buyer_name",
+        "email",
+        "destination_country",
+        "last_contacted_at",
+        "total_usd",
+        "updated_at",
+    ],
+    "enrichment": [
+        "buyer_name",
+        "destination_country",
+        "total_usd",
+        "email",
+        "phone",
+        "website",
+        "address",
+        "last_scavenged_at",
+        "updated_at",
+    ],
+}
+
+
+class _ClientRegistry:
+    """
+    Process-wide Supabase client backed by one keep-alive HTTP pool.
+    
+    The client is built on first use and reused by every thread. It is
+    rebuilt only when SUPABASE_URL / SUPABASE_KEY change (e.g. from the
+    Settings page).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client = None
+        self._http = None
+        self._fingerprint = None
+        self._built_at = None
+        self._builds = 0
+        self._reuses = 0
+        self._requests = 0
+
+    @staticmethod
+    def _credentials_fingerprint(url: str, key: str) -> str:
+        return hashlib.sha256(f"{url}\n{key}".encode()).hexdigest()
+
+    def _count_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self._requests += 1
+
+    def _build_http_client(self) -> httpx.Client:
+        limits = httpx.Limits(
+            max_connections=POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=POOL_MAX_KEEPALIVE,
+            keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+        )
+        return httpx.Client(
+            limits=limits,
+            timeout=HTTP_TIMEOUT,
+            transport=_http_transport,
+            event_hooks={
+                "request": [self._count_request, db_metrics.on_request],
+                "response": [db_metrics.on_response],
+            },
+        )
+
+    def get(self):
+        url = os.environ.get("SUPABASE_URL")
+        key = os.environ.get("SUPABASE_KEY")
+
+        if not url or not key:
+            logger.error("SUPABASE_URL or SUPABASE_KEY not found in environment")
+            return None
+
+        fingerprint = self._credentials_fingerprint(url, key)
+        with self._lock:
+            if self._client is not None and self._fingerprint == fingerprint:
+                self._reuses += 1
+                return self._client
+
+            http_client = self._build_http_client()
+            try:
+                client = create_client(url, key, options=SyncClientOptions(httpx_client=http_client))
+            except Exception as e:
+                http_client.close()
+                logger.error(f"Failed to initialize Supabase: {e}")
+                return None
+
+            if self._http is not None:
+                # Other threads may still have requests in flight on the old
+                # pool, so it is left to close when garbage collected
+                logger.info("Supabase credentials changed, rebuilding client")
+
+            self._client = client
+            self._http = http_client
+            self._fingerprint = fingerprint
+            self._built_at = datetime.utcnow().isoformat()
+            self._builds += 1
+            return client
+
+    def reset(self) -> None:
+        """Drop the cached client and close its connection pool."""
+        with self._lock:
+            if self._http is not None:
+                self._http.close()
+            self._client = None
+            self._http = None
+            self._fingerprint = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {
+                "configured": self._client is not None,
+                "built_at": self._built_at,
+                "builds": self._builds,
+                "reuses": self._reuses,
+                "requests": self._requests,
+                "max_connections": POOL_MAX_CONNECTIONS,
+                "max_keepalive": POOL_MAX_KEEPALIVE,
+                "connections_open": 0,
+                "connections_idle": 0,
+            }
+            if self._http is not None:
+                try:
+                    # httpcore keeps its live connections on the transport pool
+                    connections = self._http._transport._pool.connections
+                    stats["connections_open"] = len(connections)
+                    stats["connections_idle"] = sum(1 for c in connections if c.is_idle())
+                except AttributeError:
+                    pass
+            return stats
+
+
+# Optional httpx transport replacing the network (e.g. the fake PostgREST
+# backend in tests); None means real HTTP connections.
+_http_transport = None
+
+_registry = _ClientRegistry()
+
+
 def get_supabase() -> Client:
-    """Initialize Supabase client from environment variables."""
-    url = os.environ.get("SUPABASE_URL")
-    key = os.environ.get("SUPABASE_KEY")
+    """Return the shared, pooled Supabase client (built once per credentials)."""
+    return _registry.get()
+
+
+def set_http_transport(transport) -> None:
+    """
+    Route all Supabase HTTP traffic (sync and async clients) through an
+    httpx transport instead of the network, e.g. an in-process fake backend.
+    Pass None to restore real connections.
+    """
+    global _http_transport
+    _http_transport = transport
+    _registry.reset()
+
+
+def reset_supabase() -> None:
+    """Close the shared client so the next call rebuilds it."""
+    _registry.reset()
+
+
+def get_pool_stats() -> dict:
+    """
+    Report usage of the shared Supabase client and its HTTP pool.
     
-    if not url or not key:
-        logger.error("SUPABASE_URL or SUPABASE_KEY not found in environment")
-        return None
-        
-    try:
-        return create_client(url, key)
-    except Exception as e:
-        logger.error(f"Failed to initialize Supabase: {e}")
-        return None
+    Returns:
+        Dict with build/reuse/request counters and open/idle connection counts
+    """
+    return _registry.stats()
+
+def _build_scavenge_payload(company_name, new_data):
+    """
+    Flatten scavenged contact lists into a 'mousa' row.
+    
+    Returns:
+        Tuple of (payload dict, email count, phone count)
+    """
+    # Clean company name
+    clean_name = company_name.strip()
+
+    # Process Emails
+    emails = new_data.get("emails", [])
+    valid_emails = []
+    if isinstance(emails, list) and emails:
+        # Filter out invalid emails
+        valid_emails = [e for e in emails if e and '@' in e]
+        email_str = ", ".join(valid_emails)
+    else:
+        email_str = None
+
+    # Process Phones
+    phones = new_data.get("phones", [])
+    valid_phones = []
+    if isinstance(phones, list) and phones:
+        # Clean phone numbers
+        valid_phones = [p for p in phones if p and len(p) >= 10]
+        phone_str = ", ".join(valid_phones)
+    else:
+        phone_str = None
+
+    # Process Website
+    website = new_data.get("website")
+    if isinstance(website, list) and website:
+        website = website[0]  # Take first if list
+    if not website or website == "null":
+        website = None
+         
+    # Process Address
+    address = new_data.get("address")
+    if isinstance(address, list) and address:
+        address = ", ".join([a for a in address if a])
+    if not address or address == "null":
+        address = None
 
+    # Construct Payload
+    payload = {
+        "buyer_name": clean_name,  # Primary Key
+        "email": email_str,
+        "phone": phone_str,
+        "website": website,
+        "address": address,
+        "last_scavenged_at": datetime.utcnow().isoformat()
+    }
+    return payload, len(valid_emails) if email_str else 0, len(valid_phones) if phone_str else 0
+
+
+@instrumented("save_scavenged_data")
 def save_scavenged_data(company_name, new_data):
     """
     Upserts scavenged data into the 'mousa' table with enhanced logging.
@@ -38,64 +327,25 @@ def save_scavenged_data(company_name, new_data):
         return {"status": "error", "message": "Supabase not configured"}
 
     try:
-        # Clean company name
-        clean_name = company_name.strip()
+        payload, email_count, phone_count = _build_scavenge_payload(company_name, new_data)
+        clean_name = payload["buyer_name"]
         logger.info(f"Saving scavenged data for: {clean_name}")
         
-        # Process Emails
-        emails = new_data.get("emails", [])
-        if isinstance(emails, list) and emails:
-            # Filter out invalid emails
-            valid_emails = [e for e in emails if e and '@' in e]
-            email_str = ", ".join(valid_emails)
-        else:
-            email_str = None
-        
-        # Process Phones
-        phones = new_data.get("phones", [])
-        if isinstance(phones, list) and phones:
-            # Clean phone numbers
-            valid_phones = [p for p in phones if p and len(p) >= 10]
-            phone_str = ", ".join(valid_phones)
-        else:
-            phone_str = None
-        
-        # Process Website
-        website = new_data.get("website")
-        if isinstance(website, list) and website:
-            website = website[0]  # Take first if list
-        if not website or website == "null":
-            website = None
-             
-        # Process Address
-        address = new_data.get("address")
-        if isinstance(address, list) and address:
-            address = ", ".join([a for a in address if a])
-        if not address or address == "null":
-            address = None
-
-        # Construct Payload
-        payload = {
-            "buyer_name": clean_name,  # Primary Key
-            "email": email_str,
-            "phone": phone_str,
-            "website": website,
-            "address": address,
-            "last_scavenged_at": datetime.utcnow().isoformat()
-        }
-        
         # Log what we're saving
-        logger.info(f"Payload: emails={bool(email_str)}, phones={bool(phone_str)}, website={bool(website)}, address={bool(address)}")
+        logger.info(f"Payload: emails={bool(payload['email'])}, phones={bool(payload['phone'])}, website={bool(payload['website'])}, address={bool(payload['address'])}")
         
         # Upsert to Supabase
         response = supabase.table("mousa").upsert(payload, on_conflict="buyer_name").execute()
         
         if response.data:
             logger.info(f"✅ Successfully saved data for {clean_name}")
+            contacts = save_contacts(_scavenge_contact_rows(clean_name, new_data))
+            if contacts["status"] == "error":
+                logger.warning(f"Contacts for {clean_name} not normalized: {contacts.get('message')}")
             return {
                 "status": "success",
                 "data": response.data,
-                "message": f"Saved {len(valid_emails) if email_str else 0} emails, {len(valid_phones) if phone_str else 0} phones"
+                "message": f"Saved {email_count} emails, {phone_count} phones"
             }
         else:
             logger.warning(f"Upsert returned no data for {clean_name}")
@@ -110,43 +360,513 @@ def upsert_company_data(data: dict):
     company = data.get("buyer_name") or data.get("company_name")
     return save_scavenged_data(company, data)
 
-def fetch_all_buyers():
+def profile_columns(profile: str = "full", key: str = "buyer_name") -> str:
     """
-    Fetches ALL records from the 'mousa' table.
+    Build the PostgREST select list for a named read profile.
     
+    Args:
+        profile: Key of READ_PROFILES
+        key: Column that must always be selected (the pagination key)
+        
     Returns:
-        List of dicts or empty list on error
+        Comma-separated column list
+        
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    if profile not in READ_PROFILES:
+        raise ValueError(f"Unknown read profile: {profile!r} (expected one of {sorted(READ_PROFILES)})")
+    columns = list(READ_PROFILES[profile])
+    if "*" not in columns and key not in columns:
+        columns.insert(0, key)
+    return ",".join(columns)
+
+
+def _buyer_page_query(supabase, columns: str, key: str, after, page_size: int, since=None):
+    """Build one keyset page request: rows with key > after, ordered by key."""
+    query = supabase.table("mousa").select(columns).order(key).limit(page_size)
+    if after is not None:
+        query = query.gt(key, after)
+    if since is not None:
+        query = query.gt("updated_at", since)
+    return query
+
+
+@instrumented("fetch_buyer_page")
+def _fetch_buyer_page(supabase, columns: str, key: str, after, page_size: int, since=None) -> list:
+    """Fetch one keyset page: rows with key > after, ordered by key."""
+    return _buyer_page_query(supabase, columns, key, after, page_size, since).execute().data or []
+
+
+def iter_buyers(
+    page_size: int = DEFAULT_PAGE_SIZE,
+    key: str = "buyer_name",
+    profile: str = "full",
+    prefetch: bool = False,
+    as_frame: bool = False,
+    since: str = None,
+):
+    """
+    Stream the 'mousa' table page by page using keyset pagination.
+    
+    Each page asks for rows whose `key` is greater than the last key seen,
+    so reading N rows costs N / page_size requests regardless of table size
+    and is not capped by PostgREST's default row limit.
+    
+    Args:
+        page_size: Rows requested per round trip
+        key: Unique, non-null column to page on (buyer_name or id)
+        profile: Read profile naming the columns to fetch (see READ_PROFILES)
+        prefetch: Fetch the next page in the background while the
+            current one is being consumed
+        as_frame: Yield one DataFrame per page instead of record dicts
+        since: Only rows whose updated_at is later than this ISO timestamp
+        
+    Yields:
+        Record dicts, or DataFrame chunks when as_frame=True
+        
+    Raises:
+        Whatever the Supabase client raises for a failed page request
     """
+    columns = profile_columns(profile, key)
     supabase = get_supabase()
     if not supabase:
         logger.error("Cannot fetch buyers: Supabase not configured")
-        return []
+        return
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        page = _fetch_buyer_page(supabase, columns, key, None, page_size, since)
+        while page:
+            next_page = None
+            if len(page) == page_size:
+                last_key = page[-1][key]
+                if executor:
+                    # Copy the context so the page is attributed to the caller's metrics
+                    next_page = executor.submit(
+                        contextvars.copy_context().run,
+                        _fetch_buyer_page, supabase, columns, key, last_key, page_size, since,
+                    )
+                else:
+                    next_page = last_key
+
+            if as_frame:
+                yield pd.DataFrame(page)
+            else:
+                yield from page
+
+            if next_page is None:
+                break
+            if executor:
+                page = next_page.result()
+            else:
+                page = _fetch_buyer_page(supabase, columns, key, next_page, page_size, since)
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+@instrumented("fetch_all_buyers")
+def fetch_all_buyers(profile: str = "full", page_size: int = DEFAULT_PAGE_SIZE):
+    """
+    Fetches ALL records from the 'mousa' table.
+    
+    Reads through iter_buyers, so results are not truncated at
+    PostgREST's 1000-row default.
+    
+    Args:
+        profile: Read profile naming the columns to fetch (see READ_PROFILES)
+        page_size: Rows requested per round trip
     
+    Returns:
+        List of dicts or empty list on error
+    """
     try:
-        # Fetch all rows (Supabase default limit is 1000)
-        # For larger datasets, implement pagination
-        response = supabase.table("mousa").select("*").execute()
-        
-        if response.data:
-            logger.info(f"Fetched {len(response.data)} buyer records")
-            return response.data
-        else:
-            logger.warning("No buyer data found in database")
-            return []
-            
+        records = list(iter_buyers(page_size=page_size, profile=profile, prefetch=True))
     except Exception as e:
         logger.error(f"Failed to fetch buyers: {e}")
         return []
 
-def bulk_upsert_buyers(records: list):
+    if records:
+        logger.info(f"Fetched {len(records)} buyer records (profile={profile})")
+    else:
+        logger.warning("No buyer data found in database")
+    return records
+
+def _escape_like(text: str) -> str:
+    """
+    Escape LIKE metacharacters so user input matches literally.
+    
+    PostgREST turns every `*` of an ilike pattern into `%` before escapes
+    are read, so a backslash cannot make it literal; it becomes `_` (any
+    single character) so it never widens the match to any run of text.
+    """
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped.replace("*", "_")
+
+
+def _buyer_query(
+    supabase, countries, name_pattern, profile, limit, offset, after,
+    order_by, descending, count, country_column,
+):
+    """Build the filtered, sorted, paged 'mousa' request issued by query_buyers."""
+    columns = profile_columns(profile)
+    if count:
+        query = supabase.table("mousa").select(columns, count=CountMethod(count))
+    else:
+        query = supabase.table("mousa").select(columns)
+
+    if countries:
+        query = query.in_(country_column, list(countries))
+    if name_pattern and name_pattern.strip():
+        query = query.ilike("buyer_name", f"*{_escape_like(name_pattern.strip())}*")
+    if after is not None:
+        query = query.lt(order_by, after) if descending else query.gt(order_by, after)
+
+    query = query.order(order_by, desc=descending)
+    if order_by != "buyer_name":
+        query = query.order("buyer_name")
+    query = query.limit(limit)
+    if offset and after is None:
+        query = query.offset(offset)
+    return query
+
+
+@instrumented("query_buyers")
+def query_buyers(
+    countries: list = None,
+    name_pattern: str = None,
+    profile: str = "table",
+    limit: int = 100,
+    offset: int = 0,
+    after=None,
+    order_by: str = "buyer_name",
+    descending: bool = False,
+    count: str = "exact",
+    country_column: str = "destination_country",
+):
+    """
+    Filter, sort and page the 'mousa' table in Postgres.
+    
+    Countries become an `in` filter (btree index on the country column)
+    and the name pattern a case-insensitive substring `ilike` on
+    buyer_name (trigram index), see supabase_schema_search.sql.
+    
+    Args:
+        countries: Only rows whose country_column is one of these
+        name_pattern: Case-insensitive substring of buyer_name
+        profile: Read profile naming the columns to fetch
+        limit: Rows per page
+        offset: Rows to skip (offset paging)
+        after: Keyset paging: only rows whose order_by value is past this
+            (use with a unique order_by such as buyer_name, instead of offset)
+        order_by: Column to sort by; buyer_name breaks ties
+        descending: Sort order_by descending
+        count: "exact", "planned", "estimated" or None for no total count
+        country_column: Column the country filter applies to
+        
+    Returns:
+        Dict with rows, count (total matches or None) and next_after
+        (keyset cursor for the following page, or None on the last page);
+        None on error
+    """
+    supabase = get_supabase()
+    if not supabase:
+        logger.error("Cannot query buyers: Supabase not configured")
+        return None
+
+    try:
+        query = _buyer_query(
+            supabase, countries, name_pattern, profile, limit, offset, after,
+            order_by, descending, count, country_column,
+        )
+        response = query.execute()
+        rows = response.data or []
+        next_after = rows[-1].get(order_by) if len(rows) == limit else None
+        return {"rows": rows, "count": response.count, "next_after": next_after}
+
+    except Exception as e:
+        logger.error(f"Buyer query failed: {e}")
+        return None
+
+
+@instrumented("fetch_buyer_summary")
+def fetch_buyer_summary():
+    """
+    Fetch the header KPIs computed server-side by the `mousa_summary` view.
+    
+    Returns:
+        Dict with total_companies, enriched_count and total_value,
+        or None if unavailable (e.g. supabase_schema_metrics.sql not applied)
+    """
+    supabase = get_supabase()
+    if not supabase:
+        return None
+
+    try:
+        response = supabase.table("mousa_summary").select("*").execute()
+        return response.data[0] if response.data else None
+    except Exception as e:
+        logger.error(f"Failed to fetch buyer summary: {e}")
+        return None
+
+
+@instrumented("fetch_country_breakdown")
+def fetch_country_breakdown(country_column: str = "destination_country", limit: int = None):
+    """
+    Fetch per-country company counts, enriched counts and value via the
+    `mousa_country_breakdown` RPC.
+    
+    Args:
+        country_column: destination_country or country_english
+        limit: Maximum countries to return (largest first), None for all
+        
+    Returns:
+        List of dicts (country, companies, enriched, total_value),
+        or None if unavailable
+    """
+    supabase = get_supabase()
+    if not supabase:
+        return None
+
+    try:
+        response = supabase.rpc(
+            "mousa_country_breakdown",
+            {"country_column": country_column, "max_rows": limit},
+        ).execute()
+        return response.data or []
+    except Exception as e:
+        logger.error(f"Failed to fetch country breakdown: {e}")
+        return None
+
+
+@instrumented("fetch_country_rollup")
+def fetch_country_rollup(country_column: str = "destination_country", limit: int = None):
+    """
+    Read per-country rollups from the `mousa_country_rollup` materialized
+    view (migrations/0003_country_rollup.sql). Cheaper than the
+    mousa_country_breakdown RPC but only as fresh as the last refresh.
+    
+    Args:
+        country_column: destination_country or country_english
+        limit: Maximum countries to return (largest first), None for all
+        
+    Returns:
+        List of dicts (country, companies, enriched, contacted, total_value,
+        refreshed_at), or None if unavailable
+    """
+    supabase = get_supabase()
+    if not supabase:
+        return None
+
+    try:
+        query = (
+            supabase.table("mousa_country_rollup")
+            .select("country,companies,enriched,contacted,total_value,refreshed_at")
+            .eq("country_column", country_column)
+            .order("companies", desc=True)
+            .order("country")
+        )
+        if limit:
+            query = query.limit(limit)
+        return query.execute().data or []
+    except Exception as e:
+        logger.error(f"Failed to fetch country rollup: {e}")
+        return None
+
+
+@instrumented("refresh_country_rollup")
+def refresh_country_rollup():
+    """
+    Recompute the `mousa_country_rollup` materialized view (concurrently,
+    readers are not blocked).
+    
+    Returns:
+        Dict with status and refreshed_at timestamp
+    """
+    supabase = get_supabase()
+    if not supabase:
+        return {"status": "error", "message": "Supabase not configured"}
+
+    try:
+        response = supabase.rpc("mousa_refresh_country_rollup", {}).execute()
+        return {"status": "success", "refreshed_at": response.data}
+    except Exception as e:
+        logger.error(f"Failed to refresh country rollup: {e}")
+        return {"status": "error", "message": str(e)}
+
+
+def _rollup_age(rows) -> float:
+    """Seconds since the rollup rows were refreshed (inf if unknown)."""
+    refreshed_at = rows[0].get("refreshed_at") if rows else None
+    if not refreshed_at:
+        return float("inf")
+    refreshed = pd.Timestamp(refreshed_at)
+    if refreshed.tzinfo is None:
+        refreshed = refreshed.tz_localize("UTC")
+    return (pd.Timestamp.now(tz="UTC") - refreshed).total_seconds()
+
+
+def fetch_top_countries(country_column: str = "destination_country", limit: int = None,
+                        max_age: float = COUNTRY_ROLLUP_MAX_AGE):
+    """
+    Per-country counts for the dashboard: the materialized rollup while it
+    is fresh, the live mousa_country_breakdown RPC otherwise.
+    
+    The rollup is refreshed after bulk writes (import_to_db, finished
+    scavenge and enrichment jobs); other writes show up live once the
+    rollup is older than `max_age` seconds.
+    
+    Args:
+        country_column: destination_country or country_english
+        limit: Maximum countries to return (largest first), None for all
+        max_age: Oldest rollup (seconds since refreshed_at) still served
+        
+    Returns:
+        List of dicts (country, companies, ...), or None if unavailable
+    """
+    rows = fetch_country_rollup(country_column, limit=limit)
+    if rows and _rollup_age(rows) <= max_age:
+        return rows
+    return fetch_country_breakdown(country_column, limit=limit)
+
+
+def _is_transient(exc: Exception) -> bool:
+    """True for network failures and server-side errors worth retrying."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, APIError):
+        return str(exc.code) in TRANSIENT_ERROR_CODES
+    return False
+
+
+def _dedupe_records(records: list) -> list:
+    """
+    Merge records that share a buyer_name, later values winning.
+    
+    Postgres rejects an upsert that touches the same row twice (error
+    21000, not retried), so a duplicate name would fail its whole chunk.
+    """
+    merged = {}
+    unnamed = []
+    for record in records:
+        name = record.get("buyer_name")
+        if name is None:
+            unnamed.append(record)
+        else:
+            merged[name] = {**merged[name], **record} if name in merged else record
+    return list(merged.values()) + unnamed
+
+
+def _chunk_records(records: list, chunk_size: int) -> list:
+    """
+    Split records into chunks that share the same set of keys.
+    
+    PostgREST fills keys missing from some rows of a bulk upsert with NULL,
+    so rows with different columns must never travel in the same request.
+    """
+    groups = {}
+    for record in records:
+        groups.setdefault(tuple(sorted(record)), []).append(record)
+
+    chunks = []
+    for group in groups.values():
+        for start in range(0, len(group), chunk_size):
+            chunks.append(group[start:start + chunk_size])
+    return chunks
+
+
+def _plan_upsert(records: list, chunk_size: int) -> list:
+    """Merge duplicate names, then chunk the records for bulk_upsert_buyers."""
+    unique = _dedupe_records(records)
+    if len(unique) < len(records):
+        logger.warning(f"Merged {len(records) - len(unique)} records with duplicate buyer_name")
+    chunks = _chunk_records(unique, max(1, chunk_size))
+    logger.info(f"Bulk upserting {len(unique)} records in {len(chunks)} chunks")
+    return chunks
+
+
+def _chunk_report(index: int, chunk: list, attempts: int, error: Exception = None) -> dict:
+    """Outcome of one upsert chunk; failed chunks list their names for a retry."""
+    report = {"index": index, "rows": len(chunk), "status": "success", "attempts": attempts}
+    if error is not None:
+        report.update(
+            status="error",
+            error=str(error),
+            failed_names=[r.get("buyer_name") for r in chunk],
+        )
+    return report
+
+
+def _upsert_report(reports: list) -> dict:
+    """Combine per-chunk reports into the bulk_upsert_buyers result."""
+    failed_names = [name for r in reports for name in r.get("failed_names", [])]
+    upserted = sum(r["rows"] for r in reports if r["status"] == "success")
+
+    if not failed_names:
+        logger.info(f"✅ Successfully upserted {upserted} records")
+        status, message = "success", f"Upserted {upserted} records"
+    elif upserted:
+        status = "partial"
+        message = f"Upserted {upserted} records; {len(failed_names)} failed"
+    else:
+        status = "error"
+        message = next(r["error"] for r in reports if r["status"] == "error")
+
+    return {
+        "status": status,
+        "message": message,
+        "upserted": upserted,
+        "chunks": list(reports),
+        "failed_names": failed_names,
+    }
+
+
+def _upsert_chunk(supabase, index: int, chunk: list, max_retries: int) -> dict:
+    """Upsert one chunk, retrying transient failures with jittered backoff."""
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            supabase.table("mousa").upsert(
+                chunk, on_conflict="buyer_name", returning=ReturnMethod.minimal
+            ).execute()
+            return _chunk_report(index, chunk, attempts)
+        except Exception as e:
+            if attempts > max_retries or not _is_transient(e):
+                logger.error(f"Chunk {index} ({len(chunk)} rows) failed after {attempts} attempts: {e}")
+                return _chunk_report(index, chunk, attempts, e)
+            delay = RETRY_BASE_DELAY * (2 ** (attempts - 1))
+            delay = random.uniform(0, delay)  # full jitter
+            db_metrics.add_retry()
+            logger.warning(f"Chunk {index} transient error ({e}); retry {attempts} in {delay:.2f}s")
+            time.sleep(delay)
+
+
+@instrumented("bulk_upsert_buyers")
+def bulk_upsert_buyers(
+    records: list,
+    chunk_size: int = UPSERT_CHUNK_SIZE,
+    max_workers: int = UPSERT_MAX_WORKERS,
+    max_retries: int = UPSERT_MAX_RETRIES,
+):
     """
     Bulk upsert a list of buyer records to 'mousa'.
     
+    Records sharing a buyer_name are merged (later values win), then split
+    into chunks (rows with identical keys only) that are sent concurrently over the shared connection pool. Transient failures
+    are retried with jittered exponential backoff; a failing chunk does
+    not abort the others.
+    
     Args:
         records: List of dicts with buyer data
+        chunk_size: Maximum rows per request
+        max_workers: Maximum chunks in flight at once
+        max_retries: Retries per chunk for transient errors
         
     Returns:
-        Dict with status and message
+        Dict with status (success/partial/error), message, upserted count,
+        per-chunk report under `chunks` and `failed_names` to retry
     """
     supabase = get_supabase()
     if not supabase:
@@ -155,22 +875,55 @@ def bulk_upsert_buyers(records: list):
     if not records:
         return {"status": "skipped", "message": "No records to save"}
 
-    try:
-        logger.info(f"Bulk upserting {len(records)} records")
-        
-        # Supabase bulk upsert
-        response = supabase.table("mousa").upsert(records, on_conflict="buyer_name").execute()
+    chunks = _plan_upsert(records, chunk_size)
+
+    workers = max(1, min(max_workers, len(chunks)))
+    if workers == 1:
+        reports = [_upsert_chunk(supabase, i, chunk, max_retries) for i, chunk in enumerate(chunks)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, _upsert_chunk, supabase, i, chunk, max_retries)
+                for i, chunk in enumerate(chunks)
+            ]
+            reports = [f.result() for f in futures]
+
+    return _upsert_report(reports)
+
+@instrumented("delete_buyers")
+def delete_buyers(buyer_names: list, chunk_size: int = 200):
+    """
+    Delete buyer records from 'mousa' by buyer_name.
+    
+    Args:
+        buyer_names: buyer_name values to delete
+        chunk_size: Names per request (keeps the URL filter short)
         
-        if response.data:
-            logger.info(f"✅ Successfully upserted {len(response.data)} records")
-            return {"status": "success", "data": response.data}
-        else:
-            return {"status": "warning", "message": "Bulk upsert completed but no data returned"}
-            
+    Returns:
+        Dict with status, deleted count and optional message
+    """
+    supabase = get_supabase()
+    if not supabase:
+        return {"status": "error", "message": "Supabase not configured"}
+
+    if not buyer_names:
+        return {"status": "skipped", "message": "No records to delete"}
+
+    deleted = 0
+    try:
+        for start in range(0, len(buyer_names), chunk_size):
+            chunk = buyer_names[start:start + chunk_size]
+            response = supabase.table("mousa").delete().in_("buyer_name", chunk).execute()
+            deleted += len(response.data or [])
+
+        logger.info(f"Deleted {deleted} of {len(buyer_names)} requested records")
+        return {"status": "success", "deleted": deleted}
+
     except Exception as e:
-        logger.error(f"Bulk upsert failed: {e}")
-        return {"status": "error", "message": str(e)}
+        logger.error(f"Delete failed after {deleted} records: {e}")
+        return {"status": "error", "deleted": deleted, "message": str(e)}
 
+@instrumented("update_contact_timestamp")
 def update_contact_timestamp(company_name: str):
     """
     Update last_contacted_at timestamp for email tracking.
@@ -202,3 +955,506 @@ def update_contact_timestamp(company_name: str):
     except Exception as e:
         logger.error(f"Failed to update contact timestamp: {e}")
         return {"status": "error", "message": str(e)}
+
+
+def _mark_contacted_chunk(supabase, chunk: list, contacted_at: str, max_retries: int) -> int:
+    """Stamp one chunk via the RPC, retrying transient failures. Returns rows updated."""
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            response = supabase.rpc(
+                "mousa_mark_contacted",
+                {"buyer_names": chunk, "contacted_at": contacted_at},
+            ).execute()
+            return int(response.data or 0)
+        except Exception as e:
+            if attempts > max_retries or not _is_transient(e):
+                raise
+            delay = random.uniform(0, RETRY_BASE_DELAY * (2 ** (attempts - 1)))
+            logger.warning(f"mark_contacted transient error ({e}); retry {attempts} in {delay:.2f}s")
+            db_metrics.add_retry()
+            time.sleep(delay)
+
+
+def _mark_contacted_fallback(supabase, chunk: list, contacted_at: str) -> int:
+    """Stamp one chunk with filtered PATCHes (schema without the RPC)."""
+    updated = 0
+    for start in range(0, len(chunk), CONTACT_FALLBACK_CHUNK_SIZE):
+        names = chunk[start:start + CONTACT_FALLBACK_CHUNK_SIZE]
+        response = (
+            supabase.table("mousa")
+            .update({"last_contacted_at": contacted_at}, count=CountMethod.exact, returning=ReturnMethod.minimal)
+            .in_("buyer_name", names)
+            .execute()
+        )
+        updated += response.count or 0
+    return updated
+
+
+@instrumented("mark_contacted")
+def mark_contacted(
+    buyer_names: list,
+    contacted_at: str = None,
+    chunk_size: int = CONTACT_CHUNK_SIZE,
+    max_retries: int = UPSERT_MAX_RETRIES,
+):
+    """
+    Set last_contacted_at for many companies at once.
+    
+    Each chunk of names is one `mousa_mark_contacted` RPC call, a single
+    UPDATE ... WHERE buyer_name = ANY(...) in Postgres (see
+    supabase_schema_email.sql), so only the names travel over the wire.
+    Unknown names are ignored rather than inserted. Falls back to
+    filtered PATCH requests when the RPC is not installed.
+    
+    Args:
+        buyer_names: buyer_name values to stamp
+        contacted_at: ISO timestamp; defaults to now (UTC)
+        chunk_size: Names per request
+        max_retries: Retries per chunk for transient errors
+        
+    Returns:
+        Dict with status (success/partial/error), message, updated count,
+        requested count and failed_names to retry
+    """
+    supabase = get_supabase()
+    if not supabase:
+        return {"status": "error", "message": "Supabase not configured"}
+
+    names = list(dict.fromkeys(n.strip() for n in buyer_names if n and n.strip()))
+    if not names:
+        return {"status": "skipped", "message": "No companies to mark"}
+
+    contacted_at = contacted_at or datetime.utcnow().isoformat()
+    chunk_size = max(1, chunk_size)
+    use_rpc = True
+    updated = 0
+    failed_names = []
+    errors = []
+
+    for start in range(0, len(names), chunk_size):
+        chunk = names[start:start + chunk_size]
+        try:
+            if use_rpc:
+                try:
+                    updated += _mark_contacted_chunk(supabase, chunk, contacted_at, max_retries)
+                    continue
+                except APIError as e:
+                    if e.code not in ("PGRST202", "404"):
+                        raise
+                    logger.warning("mousa_mark_contacted RPC not installed; falling back to PATCH")
+                    use_rpc = False
+            updated += _mark_contacted_fallback(supabase, chunk, contacted_at)
+        except Exception as e:
+            logger.error(f"Failed to mark {len(chunk)} companies as contacted: {e}")
+            failed_names.extend(chunk)
+            errors.append(str(e))
+
+    if not failed_names:
+        logger.info(f"Marked {updated} of {len(names)} companies as contacted")
+        status, message = "success", f"Marked {updated} companies as contacted"
+    elif len(failed_names) < len(names):
+        status = "partial"
+        message = f"Marked {updated} companies; {len(failed_names)} failed"
+    else:
+        status, message = "error", errors[0]
+
+    return {
+        "status": status,
+        "message": message,
+        "updated": updated,
+        "requested": len(names),
+        "failed_names": failed_names,
+    }
+
+
+# --- Normalized contacts ('buyer_contacts', see supabase_schema_contacts.sql) ---
+
+def normalize_contact(kind: str, value) -> str:
+    """
+    Canonical form of a contact value, or None if it is not usable.
+    
+    Emails are lower-cased and must contain '@', phones need at least 10
+    characters (as in save_scavenged_data), websites lose a trailing '/'.
+    """
+    if kind not in CONTACT_KINDS:
+        raise ValueError(f"Unknown contact kind '{kind}'. Expected one of {CONTACT_KINDS}")
+    if value is None:
+        return None
+    text = str(value).strip()
+    if not text or text.lower() in ("none", "nan", "null"):
+        return None
+    if kind == "email":
+        return text.lower() if "@" in text.strip("@") else None
+    if kind == "phone":
+        return text if len(text) >= 10 else None
+    return text.rstrip("/")
+
+
+def contact_rows(buyer_name: str, contacts: dict, source_url: str = None, found_at: str = None) -> list:
+    """
+    Build deduplicated 'buyer_contacts' rows for one buyer.
+    
+    Args:
+        buyer_name: Owning buyer
+        contacts: Mapping of kind -> value or list of values; comma-joined
+            strings (the legacy mousa format) are split
+        source_url: Page the contacts were found on
+        found_at: ISO timestamp; defaults to now (UTC)
+        
+    Returns:
+        List of row dicts, empty if nothing valid
+    """
+    found_at = found_at or datetime.utcnow().isoformat()
+    rows, seen = [], set()
+    for kind, values in contacts.items():
+        if isinstance(values, str):
+            values = values.split(",")
+        elif not isinstance(values, (list, tuple, set)):
+            values = [values]
+        for value in values:
+            value = normalize_contact(kind, value)
+            if value is None or (kind, value) in seen:
+                continue
+            seen.add((kind, value))
+            rows.append({
+                "buyer_name": buyer_name,
+                "kind": kind,
+                "value": value,
+                "source_url": source_url,
+                "found_at": found_at,
+            })
+    return rows
+
+
+def _scavenge_contact_rows(company_name, new_data) -> list:
+    return contact_rows(
+        company_name,
+        {
+            "email": new_data.get("emails") or [],
+            "phone": new_data.get("phones") or [],
+            "website": new_data.get("website") or [],
+        },
+        source_url=new_data.get("source_url"),
+    )
+
+
+@instrumented("save_contacts")
+def save_contacts(rows: list, chunk_size: int = UPSERT_CHUNK_SIZE):
+    """
+    Insert contact rows into 'buyer_contacts', skipping ones already stored.
+    
+    The (buyer_name, kind, value) unique constraint does the dedupe, so the
+    first found_at / source_url of a contact is kept.
+    
+    Args:
+        rows: Rows from contact_rows()
+        chunk_size: Rows per request
+        
+    Returns:
+        Dict with status, saved (rows sent) and optional message
+    """
+    supabase = get_supabase()
+    if not supabase:
+        return {"status": "error", "message": "Supabase not configured"}
+
+    if not rows:
+        return {"status": "skipped", "message": "No contacts to save"}
+
+    saved = 0
+    try:
+        for start in range(0, len(rows), max(1, chunk_size)):
+            chunk = rows[start:start + chunk_size]
+            supabase.table("buyer_contacts").upsert(
+                chunk,
+                on_conflict="buyer_name,kind,value",
+                ignore_duplicates=True,
+                returning=ReturnMethod.minimal,
+            ).execute()
+            saved += len(chunk)
+        return {"status": "success", "saved": saved}
+    except Exception as e:
+        logger.error(f"Failed to save contacts after {saved} rows: {e}")
+        return {"status": "error", "saved": saved, "message": str(e)}
+
+
+@instrumented("fetch_contacts")
+def fetch_contacts(buyer_names: list = None, kind: str = None, chunk_size: int = 200):
+    """
+    Fetch normalized contacts, optionally for given buyers and/or one kind.
+    
+    Args:
+        buyer_names: Only contacts of these buyers (None for all)
+        kind: email, phone or website (None for all)
+        chunk_size: Names per request (keeps the URL filter short)
+        
+    Returns:
+        List of row dicts ordered by buyer, kind and found_at; None on error
+    """
+    supabase = get_supabase()
+    if not supabase:
+        return None
+
+    columns = "buyer_name,kind,value,domain,source_url,found_at"
+
+    def query(select: str = columns):
+        q = supabase.table("buyer_contacts").select(select)
+        return q.eq("kind", kind) if kind else q
+
+    try:
+        rows = []
+        if buyer_names is None:
+            last_id = None
+            while True:  # keyset over the primary key
+                q = query(f"id,{columns}").order("id").limit(DEFAULT_PAGE_SIZE)
+                if last_id is not None:
+                    q = q.gt("id", last_id)
+                page = q.execute().data or []
+                rows.extend(page)
+                if len(page) < DEFAULT_PAGE_SIZE:
+                    break
+                last_id = page[-1]["id"]
+            for row in rows:
+                row.pop("id", None)
+        else:
+            names = list(dict.fromkeys(n.strip() for n in buyer_names if n))
+            for start in range(0, len(names), chunk_size):
+                rows.extend(query().in_("buyer_name", names[start:start + chunk_size]).execute().data or [])
+        rows.sort(key=lambda r: (r["buyer_name"], r["kind"], r.get("found_at") or ""))
+        return rows
+    except Exception as e:
+        logger.error(f"Failed to fetch contacts: {e}")
+        return None
+
+
+@instrumented("count_buyers_with_contact")
+def count_buyers_with_contact(kind: str = "email"):
+    """
+    Number of buyers with at least one contact of `kind`, from the
+    `buyer_contact_counts` view.
+    
+    Returns:
+        Int, or None if unavailable
+    """
+    supabase = get_supabase()
+    if not supabase:
+        return None
+
+    try:
+        response = supabase.table("buyer_contact_counts").select("buyers").eq("kind", kind).execute()
+        return int(response.data[0]["buyers"]) if response.data else 0
+    except Exception as e:
+        logger.error(f"Failed to count buyers with {kind}: {e}")
+        return None
+
+
+@instrumented("find_contacts_by_domain")
+def find_contacts_by_domain(domain: str):
+    """
+    Email contacts at a domain (indexed lookup on buyer_contacts.domain).
+    
+    Args:
+        domain: e.g. "example.com"; a leading '@' or 'www.' is ignored
+        
+    Returns:
+        List of row dicts (buyer_name, value, source_url, found_at); None on error
+    """
+    supabase = get_supabase()
+    if not supabase:
+        return None
+
+    domain = domain.strip().lower().lstrip("@")
+    if domain.startswith("www."):
+        domain = domain[4:]
+    try:
+        response = (
+            supabase.table("buyer_contacts")
+            .select("buyer_name,value,source_url,found_at")
+            .eq("domain", domain)
+            .order("buyer_name")
+            .execute()
+        )
+        return response.data or []
+    except Exception as e:
+        logger.error(f"Failed to look up contacts for domain {domain}: {e}")
+        return None
+
+
+def _manual_aliases(supabase) -> set:
+    """alias_names curated by hand (method 'manual')."""
+    names = set()
+    last = None
+    while True:  # keyset over the primary key
+        q = (
+            supabase.table("buyer_aliases").select("alias_name")
+            .eq("method", "manual").order("alias_name").limit(DEFAULT_PAGE_SIZE)
+        )
+        if last is not None:
+            q = q.gt("alias_name", last)
+        page = q.execute().data or []
+        names.update(r["alias_name"] for r in page)
+        if len(page) < DEFAULT_PAGE_SIZE:
+            return names
+        last = page[-1]["alias_name"]
+
+
+@instrumented("save_aliases")
+def save_aliases(rows: list, chunk_size: int = UPSERT_CHUNK_SIZE, prune_before: str = None):
+    """
+    Upsert resolved alias rows into 'buyer_aliases'.
+    
+    Aliases curated by hand (method 'manual') are never overwritten: rows
+    for those alias names are dropped before the upsert.
+    
+    Args:
+        rows: Alias dicts from entity_resolution.resolve_entities()
+        chunk_size: Rows per request
+        prune_before: ISO timestamp; non-manual aliases resolved before it
+            (i.e. not confirmed by this run) are deleted afterwards
+        
+    Returns:
+        Dict with status, saved, pruned, manual (rows skipped because a
+        manual alias exists) and optional message
+    """
+    supabase = get_supabase()
+    if not supabase:
+        return {"status": "error", "message": "Supabase not configured"}
+
+    if not rows and not prune_before:
+        return {"status": "skipped", "message": "No aliases to save"}
+
+    saved = 0
+    try:
+        manual = _manual_aliases(supabase)
+        kept = [r for r in rows if r.get("method") == "manual" or r["alias_name"] not in manual]
+        skipped = len(rows) - len(kept)
+        rows = kept
+        for start in range(0, len(rows), max(1, chunk_size)):
+            chunk = rows[start:start + chunk_size]
+            supabase.table("buyer_aliases").upsert(
+                chunk,
+                on_conflict="alias_name",
+                returning=ReturnMethod.minimal,
+            ).execute()
+            saved += len(chunk)
+
+        pruned = 0
+        if prune_before:
+            response = (
+                supabase.table("buyer_aliases").delete(count=CountMethod.exact, returning=ReturnMethod.minimal)
+                .lt("resolved_at", prune_before)
+                .neq("method", "manual")
+                .execute()
+            )
+            pruned = response.count or 0
+        logger.info(f"Saved {saved} aliases, pruned {pruned}, kept {skipped} manual")
+        return {"status": "success", "saved": saved, "pruned": pruned, "manual": skipped}
+    except Exception as e:
+        logger.error(f"Failed to save aliases after {saved} rows: {e}")
+        return {"status": "error", "saved": saved, "message": str(e)}
+
+
+@instrumented("fetch_aliases")
+def fetch_aliases():
+    """
+    All resolved aliases as {alias_name: canonical_name}.
+    
+    Returns:
+        Dict, or None if unavailable
+    """
+    supabase = get_supabase()
+    if not supabase:
+        return None
+
+    try:
+        aliases = {}
+        last = None
+        while True:  # keyset over the primary key
+            q = supabase.table("buyer_aliases").select("alias_name,canonical_name").order("alias_name").limit(DEFAULT_PAGE_SIZE)
+            if last is not None:
+                q = q.gt("alias_name", last)
+            page = q.execute().data or []
+            aliases.update((r["alias_name"], r["canonical_name"]) for r in page)
+            if len(page) < DEFAULT_PAGE_SIZE:
+                return aliases
+            last = page[-1]["alias_name"]
+    except Exception as e:
+        logger.error(f"Failed to fetch aliases: {e}")
+        return None
+
+
+# --- Write-behind (coalesced, batched) single-row writes ---
+
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+
+def _merge_queued(pending: dict, row: dict) -> None:
+    """Later mousa values win; contact rows of both scavenges are kept."""
+    contacts = pending.get("_contacts", []) + row.get("_contacts", [])
+    pending.update(row)
+    if contacts:
+        pending["_contacts"] = contacts
+
+
+def _write_queued(rows: list) -> dict:
+    """Write-behind sink: one bulk upsert, then the rows' normalized contacts."""
+    contacts = [c for row in rows for c in row.pop("_contacts", [])]
+    result = bulk_upsert_buyers(rows)
+    failed = set(result.get("failed_names") or [])
+    if result["status"] == "error" and not failed:
+        return result
+    contacts = [c for c in contacts if c["buyer_name"] not in failed]
+    saved = save_contacts(contacts)
+    if saved["status"] == "error":
+        logger.warning(f"Queued contacts not normalized: {saved.get('message')}")
+    return result
+
+
+def get_write_queue() -> WriteBehindQueue:
+    """Return the process-wide write-behind queue, starting it on first use."""
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is None:
+            _write_queue = WriteBehindQueue(
+                _write_queued,
+                flush_interval=WRITE_BEHIND_FLUSH_INTERVAL,
+                max_batch=WRITE_BEHIND_MAX_BATCH,
+                merge=_merge_queued,
+            )
+        return _write_queue
+
+
+def queue_scavenged_data(company_name, new_data) -> Future:
+    """
+    Non-blocking save_scavenged_data: the row and its buyer_contacts rows
+    are merged into the write-behind queue and written with the next
+    batched upserts. Bulk enrichment saves through this, so companies
+    finishing close together share one round trip.
+    
+    Returns:
+        Future resolving to a dict with status success/error
+    """
+    payload, _, _ = _build_scavenge_payload(company_name, new_data)
+    payload["_contacts"] = _scavenge_contact_rows(payload["buyer_name"], new_data)
+    return get_write_queue().submit(payload)
+
+
+def queue_contact_timestamp(company_name: str) -> Future:
+    """
+    Non-blocking update_contact_timestamp via the write-behind queue.
+    
+    Returns:
+        Future resolving to a dict with status success/error
+    """
+    return get_write_queue().submit({
+        "buyer_name": company_name.strip(),
+        "last_contacted_at": datetime.utcnow().isoformat()
+    })
+
+
+def flush_writes() -> None:
+    """Write everything pending in the write-behind queue before returning."""
+    if _write_queue is not None:
+        _write_queue.flush()
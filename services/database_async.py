@@ -0,0 +1,350 @@
+"""Async variant of services.database on a pooled httpx.AsyncClient.
+
+Same semantics and return values as the synchronous functions, so a
+scavenge, its save and timestamp updates can share one event loop and be
+pipelined (in Streamlit callbacks via a single asyncio.run, or in a
+headless batch runner).
+
+An async HTTP pool is bound to the event loop that created it, so one
+client is kept per running loop and rebuilt when credentials change.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import weakref
+from datetime import datetime
+
+import httpx
+from postgrest.types import ReturnMethod
+from supabase import AsyncClient, acreate_client
+from supabase.lib.client_options import AsyncClientOptions
+
+from . import database, db_metrics
+from .database import (
+    DEFAULT_PAGE_SIZE,
+    HTTP_TIMEOUT,
+    POOL_KEEPALIVE_EXPIRY,
+    POOL_MAX_CONNECTIONS,
+    POOL_MAX_KEEPALIVE,
+    UPSERT_CHUNK_SIZE,
+    UPSERT_MAX_RETRIES,
+    UPSERT_MAX_WORKERS,
+    _build_scavenge_payload,
+    _buyer_page_query,
+    _chunk_report,
+    _is_transient,
+    _plan_upsert,
+    _scavenge_contact_rows,
+    _upsert_report,
+    profile_columns,
+)
+from .db_metrics import instrumented
+
+logger = logging.getLogger(__name__)
+
+# loop -> ((url, key, transport), client, http pool)
+_clients = weakref.WeakKeyDictionary()
+# loop -> asyncio.Lock, so concurrent first calls on a loop build one client
+_locks = weakref.WeakKeyDictionary()
+
+
+async def get_supabase() -> AsyncClient:
+    """Return the pooled async Supabase client for the running event loop."""
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_KEY")
+
+    if not url or not key:
+        logger.error("SUPABASE_URL or SUPABASE_KEY not found in environment")
+        return None
+
+    loop = asyncio.get_running_loop()
+    cached = _clients.get(loop)
+    if cached is not None and cached[0] == (url, key, database._http_transport):
+        return cached[1]
+
+    async with _locks.setdefault(loop, asyncio.Lock()):
+        return await _build_client(loop, url, key)
+
+
+async def _build_client(loop, url: str, key: str) -> AsyncClient:
+    """Create (or reuse) the loop's client. Caller holds the loop's lock."""
+    cached = _clients.get(loop)
+    if cached is not None and cached[0] == (url, key, database._http_transport):
+        return cached[1]
+
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=POOL_MAX_KEEPALIVE,
+            keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+        ),
+        timeout=HTTP_TIMEOUT,
+        transport=database._http_transport,
+        event_hooks={
+            "request": [db_metrics.on_request_async],
+            "response": [db_metrics.on_response_async],
+        },
+    )
+    try:
+        client = await acreate_client(
+            url, key, options=AsyncClientOptions(httpx_client=http_client)
+        )
+    except Exception as e:
+        await http_client.aclose()
+        logger.error(f"Failed to initialize async Supabase: {e}")
+        return None
+
+    if cached is not None:
+        await cached[2].aclose()
+    _clients[loop] = ((url, key, database._http_transport), client, http_client)
+    return client
+
+
+async def close_supabase() -> None:
+    """Close the running loop's client; call before the loop shuts down."""
+    cached = _clients.pop(asyncio.get_running_loop(), None)
+    if cached is not None:
+        await cached[2].aclose()
+
+
+@instrumented("save_scavenged_data_async")
+async def save_scavenged_data(company_name, new_data):
+    """
+    Async save_scavenged_data: upserts scavenged data into 'mousa'.
+
+    Returns:
+        Dict with status: success/error and optional message
+    """
+    supabase = await get_supabase()
+    if not supabase:
+        logger.warning("Supabase credentials missing. Skipping save.")
+        return {"status": "error", "message": "Supabase not configured"}
+
+    try:
+        payload, email_count, phone_count = _build_scavenge_payload(company_name, new_data)
+        clean_name = payload["buyer_name"]
+        logger.info(f"Saving scavenged data for: {clean_name}")
+
+        response = await supabase.table("mousa").upsert(payload, on_conflict="buyer_name").execute()
+
+        if response.data:
+            logger.info(f"✅ Successfully saved data for {clean_name}")
+            contacts = await save_contacts(_scavenge_contact_rows(clean_name, new_data))
+            if contacts["status"] == "error":
+                logger.warning(
+                    f"Contacts for {clean_name} not normalized: {contacts.get('message')}"
+                )
+            return {
+                "status": "success",
+                "data": response.data,
+                "message": f"Saved {email_count} emails, {phone_count} phones",
+            }
+        else:
+            logger.warning(f"Upsert returned no data for {clean_name}")
+            return {"status": "warning", "message": "Upsert completed but no data returned"}
+
+    except Exception as e:
+        logger.error(f"Supabase upsert failed for {company_name}: {e}")
+        return {"status": "error", "message": str(e)}
+
+
+@instrumented("save_contacts_async")
+async def save_contacts(rows: list, chunk_size: int = UPSERT_CHUNK_SIZE):
+    """
+    Async save_contacts: inserts rows into 'buyer_contacts', skipping duplicates.
+
+    Returns:
+        Same dict as database.save_contacts
+    """
+    supabase = await get_supabase()
+    if not supabase:
+        return {"status": "error", "message": "Supabase not configured"}
+
+    if not rows:
+        return {"status": "skipped", "message": "No contacts to save"}
+
+    saved = 0
+    try:
+        for start in range(0, len(rows), max(1, chunk_size)):
+            chunk = rows[start : start + chunk_size]
+            await (
+                supabase.table("buyer_contacts")
+                .upsert(
+                    chunk,
+                    on_conflict="buyer_name,kind,value",
+                    ignore_duplicates=True,
+                    returning=ReturnMethod.minimal,
+                )
+                .execute()
+            )
+            saved += len(chunk)
+        return {"status": "success", "saved": saved}
+    except Exception as e:
+        logger.error(f"Failed to save contacts after {saved} rows: {e}")
+        return {"status": "error", "saved": saved, "message": str(e)}
+
+
+@instrumented("fetch_buyer_page_async")
+async def _fetch_buyer_page(supabase, columns, key, after, page_size, since=None) -> list:
+    query = _buyer_page_query(supabase, columns, key, after, page_size, since)
+    return (await query.execute()).data or []
+
+
+async def iter_buyers(
+    page_size: int = DEFAULT_PAGE_SIZE,
+    key: str = "buyer_name",
+    profile: str = "full",
+    prefetch: bool = False,
+    since: str = None,
+):
+    """
+    Async generator over the 'mousa' table using keyset pagination.
+
+    With prefetch=True the next page is requested as a task while the
+    current one is being consumed.
+
+    Yields:
+        Record dicts
+    """
+    columns = profile_columns(profile, key)
+    supabase = await get_supabase()
+    if not supabase:
+        logger.error("Cannot fetch buyers: Supabase not configured")
+        return
+
+    page = await _fetch_buyer_page(supabase, columns, key, None, page_size, since)
+    while page:
+        next_page = None
+        if len(page) == page_size and prefetch:
+            next_page = asyncio.ensure_future(
+                _fetch_buyer_page(supabase, columns, key, page[-1][key], page_size, since)
+            )
+        try:
+            for record in page:
+                yield record
+        except BaseException:
+            if next_page:
+                next_page.cancel()
+            raise
+
+        if len(page) < page_size:
+            break
+        if next_page:
+            page = await next_page
+        else:
+            page = await _fetch_buyer_page(supabase, columns, key, page[-1][key], page_size, since)
+
+
+@instrumented("fetch_all_buyers_async")
+async def fetch_all_buyers(profile: str = "full", page_size: int = DEFAULT_PAGE_SIZE):
+    """
+    Async fetch_all_buyers: every record of 'mousa' for a read profile.
+
+    Returns:
+        List of dicts or empty list on error
+    """
+    try:
+        records = [
+            r async for r in iter_buyers(page_size=page_size, profile=profile, prefetch=True)
+        ]
+    except Exception as e:
+        logger.error(f"Failed to fetch buyers: {e}")
+        return []
+
+    if records:
+        logger.info(f"Fetched {len(records)} buyer records (profile={profile})")
+    else:
+        logger.warning("No buyer data found in database")
+    return records
+
+
+async def _upsert_chunk(supabase, index, chunk, max_retries, semaphore) -> dict:
+    attempts = 0
+    async with semaphore:
+        while True:
+            attempts += 1
+            try:
+                await (
+                    supabase.table("mousa")
+                    .upsert(chunk, on_conflict="buyer_name", returning=ReturnMethod.minimal)
+                    .execute()
+                )
+                return _chunk_report(index, chunk, attempts)
+            except Exception as e:
+                if attempts > max_retries or not _is_transient(e):
+                    logger.error(
+                        f"Chunk {index} ({len(chunk)} rows) failed after {attempts} attempts: {e}"
+                    )
+                    return _chunk_report(index, chunk, attempts, e)
+                delay = random.uniform(0, database.RETRY_BASE_DELAY * (2 ** (attempts - 1)))
+                logger.warning(
+                    f"Chunk {index} transient error ({e}); retry {attempts} in {delay:.2f}s"
+                )
+                db_metrics.add_retry()
+                await asyncio.sleep(delay)
+
+
+@instrumented("bulk_upsert_buyers_async")
+async def bulk_upsert_buyers(
+    records: list,
+    chunk_size: int = UPSERT_CHUNK_SIZE,
+    max_workers: int = UPSERT_MAX_WORKERS,
+    max_retries: int = UPSERT_MAX_RETRIES,
+):
+    """
+    Async bulk_upsert_buyers: chunked, concurrent, retrying upsert.
+
+    Returns:
+        Same report as database.bulk_upsert_buyers
+    """
+    supabase = await get_supabase()
+    if not supabase:
+        return {"status": "error", "message": "Supabase not configured"}
+
+    if not records:
+        return {"status": "skipped", "message": "No records to save"}
+
+    chunks = _plan_upsert(records, chunk_size)
+
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+    reports = await asyncio.gather(
+        *(
+            _upsert_chunk(supabase, i, chunk, max_retries, semaphore)
+            for i, chunk in enumerate(chunks)
+        )
+    )
+
+    return _upsert_report(reports)
+
+
+@instrumented("update_contact_timestamp_async")
+async def update_contact_timestamp(company_name: str):
+    """
+    Async update_contact_timestamp for email tracking.
+
+    Returns:
+        Dict with status
+    """
+    supabase = await get_supabase()
+    if not supabase:
+        return {"status": "error", "message": "Supabase not configured"}
+
+    try:
+        payload = {
+            "buyer_name": company_name.strip(),
+            "last_contacted_at": datetime.utcnow().isoformat(),
+        }
+
+        response = await supabase.table("mousa").upsert(payload, on_conflict="buyer_name").execute()
+
+        if response.data:
+            logger.info(f"Updated contact timestamp for {company_name}")
+            return {"status": "success"}
+        else:
+            return {"status": "warning", "message": "Update completed but no data returned"}
+
+    except Exception as e:
+        logger.error(f"Failed to update contact timestamp: {e}")
+        return {"status": "error", "message": str(e)}
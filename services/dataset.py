@@ -0,0 +1,119 @@
+"""Versioned buyer dataset shared by every page.
+
+All pages read the same process-wide snapshots (BuyerSync -> BuyerFrame
+per read profile) through one BuyerDataset. Its `version` increases
+whenever a sync produces new data or this process writes to 'mousa', so:
+
+- derived views (audience lists, fallback KPIs, ...) are memoized per
+  version with `view()` and rebuilt only after the data changed,
+- st.cache_data query caches take the version as an argument, so a write
+  invalidates them by moving to new keys instead of clearing every cache
+  in the process.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .buyer_frame import BuyerFrame, get_buyer_frame
+from .buyer_sync import get_buyer_syncs
+
+logger = logging.getLogger(__name__)
+
+
+class BuyerDataset:
+    """Versioned snapshots of the buyer table and views derived from them.
+
+    Thread-safe; intended to be shared process-wide (see get_dataset).
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._lock = threading.Lock()
+        self._frames: Dict[str, BuyerFrame] = {}
+        self._views: Dict[Tuple[str, str], Tuple[int, Any]] = {}
+
+    def frame(
+        self, profile: str = "table", max_age: float = 300, background: bool = True
+    ) -> BuyerFrame:
+        """Current typed frame of a read profile; bumps the version when it changed.
+
+        Args:
+            profile: Read profile (see database.READ_PROFILES)
+            max_age: Seconds before the profile is synced again
+            background: Sync on a worker thread when a frame is already loaded
+        """
+        buyers = get_buyer_frame(profile, max_age=max_age, background=background)
+        with self._lock:
+            previous = self._frames.get(profile)
+            if previous is not buyers:
+                self._frames[profile] = buyers
+                if previous is not None:
+                    self._bump(f"new '{profile}' snapshot")
+        return buyers
+
+    def view(
+        self,
+        name: str,
+        build: Callable[[BuyerFrame], Any],
+        profile: str = "table",
+        max_age: float = 300,
+    ) -> Any:
+        """Derived value of a profile's frame, built once per dataset version.
+
+        Args:
+            name: View name, unique per profile
+            build: Function of the BuyerFrame returning the view; its
+                result is shared, so treat it as read-only
+            profile: Read profile the view is derived from
+            max_age: Passed to frame()
+        """
+        buyers = self.frame(profile, max_age=max_age)
+        with self._lock:
+            version = self.version
+            cached = self._views.get((name, profile))
+            if cached is not None and cached[0] == version:
+                return cached[1]
+        value = build(buyers)
+        with self._lock:
+            if self.version == version:
+                self._views[(name, profile)] = (version, value)
+        return value
+
+    def record_write(self, deleted: Optional[Iterable[str]] = None) -> int:
+        """Note that this process wrote to 'mousa' and return the new version.
+
+        Every synced profile pulls the changes on its next read (deleted
+        rows are dropped right away) and all views and version-keyed
+        caches are invalidated.
+
+        Args:
+            deleted: buyer_name values deleted by the write
+        """
+        deleted = list(deleted or [])
+        for sync in get_buyer_syncs():
+            if deleted:
+                sync.discard(deleted)
+            sync.mark_stale()
+        with self._lock:
+            return self._bump("write")
+
+    def _bump(self, reason: str) -> int:
+        """Advance the version and drop views. Caller must hold self._lock."""
+        self.version += 1
+        self._views.clear()
+        logger.info(f"Dataset version {self.version} ({reason})")
+        return self.version
+
+
+_dataset = None
+_dataset_lock = threading.Lock()
+
+
+def get_dataset() -> BuyerDataset:
+    """Return the process-wide BuyerDataset."""
+    global _dataset
+    with _dataset_lock:
+        if _dataset is None:
+            _dataset = BuyerDataset()
+        return _dataset
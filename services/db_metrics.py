@@ -0,0 +1,333 @@
+"""In-process instrumentation for database calls.
+
+Every operation wrapped with `instrumented` (or `track`) records its
+duration, row count, HTTP request/response bytes, HTTP requests and
+retries into a bounded registry:
+
+- a log-bucketed latency histogram per operation (constant memory,
+  used for p50/p95/p99),
+- counters for calls, errors, rows, bytes and retries,
+- a ring buffer of recent slow calls.
+
+Bytes are attributed by httpx event hooks (see `on_request` /
+`on_response`) to every call active in the current context, so nested
+operations and worker threads started with `contextvars.copy_context()`
+are covered.
+"""
+
+import bisect
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Calls slower than this (seconds) are logged and kept in the slow-call log
+SLOW_CALL_SECONDS = float(os.environ.get("DB_SLOW_CALL_SECONDS", "1.0"))
+SLOW_CALL_LOG_SIZE = 50
+
+# Histogram bucket upper bounds: 0.5 ms growing by 2^(1/4) (~19%) to ~2 min
+_BUCKET_BOUNDS = [0.0005 * 2 ** (i / 4) for i in range(72)]
+
+_active_calls: contextvars.ContextVar = contextvars.ContextVar("db_active_calls", default=())
+
+
+class _Call:
+    """Measurements for one in-flight operation."""
+
+    __slots__ = (
+        "operation",
+        "started",
+        "rows",
+        "bytes_sent",
+        "bytes_received",
+        "requests",
+        "retries",
+        "_lock",
+    )
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.started = time.perf_counter()
+        self.rows = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.requests = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def add(self, **counts: int) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+
+class _OperationStats:
+    """Histogram and counters for one operation name."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.requests = 0
+        self.retries = 0
+
+    def percentile(self, q: float) -> float:
+        """Upper bound (seconds) of the bucket holding the q-th quantile."""
+        if not self.calls:
+            return 0.0
+        rank = q * self.calls
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                bound = _BUCKET_BOUNDS[index] if index < len(_BUCKET_BOUNDS) else self.max_seconds
+                return min(bound, self.max_seconds)
+        return self.max_seconds
+
+
+class MetricsRegistry:
+    """Thread-safe, bounded store of per-operation database metrics.
+
+    Args:
+        slow_threshold: Seconds above which a call is logged as slow.
+        slow_log_size: Number of recent slow calls kept.
+    """
+
+    def __init__(
+        self, slow_threshold: float = SLOW_CALL_SECONDS, slow_log_size: int = SLOW_CALL_LOG_SIZE
+    ):
+        self.slow_threshold = slow_threshold
+        self._lock = threading.Lock()
+        self._ops: Dict[str, _OperationStats] = {}
+        self._slow = deque(maxlen=slow_log_size)
+        self._since = datetime.now()
+
+    def record(self, call: _Call, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            stats = self._ops.setdefault(call.operation, _OperationStats())
+            stats.buckets[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.rows += call.rows
+            stats.bytes_sent += call.bytes_sent
+            stats.bytes_received += call.bytes_received
+            stats.requests += call.requests
+            stats.retries += call.retries
+            if seconds >= self.slow_threshold:
+                self._slow.append(
+                    {
+                        "operation": call.operation,
+                        "at": datetime.now(),
+                        "ms": round(seconds * 1000, 1),
+                        "rows": call.rows,
+                        "requests": call.requests,
+                        "retries": call.retries,
+                        "error": error,
+                    }
+                )
+        if seconds >= self.slow_threshold:
+            logger.warning(
+                f"Slow database call: {call.operation} took {seconds * 1000:.0f} ms ({call.rows} rows)"
+            )
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Per-operation summary, slowest p95 first (latencies in ms)."""
+        with self._lock:
+            rows = [
+                {
+                    "operation": name,
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "p50_ms": round(s.percentile(0.50) * 1000, 1),
+                    "p95_ms": round(s.percentile(0.95) * 1000, 1),
+                    "p99_ms": round(s.percentile(0.99) * 1000, 1),
+                    "max_ms": round(s.max_seconds * 1000, 1),
+                    "mean_ms": round(s.total_seconds / s.calls * 1000, 1) if s.calls else 0.0,
+                    "rows": s.rows,
+                    "requests": s.requests,
+                    "retries": s.retries,
+                    "bytes_sent": s.bytes_sent,
+                    "bytes_received": s.bytes_received,
+                }
+                for name, s in self._ops.items()
+            ]
+        return sorted(rows, key=lambda r: r["p95_ms"], reverse=True)
+
+    def slow_calls(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Slowest of the recently logged slow calls."""
+        with self._lock:
+            calls = list(self._slow)
+        return sorted(calls, key=lambda c: c["ms"], reverse=True)[:limit]
+
+    def since(self) -> datetime:
+        return self._since
+
+    def reset(self) -> None:
+        with self._lock:
+            self._ops.clear()
+            self._slow.clear()
+            self._since = datetime.now()
+
+
+registry = MetricsRegistry()
+
+
+@contextmanager
+def track(operation: str):
+    """Measure a block as one `operation`; yields the call for row counts.
+
+    An exception escaping the block is recorded as an error and re-raised.
+    """
+    call = _Call(operation)
+    token = _active_calls.set(_active_calls.get() + (call,))
+    error = False
+    try:
+        yield call
+    except BaseException:
+        error = True
+        raise
+    finally:
+        _active_calls.reset(token)
+        registry.record(call, time.perf_counter() - call.started, error)
+
+
+def _result_rows(result: Any) -> int:
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        if isinstance(result.get("rows"), list):
+            return len(result["rows"])
+        for key in ("upserted", "deleted", "updated", "saved"):
+            if key in result:
+                return int(result[key] or 0)
+        if isinstance(result.get("data"), list):
+            return len(result["data"])
+    return 0
+
+
+def _result_failed(result: Any) -> bool:
+    return result is None or (isinstance(result, dict) and result.get("status") == "error")
+
+
+def instrumented(operation: str) -> Callable:
+    """Decorator recording each call of a database function as `operation`.
+
+    Works on plain and async functions. Rows are read from the return
+    value (list length, or rows/upserted/deleted/updated/saved of a status
+    dict); None or {"status": "error"} counts as an error.
+    """
+
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                call = _Call(operation)
+                token = _active_calls.set(_active_calls.get() + (call,))
+                result, error = None, True
+                try:
+                    result = await fn(*args, **kwargs)
+                    error = _result_failed(result)
+                    return result
+                finally:
+                    _active_calls.reset(token)
+                    call.rows = _result_rows(result)
+                    registry.record(call, time.perf_counter() - call.started, error)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            call = _Call(operation)
+            token = _active_calls.set(_active_calls.get() + (call,))
+            result, error = None, True
+            try:
+                result = fn(*args, **kwargs)
+                error = _result_failed(result)
+                return result
+            finally:
+                _active_calls.reset(token)
+                call.rows = _result_rows(result)
+                registry.record(call, time.perf_counter() - call.started, error)
+
+        return wrapper
+
+    return decorate
+
+
+def add_retry() -> None:
+    """Count a retry against every operation active in this context."""
+    for call in _active_calls.get():
+        call.add(retries=1)
+
+
+def _request_size(request) -> int:
+    try:
+        return len(request.content)
+    except Exception:  # streaming body not yet read
+        return int(request.headers.get("content-length", 0))
+
+
+# httpx event hooks -----------------------------------------------------------
+
+
+def on_request(request) -> None:
+    calls = _active_calls.get()
+    if calls:
+        size = _request_size(request)
+        for call in calls:
+            call.add(requests=1, bytes_sent=size)
+
+
+def on_response(response) -> None:
+    calls = _active_calls.get()
+    if calls:
+        response.read()
+        for call in calls:
+            call.add(bytes_received=len(response.content))
+
+
+async def on_request_async(request) -> None:
+    on_request(request)
+
+
+async def on_response_async(response) -> None:
+    calls = _active_calls.get()
+    if calls:
+        await response.aread()
+        for call in calls:
+            call.add(bytes_received=len(response.content))
+
+
+# Module-level accessors ------------------------------------------------------
+
+
+def get_metrics() -> List[Dict[str, Any]]:
+    """Per-operation latency percentiles and counters (see MetricsRegistry.snapshot)."""
+    return registry.snapshot()
+
+
+def get_slow_calls(limit: int = 20) -> List[Dict[str, Any]]:
+    """Slowest recent calls above DB_SLOW_CALL_SECONDS."""
+    return registry.slow_calls(limit)
+
+
+def reset_metrics() -> None:
+    """Clear all recorded metrics."""
+    registry.reset()
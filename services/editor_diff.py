@@ -0,0 +1,89 @@
+"""Change detection for the st.data_editor table.
+
+Compares the frame handed to the editor with the frame it returns and
+produces the minimal set of upserts and deletions to send to Supabase.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def _records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert a frame to JSON-safe record dicts (NaN -> None)."""
+    if frame.empty:
+        return []
+    clean = frame.astype(object).where(frame.notna(), None)
+    return clean.to_dict("records")
+
+
+def payload_bytes(payload: Any) -> int:
+    """Size in bytes of `payload` once JSON-encoded for the request body."""
+    return len(json.dumps(payload, default=str).encode("utf-8"))
+
+
+def diff_frames(
+    original: pd.DataFrame, edited: pd.DataFrame, key: str = "buyer_name"
+) -> Dict[str, Any]:
+    """Compute the edits, inserts and deletions between two editor frames.
+
+    Rows are matched on `key`. A row counts as edited when any shared
+    column differs (two missing values compare equal). Rows whose key is
+    blank cannot be saved and are reported as skipped.
+
+    Args:
+        original: Frame that was passed to st.data_editor.
+        edited: Frame returned by st.data_editor.
+        key: Unique column identifying a row.
+
+    Returns:
+        Dict with `upserts` (records), `deletes` (key values), the
+        `edited`/`inserted`/`deleted`/`skipped` row counts and
+        `wire_bytes`, the JSON size of what will be sent.
+    """
+    columns = [c for c in edited.columns if c in original.columns]
+
+    new = edited[columns].copy()
+    blank = new[key].isna() | (new[key].astype(str).str.strip() == "")
+    skipped = int(blank.sum())
+    new = new[~blank].drop_duplicates(subset=key, keep="last").set_index(key)
+    old = (
+        original[columns]
+        .dropna(subset=[key])
+        .drop_duplicates(subset=key, keep="last")
+        .set_index(key)
+    )
+
+    inserted_keys = new.index.difference(old.index)
+    deleted_keys = old.index.difference(new.index)
+    common = new.index.intersection(old.index)
+
+    before = old.loc[common]
+    after = new.loc[common, before.columns]
+    # Nullable (string/categorical) columns compare to NA against a missing
+    # value, so treat NA as "differs" unless both sides are missing
+    differs = (before.astype(object) != after.astype(object)).fillna(True).astype(bool)
+    changed = differs & ~(before.isna() & after.isna())
+    edited_keys = common[changed.any(axis=1).to_numpy()]
+
+    upserts = _records(new.loc[edited_keys.append(inserted_keys)].reset_index())
+    deletes = [str(k) for k in deleted_keys]
+
+    if skipped:
+        logger.warning(f"Skipping {skipped} edited rows without a {key}")
+
+    return {
+        "upserts": upserts,
+        "deletes": deletes,
+        "edited": len(edited_keys),
+        "inserted": len(inserted_keys),
+        "deleted": len(deletes),
+        "skipped": skipped,
+        "wire_bytes": payload_bytes(upserts) + payload_bytes(deletes)
+        if (upserts or deletes)
+        else 0,
+    }
@@ -0,0 +1,403 @@
+"""Bulk enrichment: run many agent sessions at once over a set of buyers.
+
+Candidates are picked from the typed buyer frame (e.g. "no email, country
+in X"), largest buyers first, skipping names resolved as aliases of
+another company. Up to `concurrency` SearchAgent sessions run in one event
+loop; the LLM, search and page-fetch calls they make are capped by the
+process-wide limits in services/rate_limits.py. Each company is saved as
+soon as it completes, through the write-behind queue, so companies that
+finish close together share one batched upsert.
+
+Progress is kept per run in data/enrichment.sqlite, so an interrupted run
+resumes with the companies it has not finished yet. Every run ends with a
+throughput / latency summary.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .buyer_frame import FLAG_COLUMNS
+from .rate_limits import ServiceLimits, get_service_limits
+from .replica import REPLICA_DIR
+
+logger = logging.getLogger(__name__)
+
+LEDGER_FILE = "enrichment.sqlite"
+DEFAULT_CONCURRENCY = int(os.environ.get("ENRICH_CONCURRENCY", "8"))
+
+# Contact field -> precomputed presence flag; keys are the values of missing=
+_FLAGS = {source: flag for flag, source in FLAG_COLUMNS.items()}
+ENRICH_FIELDS = tuple(_FLAGS)
+# Stored fields kept when the agent finds nothing new for them
+_KEEP_FIELDS = {"email": "emails", "phone": "phones", "website": "website", "address": "address"}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def select_candidates(
+    frame: pd.DataFrame,
+    missing: Iterable[str] = ("email",),
+    countries: Optional[Iterable[str]] = None,
+    names: Optional[Iterable[str]] = None,
+    aliases: Optional[Dict[str, str]] = None,
+    country_column: str = "destination_country",
+    limit: Optional[int] = None,
+) -> pd.DataFrame:
+    """Buyers to enrich, largest total_usd first.
+
+    Args:
+        frame: Typed buyer frame (see buyer_frame.build_buyer_frame)
+        missing: Keep rows missing any of these fields (email, phone, website)
+        countries: Keep rows in these countries (None for all)
+        names: Keep only these buyer_names, e.g. a table selection
+        aliases: {alias_name: canonical_name}; aliases are skipped
+        country_column: Column `countries` applies to
+        limit: At most this many rows
+
+    Returns:
+        DataFrame with buyer_name, country, total_usd and the stored
+        contact columns
+    """
+    missing = list(missing)
+    unknown = set(missing) - set(ENRICH_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown enrichment fields: {sorted(unknown)}")
+    mask = np.zeros(len(frame), dtype=bool) if missing else np.ones(len(frame), dtype=bool)
+    for field in missing:
+        mask |= ~frame[_FLAGS[field]].to_numpy(dtype=bool)
+    mask &= frame["buyer_name"].notna().to_numpy()
+    if countries:
+        mask &= frame[country_column].isin(list(countries)).to_numpy()
+    if names is not None:
+        mask &= frame["buyer_name"].isin(list(names)).to_numpy()
+    if aliases:
+        mask &= ~frame["buyer_name"].isin(list(aliases)).to_numpy()
+
+    columns = ["buyer_name", "total_usd"] + [
+        c for c in ("email", "phone", "website", "address") if c in frame.columns
+    ]
+    selected = frame.loc[mask, columns].assign(
+        country=frame.loc[mask, country_column].astype(object)
+    )
+    selected = selected.sort_values(
+        ["total_usd", "buyer_name"], ascending=[False, True], kind="stable"
+    )
+    return selected.head(limit).reset_index(drop=True) if limit else selected.reset_index(drop=True)
+
+
+def _records(candidates) -> List[Dict[str, Any]]:
+    if isinstance(candidates, pd.DataFrame):
+        candidates = candidates.astype(object).where(candidates.notna(), None).to_dict("records")
+    return [dict(c) for c in candidates if c.get("buyer_name")]
+
+
+class EnrichmentLedger:
+    """Per-run progress of bulk enrichment in a SQLite file.
+
+    Args:
+        path: Database file; defaults to enrichment.sqlite in the data dir
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(REPLICA_DIR, LEDGER_FILE)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS enrichment_runs ("
+                " run_id TEXT PRIMARY KEY, created_at TEXT, finished_at TEXT, params TEXT, summary TEXT);"
+                "CREATE TABLE IF NOT EXISTS enrichment_items ("
+                " run_id TEXT NOT NULL, buyer_name TEXT NOT NULL, status TEXT NOT NULL,"
+                " ms REAL, message TEXT, finished_at TEXT, PRIMARY KEY (run_id, buyer_name));"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        return sqlite3.connect(self.path, timeout=30)
+
+    def start(self, params: Optional[Dict[str, Any]] = None, run_id: Optional[str] = None) -> str:
+        """Register a run (kept as is if it exists) and return its id."""
+        run_id = run_id or uuid.uuid4().hex[:12]
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO enrichment_runs (run_id, created_at, params) VALUES (?, ?, ?)",
+                (run_id, _now(), json.dumps(params or {}, ensure_ascii=False, default=str)),
+            )
+        return run_id
+
+    def finished(self, run_id: str) -> set:
+        """buyer_names this run has already completed (failed ones are retried)."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT buyer_name FROM enrichment_items WHERE run_id = ? AND status != 'error'",
+                (run_id,),
+            )
+            return {name for (name,) in rows}
+
+    def done(self, run_id: str, since: Optional[str] = None) -> int:
+        """Companies of the run with an outcome so far.
+
+        Errors recorded before `since` (e.g. the start of a resumed run) are
+        left out, since the run retries them.
+        """
+        with self._connect() as conn:
+            (count,) = conn.execute(
+                "SELECT count(*) FROM enrichment_items WHERE run_id = ? AND (status != 'error' OR finished_at >= ?)",
+                (run_id, since or ""),
+            ).fetchone()
+        return count
+
+    def record(
+        self, run_id: str, buyer_name: str, status: str, ms: float, message: Optional[str] = None
+    ) -> None:
+        """Store the outcome of one company."""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO enrichment_items VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, buyer_name, status, ms, message, _now()),
+            )
+
+    def finish(self, run_id: str, summary: Dict[str, Any]) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE enrichment_runs SET finished_at = ?, summary = ? WHERE run_id = ?",
+                (_now(), json.dumps(summary, ensure_ascii=False, default=str), run_id),
+            )
+
+    def run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """A run with its params, summary and per-status counts, or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT created_at, finished_at, params, summary FROM enrichment_runs WHERE run_id = ?",
+                (run_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            counts = dict(
+                conn.execute(
+                    "SELECT status, count(*) FROM enrichment_items WHERE run_id = ? GROUP BY status",
+                    (run_id,),
+                ).fetchall()
+            )
+        created_at, finished_at, params, summary = row
+        return {
+            "run_id": run_id,
+            "created_at": created_at,
+            "finished_at": finished_at,
+            "params": json.loads(params) if params else {},
+            "summary": json.loads(summary) if summary else None,
+            "counts": counts,
+        }
+
+
+def _has_contacts(found: Dict[str, Any]) -> bool:
+    return bool(
+        found.get("emails") or found.get("phones") or found.get("website") or found.get("address")
+    )
+
+
+def _with_stored(found: Dict[str, Any], row: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep stored contact fields the agent found nothing for (the save overwrites them)."""
+    merged = dict(found)
+    for column, key in _KEEP_FIELDS.items():
+        stored = row.get(column)
+        if not merged.get(key) and stored:
+            merged[key] = (
+                [v.strip() for v in str(stored).split(",") if v.strip()]
+                if key in ("emails", "phones")
+                else stored
+            )
+    return merged
+
+
+async def _queued_save(name: str, found: Dict[str, Any]) -> Dict[str, Any]:
+    """Save through the write-behind queue; resolves once the batch is written."""
+    from .database import queue_scavenged_data
+
+    return await asyncio.wrap_future(queue_scavenged_data(name, found))
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    return round(float(np.percentile(values, q)), 1) if values else None
+
+
+async def enrich_buyers(
+    candidates,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    limits: Optional[ServiceLimits] = None,
+    ledger: Optional[EnrichmentLedger] = None,
+    run_id: Optional[str] = None,
+    progress: Optional[Callable[[str], None]] = None,
+    find: Optional[Callable[..., Awaitable[Dict[str, Any]]]] = None,
+    save: Optional[Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]] = None,
+    on_result: Optional[Callable[[str, str], None]] = None,
+) -> Dict[str, Any]:
+    """Enrich companies concurrently, saving each as it completes.
+
+    Args:
+        candidates: DataFrame from select_candidates() or dicts with
+            buyer_name, country and the stored contact columns
+        concurrency: Agent sessions in flight
+        limits: Call budgets shared by the sessions (process-wide default)
+        ledger: Progress store; companies this run already finished are skipped
+        run_id: Run to create or resume
+        progress: Receives one message per finished company
+        find: async find(company, country) -> agent result (default
+            SearchAgent.find_company_leads)
+        save: async save(company, result) -> status dict (default
+            _queued_save: database.queue_scavenged_data, awaited)
+        on_result: Called with (buyer_name, status) per company; status is
+            enriched, not_found or error
+
+    Returns:
+        Summary dict: status, run_id, companies, enriched, not_found,
+        errors, skipped, elapsed_s, per_minute, latency_ms (p50/p90/max)
+        and limits (calls and waits per kind)
+    """
+    limits = limits or get_service_limits()
+    ledger = ledger or EnrichmentLedger()
+    rows = _records(candidates)
+    run_id = ledger.start({"companies": len(rows), "concurrency": concurrency}, run_id=run_id)
+    done = ledger.finished(run_id)
+    pending = [r for r in rows if r["buyer_name"] not in done]
+
+    if find is None:
+        from .search_agent import SearchAgent
+
+        find = SearchAgent(limits=limits).find_company_leads
+    save = save or _queued_save
+
+    counts = {"enriched": 0, "not_found": 0, "error": 0}
+    latencies: List[float] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for row in pending:
+        queue.put_nowait(row)
+    started = time.perf_counter()
+
+    async def enrich_one(row: Dict[str, Any]) -> None:
+        name = row["buyer_name"]
+        began = time.perf_counter()
+        message = None
+        try:
+            found = await find(name, row.get("country") or "")
+            if not found or found.get("status") == "error":
+                status, message = "error", (found or {}).get("message", "Search failed")
+            elif not _has_contacts(found):
+                status = "not_found"
+            else:
+                saved = await save(name, _with_stored(found, row))
+                status = "enriched" if saved.get("status") == "success" else "error"
+                message = saved.get("message")
+        except Exception as e:
+            logger.error(f"Enrichment failed for {name}: {e}")
+            status, message = "error", str(e)
+        ms = (time.perf_counter() - began) * 1000
+        latencies.append(ms)
+        counts[status] += 1
+        ledger.record(run_id, name, status, ms, message)
+        if on_result:
+            on_result(name, status)
+        if progress:
+            finished = sum(counts.values())
+            progress(
+                f"[{finished}/{len(pending)}] {name}: {status.replace('_', ' ')} ({ms / 1000:.1f}s)"
+            )
+
+    async def worker() -> None:
+        while True:
+            try:
+                row = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await enrich_one(row)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(pending))))))
+
+    elapsed = time.perf_counter() - started
+    finished = sum(counts.values())
+    summary = {
+        "status": "success"
+        if not counts["error"]
+        else ("partial" if counts["error"] < finished else "error"),
+        "run_id": run_id,
+        "companies": finished,
+        "enriched": counts["enriched"],
+        "not_found": counts["not_found"],
+        "errors": counts["error"],
+        "skipped": len(rows) - len(pending),
+        "elapsed_s": round(elapsed, 1),
+        "per_minute": round(finished / elapsed * 60, 1) if elapsed > 0 and finished else 0.0,
+        "latency_ms": {
+            "p50": _percentile(latencies, 50),
+            "p90": _percentile(latencies, 90),
+            "max": round(max(latencies), 1) if latencies else None,
+        },
+        "limits": limits.stats(),
+    }
+    if not finished:
+        summary["status"] = "skipped"
+        summary["message"] = "Nothing left to enrich"
+    ledger.finish(run_id, summary)
+    logger.info(f"Enrichment run {run_id}: {summary}")
+    return summary
+
+
+def describe_summary(summary: Dict[str, Any]) -> str:
+    """One-line throughput / latency summary for captions and the CLI."""
+    latency = summary.get("latency_ms") or {}
+    text = (
+        f"{summary['companies']} companies in {summary['elapsed_s']}s "
+        f"({summary['per_minute']}/min): {summary['enriched']} enriched, "
+        f"{summary['not_found']} not found, {summary['errors']} errors"
+    )
+    if summary.get("skipped"):
+        text += f", {summary['skipped']} already done"
+    if latency.get("p50") is not None:
+        text += f"; latency p50 {latency['p50'] / 1000:.1f}s, p90 {latency['p90'] / 1000:.1f}s"
+    return text
+
+
+async def enrich_job(params: Dict[str, Any], progress: Callable[[str], None]) -> Dict[str, Any]:
+    """Job handler (services/jobs.py) for a bulk enrichment run.
+
+    Args:
+        params: buyers (candidate dicts), run_id and optional concurrency
+        progress: Receives one message per finished company
+    """
+    summary = await enrich_buyers(
+        params.get("buyers") or [],
+        concurrency=params.get("concurrency") or DEFAULT_CONCURRENCY,
+        run_id=params.get("run_id"),
+        progress=progress,
+    )
+    progress(describe_summary(summary))
+    if summary["status"] == "skipped":
+        summary["status"] = "success"
+    return summary
+
+
+def submit_enrichment(candidates, concurrency: int = DEFAULT_CONCURRENCY) -> str:
+    """Queue a bulk enrichment run as a background job; returns the job id.
+
+    The run id is fixed up front, so a job restarted after a crash resumes
+    where it stopped.
+    """
+    from .jobs import get_job_runner
+
+    buyers = [{k: v for k, v in row.items() if k != "total_usd"} for row in _records(candidates)]
+    return get_job_runner().submit(
+        "enrich",
+        {"buyers": buyers, "run_id": uuid.uuid4().hex[:12], "concurrency": concurrency},
+    )
@@ -0,0 +1,353 @@
+"""Batch entity resolution: merge near-duplicate buyer names into clusters.
+
+Names that differ only in case, punctuation, accents or legal suffix
+("Ferro Metal Inc.", "FERRO METAL, INC", "Ferro-Metal LLC") share a
+canonical key and are merged outright. Remaining near-duplicates are found
+by blocking the distinct keys (same 4-character prefix, or same longest
+word) and scoring every pair inside a block at once with a trigram
+incidence matrix (Dice similarity). Keys whose numbers differ are never
+merged ("Alpha Steel 1" / "Alpha Steel 2").
+
+Merged pairs are joined with union-find; each cluster keeps the member with
+the largest total_usd as its canonical name and every other member becomes
+an alias row for 'buyer_aliases' (migrations/0004_buyer_aliases.sql).
+"""
+
+import logging
+import re
+import time
+import unicodedata
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .database import iter_buyers, save_aliases
+from .name_index import normalize_name, trigram_pairs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.85
+# Blocks larger than this are scored in overlapping windows of sorted keys
+MAX_BLOCK_SIZE = 200
+PREFIX_LENGTH = 4
+MIN_BLOCK_TOKEN = 4
+
+LEGAL_SUFFIXES = frozenset(
+    {
+        "inc",
+        "incorporated",
+        "llc",
+        "llp",
+        "lp",
+        "ltd",
+        "limited",
+        "co",
+        "company",
+        "corp",
+        "corporation",
+        "gmbh",
+        "mbh",
+        "kg",
+        "ag",
+        "sa",
+        "sas",
+        "sarl",
+        "srl",
+        "spa",
+        "sl",
+        "bv",
+        "nv",
+        "plc",
+        "pte",
+        "pty",
+        "pvt",
+        "private",
+        "ab",
+        "as",
+        "oy",
+        "kk",
+        "jsc",
+        "ooo",
+        "zao",
+        "oao",
+        "sdn",
+        "bhd",
+        "tbk",
+        "pt",
+        "cv",
+        "de",
+        "rl",
+    }
+)
+STOP_WORDS = frozenset({"the", "and", "of"})
+
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def canonical_key(name: Any) -> str:
+    """Blocking/merge key of a company name.
+
+    Lower case, accents folded, punctuation dropped, dotted initials joined
+    ("S.A." -> "sa"), stop words and trailing legal suffixes removed. A name
+    made only of suffixes keeps them.
+    """
+    if name is None or (not isinstance(name, str) and pd.isna(name)):
+        return ""
+    text = str(name)
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    tokens = []
+    for token in normalize_name(text).split():
+        if (
+            len(token) == 1
+            and tokens
+            and len(tokens[-1]) < 3
+            and tokens[-1].isalpha()
+            and token.isalpha()
+        ):
+            tokens[-1] += token  # "s a" -> "sa", "l l c" -> "llc"
+        else:
+            tokens.append(token)
+    words = [t for t in tokens if t not in STOP_WORDS] or tokens
+    core = list(words)
+    while len(core) > 1 and core[-1] in LEGAL_SUFFIXES:
+        core.pop()
+    return " ".join(core)
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = np.arange(size)
+
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+    def roots(self) -> np.ndarray:
+        """Root of every element (pointer jumping until stable)."""
+        parent = self.parent.copy()
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                return parent
+            parent = grand
+
+
+def _groups(labels: List[Optional[str]]) -> Iterable[np.ndarray]:
+    """Index arrays of equal, non-missing labels with two or more members."""
+    codes = pd.factorize(pd.Series(labels, dtype=object))[0]
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+    for members in np.split(order, bounds):
+        if len(members) > 1 and codes[members[0]] >= 0:
+            yield members
+
+
+def _blocks(keys: List[str]) -> Iterable[np.ndarray]:
+    """Index arrays of keys sharing a prefix or a longest word."""
+    compact = [k.replace(" ", "") for k in keys]
+    prefixes = [c[:PREFIX_LENGTH] if len(c) >= PREFIX_LENGTH else None for c in compact]
+    tokens = [
+        max(
+            (t for t in k.split() if len(t) >= MIN_BLOCK_TOKEN),
+            key=lambda t: (len(t), t),
+            default=None,
+        )
+        for k in keys
+    ]
+    for labels in (prefixes, tokens):
+        for members in _groups(labels):
+            if len(members) <= MAX_BLOCK_SIZE:
+                yield members
+                continue
+            # Sorted-neighbourhood windows, half overlapping (keys are sorted)
+            step = MAX_BLOCK_SIZE // 2
+            for start in range(0, len(members) - step, step):
+                yield members[start : start + MAX_BLOCK_SIZE]
+
+
+def _similar_pairs(
+    keys: List[str], digits: np.ndarray, members: np.ndarray, threshold: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(i, j, score) for pairs in one block with Dice >= threshold."""
+    positions, codes = trigram_pairs([keys[m] for m in members])
+    if not len(codes):
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0)
+    columns = np.unique(codes, return_inverse=True)[1]
+    incidence = np.zeros((len(members), columns.max() + 1), dtype=np.float32)
+    incidence[positions, columns] = 1.0
+    shared = incidence @ incidence.T
+    sizes = incidence.sum(axis=1)
+    dice = 2 * shared / (sizes[:, None] + sizes[None, :])
+    block_digits = digits[members]
+    similar = np.triu(dice >= threshold, k=1) & (block_digits[:, None] == block_digits[None, :])
+    i, j = np.nonzero(similar)
+    return members[i], members[j], dice[i, j]
+
+
+def _dice(a: str, b: str) -> float:
+    pos, codes = trigram_pairs([a, b])
+    first, second = set(codes[pos == 0].tolist()), set(codes[pos == 1].tolist())
+    return 2 * len(first & second) / (len(first) + len(second)) if first or second else 1.0
+
+
+def resolve_entities(
+    data,
+    threshold: float = DEFAULT_THRESHOLD,
+    key: str = "buyer_name",
+    value_column: str = "total_usd",
+) -> Dict[str, Any]:
+    """Group duplicate buyers into clusters and derive alias rows.
+
+    Args:
+        data: DataFrame or records with `key` (and optionally `value_column`)
+        threshold: Minimum Dice similarity of two canonical keys to merge
+        key: Column holding the company name
+        value_column: Column used to choose each cluster's canonical name
+
+    Returns:
+        Dict with `clusters` (canonical_name, canonical_key, members),
+        `aliases` (alias_name, canonical_name, canonical_key, score, method)
+        and `stats` (names, keys, blocks, pairs, clusters, aliases, ms)
+    """
+    started = time.perf_counter()
+    frame = data if isinstance(data, pd.DataFrame) else pd.DataFrame(list(data))
+    if key not in frame.columns:
+        frame = pd.DataFrame({key: []})
+    names = frame[key].dropna().astype(object)
+    values = (
+        pd.to_numeric(frame.loc[names.index, value_column], errors="coerce").fillna(0.0)
+        if value_column in frame.columns
+        else pd.Series(0.0, index=names.index)
+    )
+    names = pd.DataFrame({"name": names.astype(str), "value": values}).drop_duplicates(
+        "name", keep="first"
+    )
+    names["key"] = pd.Series(
+        [canonical_key(n) for n in names["name"]], index=names.index, dtype=object
+    )
+    names = names[names["key"] != ""]
+
+    total = len(names)
+    key_ids, keys = pd.factorize(names["key"], sort=True)
+    keys = keys.tolist()
+    digit_sig = pd.factorize(
+        pd.Series([" ".join(_DIGITS_RE.findall(k)) for k in keys], dtype=object)
+    )[0]
+
+    # Exact canonical-key matches share a key id; fuzzy pairs join key ids
+    union = _UnionFind(len(keys))
+    blocks = pairs = 0
+    for members in _blocks(keys):
+        blocks += 1
+        first, second, _ = _similar_pairs(keys, digit_sig, members, threshold)
+        pairs += len(first)
+        for a, b in zip(first.tolist(), second.tolist()):
+            union.union(a, b)
+
+    # Canonical name per cluster: largest value, then shortest, then first by name
+    names["cluster"] = union.roots()[key_ids]
+    names = names[names.duplicated("cluster", keep=False)]
+    names = names.assign(length=names["name"].str.len()).sort_values(
+        ["cluster", "value", "length", "name"], ascending=[True, False, True, True], kind="stable"
+    )
+    canonical = ~names.duplicated("cluster")
+    head_rows = names[canonical]
+    heads = dict(
+        zip(
+            head_rows["cluster"].tolist(),
+            zip(head_rows["name"].tolist(), head_rows["key"].tolist()),
+        )
+    )
+    clusters = [
+        {
+            "canonical_name": heads[cluster][0],
+            "canonical_key": heads[cluster][1],
+            "members": members,
+        }
+        for cluster, members in names.groupby("cluster", sort=False)["name"].agg(list).items()
+    ]
+
+    resolved_at = datetime.now(timezone.utc).isoformat()
+    aliases = []
+    members = names[~canonical]
+    for alias, alias_key, cluster in zip(
+        members["name"].tolist(), members["key"].tolist(), members["cluster"].tolist()
+    ):
+        head_name, head_key = heads[cluster]
+        exact = alias_key == head_key
+        aliases.append(
+            {
+                "alias_name": alias,
+                "canonical_name": head_name,
+                "canonical_key": head_key,
+                "score": 1.0 if exact else round(_dice(alias_key, head_key), 4),
+                "method": "exact" if exact else "fuzzy",
+                "resolved_at": resolved_at,
+            }
+        )
+
+    stats = {
+        "names": total,
+        "keys": len(keys),
+        "blocks": blocks,
+        "pairs": pairs,
+        "clusters": len(clusters),
+        "aliases": len(aliases),
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    logger.info(f"Entity resolution: {stats}")
+    return {"clusters": clusters, "aliases": aliases, "stats": stats}
+
+
+def canonical_names(names: Iterable[str], aliases: Optional[Dict[str, str]]) -> List[str]:
+    """Map names to their canonical company, keeping first-seen order, once each."""
+    aliases = aliases or {}
+    return list(dict.fromkeys(aliases.get(n, n) for n in names if n))
+
+
+def run_entity_resolution(
+    threshold: float = DEFAULT_THRESHOLD, dry_run: bool = False
+) -> Dict[str, Any]:
+    """Resolve every buyer in 'mousa' and store the aliases.
+
+    Aliases not confirmed by this run (and not entered by hand) are pruned.
+
+    Args:
+        threshold: Minimum Dice similarity to merge
+        dry_run: Resolve and report without writing
+
+    Returns:
+        Dict with status, stats, aliases and the save result (when written)
+    """
+    started_at = datetime.now(timezone.utc).isoformat()
+    try:
+        pages = list(iter_buyers(profile="table", as_frame=True))
+    except Exception as e:
+        logger.error(f"Entity resolution could not read buyers: {e}")
+        return {"status": "error", "message": str(e)}
+    frame = pd.concat(pages, ignore_index=True) if pages else pd.DataFrame()
+
+    result = resolve_entities(frame, threshold=threshold)
+    outcome = {"status": "success", "stats": result["stats"], "aliases": result["aliases"]}
+    if dry_run:
+        return outcome
+    saved = save_aliases(result["aliases"], prune_before=started_at)
+    outcome["save"] = saved
+    if saved["status"] == "error":
+        outcome.update(status="error", message=saved.get("message"))
+    return outcome
@@ -0,0 +1,347 @@
+"""Background job runner for scavenges and bulk enrichment, with status in SQLite.
+
+A process-wide pool of worker threads runs submitted jobs (each in its own
+event loop, since the agent's search and page fetches block), so pages
+stay responsive and any number of scavenges can be queued while the user
+keeps browsing. Every job and its progress messages are stored in
+data/jobs.sqlite, so status and results survive Streamlit reruns and page
+switches; pages poll `JobStore.get` / `JobStore.events`.
+
+Job statuses: queued -> running -> success | error. Jobs that were queued
+when the process stopped are picked up again on start; jobs that were
+running are marked as interrupted errors.
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .replica import REPLICA_DIR
+
+logger = logging.getLogger(__name__)
+
+JOBS_FILE = "jobs.sqlite"
+JOB_MAX_WORKERS = int(os.environ.get("JOB_MAX_WORKERS", "3"))
+
+ACTIVE_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("success", "error")
+
+# async handler(params, progress) -> status dict
+Handler = Callable[[Dict[str, Any], Callable[[str], None]], Awaitable[Dict[str, Any]]]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _row(cursor: sqlite3.Cursor, values: tuple) -> Dict[str, Any]:
+    row = {col[0]: value for col, value in zip(cursor.description, values)}
+    for col in ("params", "result"):
+        if row.get(col) is not None:
+            row[col] = json.loads(row[col])
+    return row
+
+
+class JobStore:
+    """Jobs and their progress events in a SQLite file.
+
+    Args:
+        path: Database file; defaults to jobs.sqlite in the data dir
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(REPLICA_DIR, JOBS_FILE)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, kind TEXT NOT NULL, job_key TEXT, params TEXT,"
+                " status TEXT NOT NULL, message TEXT, result TEXT,"
+                " created_at TEXT, started_at TEXT, finished_at TEXT);"
+                "CREATE INDEX IF NOT EXISTS jobs_kind_key_idx ON jobs (kind, job_key);"
+                "CREATE INDEX IF NOT EXISTS jobs_created_idx ON jobs (created_at);"
+                "CREATE TABLE IF NOT EXISTS job_events ("
+                " job_id TEXT NOT NULL, seq INTEGER NOT NULL, at TEXT, message TEXT,"
+                " PRIMARY KEY (job_id, seq));"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        return sqlite3.connect(self.path, timeout=30)
+
+    def create(self, kind: str, key: Optional[str], params: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a queued job and return it."""
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "job_key": key,
+            "params": params,
+            "status": "queued",
+            "message": None,
+            "result": None,
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job["id"],
+                    kind,
+                    key,
+                    json.dumps(params, ensure_ascii=False),
+                    "queued",
+                    None,
+                    None,
+                    job["created_at"],
+                    None,
+                    None,
+                ),
+            )
+        return job
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """Set columns of a job (status, message, result, started_at, finished_at)."""
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"], ensure_ascii=False, default=str)
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def add_event(self, job_id: str, message: str) -> None:
+        """Append a progress message to a job."""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO job_events SELECT ?, coalesce(max(seq), 0) + 1, ?, ?"
+                " FROM job_events WHERE job_id = ?",
+                (job_id, _now(), str(message), job_id),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job by id, or None."""
+        with self._connect() as conn:
+            cursor = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            values = cursor.fetchone()
+            return _row(cursor, values) if values else None
+
+    def events(self, job_id: str, after: int = 0) -> List[Dict[str, Any]]:
+        """Progress messages (seq, at, message) of a job with seq > after."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "SELECT seq, at, message FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after),
+            )
+            return [_row(cursor, values) for values in cursor.fetchall()]
+
+    def jobs(
+        self, kind: Optional[str] = None, statuses=None, limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Most recent jobs first, optionally of one kind and/or some statuses."""
+        query, args = "SELECT * FROM jobs WHERE 1 = 1", []
+        if kind:
+            query += " AND kind = ?"
+            args.append(kind)
+        if statuses:
+            query += f" AND status IN ({', '.join('?' for _ in statuses)})"
+            args.extend(statuses)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        args.append(limit)
+        with self._connect() as conn:
+            cursor = conn.execute(query, args)
+            return [_row(cursor, values) for values in cursor.fetchall()]
+
+    def active(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        """The queued or running job for (kind, key), if any."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "SELECT * FROM jobs WHERE kind = ? AND job_key = ? AND status IN (?, ?)"
+                " ORDER BY created_at LIMIT 1",
+                (kind, key, *ACTIVE_STATUSES),
+            )
+            values = cursor.fetchone()
+            return _row(cursor, values) if values else None
+
+    def recover(self) -> List[Dict[str, Any]]:
+        """After a restart: fail jobs left running and return the queued ones."""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'error', message = ?, finished_at = ? WHERE status = 'running'",
+                ("Interrupted by a restart", _now()),
+            )
+        return list(reversed(self.jobs(statuses=["queued"], limit=10_000)))
+
+
+class JobRunner:
+    """Worker pool running async job handlers in the background.
+
+    Args:
+        store: Where jobs and events are persisted
+        handlers: Job kind -> async handler(params, progress) returning a
+            status dict; "success"/"partial" finish the job as success
+        max_workers: Jobs run at the same time
+        on_finish: Called with the finished job (e.g. to invalidate caches)
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handlers: Dict[str, Handler],
+        max_workers: int = JOB_MAX_WORKERS,
+        on_finish: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.store = store
+        self._handlers = dict(handlers)
+        self._on_finish = on_finish
+        self._lock = threading.Lock()
+        self._done: Dict[str, threading.Event] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mousa-job")
+        for job in store.recover():
+            self._start(job)
+        atexit.register(self.close)
+
+    def submit(self, kind: str, params: Dict[str, Any], key: Optional[str] = None) -> str:
+        """Queue a job and return its id.
+
+        A job with the same kind and key that is still queued or running is
+        reused instead of starting a second one.
+
+        Raises:
+            ValueError: No handler for `kind`
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind!r}")
+        with self._lock:
+            existing = self.store.active(kind, key) if key is not None else None
+            if existing is not None:
+                return existing["id"]
+            job = self.store.create(kind, key, params)
+            self._start(job)
+        return job["id"]
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until a job submitted here finishes (or timeout); returns the job."""
+        done = self._done.get(job_id)
+        if done is not None:
+            done.wait(timeout)
+        return self.store.get(job_id)
+
+    def _start(self, job: Dict[str, Any]) -> None:
+        self._done[job["id"]] = threading.Event()
+        self._executor.submit(self._run, job)
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        self.store.update(job_id, status="running", started_at=_now())
+
+        def progress(message: str) -> None:
+            self.store.add_event(job_id, message)
+
+        try:
+            handler = self._handlers[job["kind"]]
+            result = asyncio.run(handler(job["params"] or {}, progress))
+            result = result if isinstance(result, dict) else {"status": "success", "result": result}
+            status = "success" if result.get("status") in ("success", "partial") else "error"
+            self.store.update(
+                job_id,
+                status=status,
+                result=result,
+                message=result.get("message"),
+                finished_at=_now(),
+            )
+        except Exception as e:
+            logger.error(f"Job {job['kind']} {job_id} failed: {e}")
+            self.store.update(job_id, status="error", message=str(e), finished_at=_now())
+        finally:
+            finished = self.store.get(job_id)
+            if self._on_finish and finished:
+                try:
+                    self._on_finish(finished)
+                except Exception as e:
+                    logger.error(f"Job finish hook failed for {job_id}: {e}")
+            self._done[job_id].set()
+
+    def close(self, wait: bool = False) -> None:
+        """Stop accepting jobs; running ones finish unless the process exits."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        atexit.unregister(self.close)
+
+
+async def scavenge_job(params: Dict[str, Any], progress: Callable[[str], None]) -> Dict[str, Any]:
+    """Find a company's contacts and save them.
+
+    Args:
+        params: company_name and optional country
+        progress: Receives the agent's status messages
+
+    Returns:
+        Dict with status, found (agent result) and save (save result)
+    """
+    from . import database_async
+    from .search_agent import SearchAgent
+
+    company_name = params["company_name"]
+    try:
+        found = await SearchAgent().find_company_leads(
+            company_name, params.get("country") or "", callback=progress
+        )
+        if not found or found.get("status") == "error":
+            return {
+                "status": "error",
+                "message": (found or {}).get("message", "Search failed"),
+                "found": found,
+            }
+        progress("💾 Saving to database...")
+        saved = await database_async.save_scavenged_data(company_name, found)
+        status = "success" if saved and saved.get("status") == "success" else "error"
+        return {
+            "status": status,
+            "message": (saved or {}).get("message"),
+            "found": found,
+            "save": saved,
+        }
+    finally:
+        await database_async.close_supabase()
+
+
+def _record_write(job: Dict[str, Any]) -> None:
+    if job["status"] == "success":
+        from .database import refresh_country_rollup
+        from .dataset import get_dataset
+
+        get_dataset().record_write()
+        refresh_country_rollup()
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """Return the process-wide job runner, starting it on first use."""
+    from .enrichment import enrich_job
+
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner(
+                JobStore(),
+                {"scavenge": scavenge_job, "enrich": enrich_job},
+                on_finish=_record_write,
+            )
+        return _runner
+
+
+def submit_scavenge(company_name: str, country: str = "") -> str:
+    """Queue a scavenge for a company (reusing one already in flight); returns the job id."""
+    return get_job_runner().submit(
+        "scavenge", {"company_name": company_name, "country": country}, key=company_name
+    )
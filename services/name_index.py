@@ -0,0 +1,360 @@
+"""In-memory trigram index for fuzzy company-name search.
+
+Names (buyer_name and company_name_english) are normalized (lower case,
+punctuation to single spaces), padded with a space on each side and cut
+into byte trigrams. The index keeps, per trigram, a sorted numpy array of
+the names containing it (CSR layout: one codes/offsets/postings triple), so
+a query touches only the postings of its own trigrams:
+
+- names sharing at least min_score of the query's informative trigrams
+  are found by sorting the concatenated postings and counting runs;
+  trigrams in more than 2% of names (legal suffixes and the like) are
+  left out of this filter,
+- survivors are checked against the common trigrams by binary search;
+  score = mean of query coverage and Dice similarity.
+
+"ferro metal" therefore still finds "FERO METAL INC" and
+"Ferro Metal Inc.". Rows added or changed after a build go to a small
+delta index and removed ones are tombstoned; `refresh` applies the
+difference between two dataset snapshots that way and rebuilds only when
+the delta grows large. Indexes are never modified once built: `add` and
+`remove` return a patched copy sharing the base arrays, so a search always
+sees one consistent snapshot while another thread refreshes.
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+NAME_COLUMNS = ("buyer_name", "company_name_english")
+DEFAULT_MIN_SCORE = 0.5
+# Rebuild instead of patching when the delta exceeds this share of the base
+REBUILD_FRACTION = 0.2
+BUILD_CHUNK_NAMES = 100_000
+# Trigrams in more than this share of names (and at least this many) are
+# not used to find candidates
+STOP_GRAM_FRACTION = 0.02
+STOP_GRAM_MIN_DOCS = 1000
+
+# ASCII punctuation/whitespace; non-ASCII letters are kept. Written as an
+# explicit class so the Arrow (RE2) and Python regex engines agree.
+_SEPARATORS = "[^0-9a-z\u0080-\U0010ffff]+"
+_SEPARATORS_RE = re.compile(_SEPARATORS)
+
+
+def normalize_name(name: str) -> str:
+    """Lower-case `name` and collapse punctuation and whitespace to single spaces."""
+    return _SEPARATORS_RE.sub(" ", str(name).lower()).strip()
+
+
+def _normalize_series(names: pd.Series) -> pd.Series:
+    return names.astype(str).str.lower().str.replace(_SEPARATORS, " ", regex=True).str.strip()
+
+
+def _unique_sorted(values: np.ndarray) -> np.ndarray:
+    """Sorted distinct values (sort-based; np.unique may hash instead)."""
+    values = np.sort(values)
+    if len(values) < 2:
+        return values
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
+
+
+def trigram_pairs(names: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """(name position, trigram code) pairs, unique per name, sorted by position.
+
+    Names should already be normalized (see normalize_name); each is padded
+    with a space on both sides and cut into 24-bit codes of UTF-8 byte
+    trigrams.
+    """
+    encoded = [f" {name} ".encode() for name in names]
+    if not encoded:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint32)
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint32)
+    owner = np.repeat(np.arange(len(encoded), dtype=np.int64), lengths)
+    codes = (data[:-2] << 16) | (data[1:-1] << 8) | data[2:]
+    inside = owner[:-2] == owner[2:]
+    pairs = _unique_sorted((owner[:-2][inside] << 24) | codes[inside])
+    return pairs >> 24, (pairs & 0xFFFFFF).astype(np.uint32)
+
+
+def _query_codes(query: str) -> np.ndarray:
+    name = normalize_name(query)
+    return trigram_pairs([name])[1] if name else np.empty(0, dtype=np.uint32)
+
+
+def _member(postings: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """Boolean mask of `candidates` present in the sorted `postings`."""
+    if not len(postings):
+        return np.zeros(len(candidates), dtype=bool)
+    pos = np.searchsorted(postings, candidates)
+    return postings[np.minimum(pos, len(postings) - 1)] == candidates
+
+
+class TrigramIndex:
+    """Immutable trigram index from row keys to one or more names per row.
+
+    Safe to search from any number of threads; `add` and `remove` return
+    new indexes.
+
+    Args:
+        keys: Row keys (e.g. buyer_name), one per row.
+        names: Per row, the names to index (blank/missing ones are skipped).
+    """
+
+    def __init__(
+        self,
+        keys: Sequence[Hashable] = (),
+        names: Sequence[Sequence[Optional[str]]] = (),
+        normalized: bool = False,
+    ):
+        started = time.perf_counter()
+        doc_keys, doc_names = self._documents(keys, names, normalized)
+
+        positions, codes = [], []
+        for start in range(0, len(doc_names), BUILD_CHUNK_NAMES):
+            pos, code = trigram_pairs(doc_names[start : start + BUILD_CHUNK_NAMES])
+            positions.append((pos + start).astype(np.int32))
+            codes.append(code)
+        positions = np.concatenate(positions) if positions else np.empty(0, dtype=np.int32)
+        codes = np.concatenate(codes) if codes else np.empty(0, dtype=np.uint32)
+
+        # Sorting (code, name) pairs keeps each posting list sorted by name
+        pairs = np.sort((codes.astype(np.uint64) << np.uint64(32)) | positions.astype(np.uint64))
+        sorted_codes = (pairs >> np.uint64(32)).astype(np.uint32)
+        starts = np.flatnonzero(np.concatenate(([True], sorted_codes[1:] != sorted_codes[:-1])))[
+            : len(pairs)
+        ]
+        self._codes = sorted_codes[starts]
+        self._offsets = np.append(starts, len(pairs)).astype(np.int64)
+        self._postings = (pairs & np.uint64(0xFFFFFFFF)).astype(np.int32)
+        self._doc_len = np.bincount(positions, minlength=len(doc_names)).astype(np.int32)
+        self._doc_key = np.array(doc_keys + [None], dtype=object)[:-1]
+        self._alive = np.ones(len(doc_names), dtype=bool)
+        self._base_docs = len(doc_names)
+        self._delta: Dict[int, List[int]] = {}
+        self.build_ms = (time.perf_counter() - started) * 1000
+
+    @staticmethod
+    def _documents(keys, names, normalized: bool = False) -> Tuple[List[Hashable], List[str]]:
+        doc_keys, doc_names = [], []
+        for key, row in zip(keys, names):
+            previous = None
+            for name in row:
+                if not isinstance(name, str):
+                    continue
+                name = name if normalized else normalize_name(name)
+                if name and name != previous:
+                    previous = name
+                    doc_keys.append(key)
+                    doc_names.append(name)
+        return doc_keys, doc_names
+
+    @classmethod
+    def from_frame(
+        cls, frame: pd.DataFrame, key: str = "buyer_name", columns: Sequence[str] = NAME_COLUMNS
+    ) -> "TrigramIndex":
+        """Index the name `columns` of `frame` present, keyed by `key`."""
+        columns = [c for c in columns if c in frame.columns]
+        normalized = [_normalize_series(frame[c]).mask(frame[c].isna()) for c in columns]
+        rows = zip(*(s.tolist() for s in normalized)) if normalized else iter(())
+        return cls(frame[key].tolist() if key in frame.columns else [], list(rows), normalized=True)
+
+    def __len__(self) -> int:
+        return len(set(self._doc_key[self._alive]))
+
+    @property
+    def delta_docs(self) -> int:
+        """Names indexed incrementally since the last build."""
+        return len(self._doc_len) - self._base_docs
+
+    def _postings_for(self, code: int) -> np.ndarray:
+        i = np.searchsorted(self._codes, code)
+        base = (
+            self._postings[self._offsets[i] : self._offsets[i + 1]]
+            if i < len(self._codes) and self._codes[i] == code
+            else None
+        )
+        delta = self._delta.get(int(code))
+        if delta is None:
+            return base if base is not None else np.empty(0, dtype=np.int32)
+        delta = np.asarray(delta, dtype=np.int32)
+        return delta if base is None else np.concatenate([base, delta])
+
+    def search(
+        self, query: str, limit: Optional[int] = 20, min_score: float = DEFAULT_MIN_SCORE
+    ) -> List[Tuple[Hashable, float]]:
+        """Rows whose names best match `query`, best first.
+
+        Args:
+            query: Free-text name, any case or punctuation
+            limit: Maximum rows returned; None for every match
+            min_score: Minimum share of the query's informative trigrams a
+                name must contain
+
+        Returns:
+            (key, score) pairs; score is in (0, 1], 1 for an exact name.
+        """
+        codes = _query_codes(query)
+        if not len(codes) or not len(self._doc_len):
+            return []
+        lists = sorted((self._postings_for(c) for c in codes), key=len)
+        # Filter on the informative trigrams; very common ones ("gmbh",
+        # " inc") only refine the score of the survivors
+        common_at = max(STOP_GRAM_FRACTION * len(self._doc_len), STOP_GRAM_MIN_DOCS)
+        informative = [p for p in lists if len(p) <= common_at] or lists
+        common = lists[len(informative) :]
+
+        # Hits per name over the informative trigrams: one sort of their postings
+        needed = max(1, math.ceil(min_score * len(informative)))
+        hits = np.sort(np.concatenate(informative))
+        if not len(hits):
+            return []
+        starts = np.flatnonzero(np.concatenate(([True], hits[1:] != hits[:-1])))
+        counts = np.diff(np.append(starts, len(hits)))
+        keep = counts >= needed
+        candidates, shared = hits[starts[keep]], counts[keep].astype(np.int32)
+        alive = self._alive[candidates]
+        candidates, shared = candidates[alive], shared[alive]
+        for postings in common:
+            shared += _member(postings, candidates)
+        coverage = shared / len(codes)
+        score = (coverage + 2 * shared / (len(codes) + self._doc_len[candidates])) / 2
+        if not len(score):
+            return []
+
+        # Names per row are few, so 4x limit leaves room for duplicate keys
+        top = len(score) if limit is None else min(len(score), limit * 4)
+        best = np.argpartition(-score, top - 1)[:top] if top < len(score) else np.arange(len(score))
+        best = best[np.argsort(-score[best], kind="stable")]
+
+        results, seen = [], set()
+        for i in best:
+            key = self._doc_key[candidates[i]]
+            if key not in seen:
+                seen.add(key)
+                results.append((key, round(float(score[i]), 4)))
+                if len(results) == limit:
+                    break
+        return results
+
+    def _patched(
+        self,
+        doc_len: np.ndarray,
+        doc_key: np.ndarray,
+        alive: np.ndarray,
+        delta: Dict[int, List[int]],
+    ) -> "TrigramIndex":
+        """Copy sharing the (read-only) base arrays, with new delta state."""
+        patched = object.__new__(TrigramIndex)
+        patched.__dict__.update(self.__dict__)
+        patched._doc_len, patched._doc_key, patched._alive, patched._delta = (
+            doc_len,
+            doc_key,
+            alive,
+            delta,
+        )
+        return patched
+
+    def add(
+        self, keys: Sequence[Hashable], names: Sequence[Sequence[Optional[str]]]
+    ) -> "TrigramIndex":
+        """Index with these rows added (remove rows that changed first)."""
+        doc_keys, doc_names = self._documents(keys, names)
+        if not doc_names:
+            return self
+        first = len(self._doc_len)
+        positions, codes = trigram_pairs(doc_names)
+        added: Dict[int, List[int]] = {}
+        for pos, code in zip((positions + first).tolist(), codes.tolist()):
+            added.setdefault(code, []).append(pos)
+        # Touched posting lists are replaced, never appended to in place
+        delta = dict(self._delta)
+        for code, new in added.items():
+            delta[code] = delta.get(code, []) + new
+        new_keys = np.empty(len(doc_keys), dtype=object)
+        new_keys[:] = doc_keys
+        return self._patched(
+            np.concatenate(
+                [self._doc_len, np.bincount(positions, minlength=len(doc_names)).astype(np.int32)]
+            ),
+            np.concatenate([self._doc_key, new_keys]),
+            np.concatenate([self._alive, np.ones(len(doc_names), dtype=bool)]),
+            delta,
+        )
+
+    def remove(self, keys: Iterable[Hashable]) -> "TrigramIndex":
+        """Index that no longer returns rows with these keys."""
+        keys = list(keys)
+        if not keys or not len(self._doc_key):
+            return self
+        alive = self._alive & ~pd.Index(self._doc_key).isin(keys)
+        return self._patched(self._doc_len, self._doc_key, alive, self._delta)
+
+
+_index: Optional[TrigramIndex] = None
+_indexed: Optional[pd.DataFrame] = None
+_index_lock = threading.Lock()
+
+
+def _name_frame(frame: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Name columns of `frame` indexed by `key` (the key itself may be a name)."""
+    columns = [c for c in NAME_COLUMNS if c in frame.columns]
+    names = frame[list(dict.fromkeys([key] + columns))].drop_duplicates(subset=key, keep="last")
+    return names.set_index(key, drop=False)[columns]
+
+
+def _changed_keys(old: pd.DataFrame, new: pd.DataFrame) -> Tuple[List[Hashable], List[Hashable]]:
+    """(removed or changed keys, added or changed keys) between two name frames."""
+    removed = old.index.difference(new.index)
+    added = new.index.difference(old.index)
+    common = new.index.intersection(old.index)
+    changed = pd.Index([])
+    if len(common):
+        before = old.reindex(columns=new.columns).loc[common].astype(object)
+        after = new.loc[common].astype(object)
+        differs = (before != after).fillna(True).astype(bool) & ~(before.isna() & after.isna())
+        changed = common[differs.any(axis=1).to_numpy()]
+    return list(removed.append(changed)), list(added.append(changed))
+
+
+def refresh(frame: pd.DataFrame, key: str = "buyer_name") -> TrigramIndex:
+    """Process-wide index of `frame`'s names, patched from the previous frame.
+
+    Rows added, changed or removed since the last call are applied to a
+    patched copy of the previous index; a full rebuild happens on first use,
+    when the name columns change, or when the accumulated delta exceeds
+    REBUILD_FRACTION. The new index replaces the old one in a single
+    assignment, so concurrent searches keep using whichever they hold.
+    """
+    global _index, _indexed
+    with _index_lock:
+        if _indexed is frame and _index is not None:
+            return _index
+        names = _name_frame(frame, key)
+        previous = _name_frame(_indexed, key) if _indexed is not None else None
+        if (
+            _index is not None
+            and previous is not None
+            and list(previous.columns) == list(names.columns)
+        ):
+            removed, added = _changed_keys(previous, names)
+            if _index.delta_docs + len(added) <= REBUILD_FRACTION * max(len(names), 1):
+                patched = _index.remove(removed).add(
+                    added, list(names.loc[added].itertuples(index=False, name=None))
+                )
+                _index, _indexed = patched, frame
+                logger.info(f"Name index patched: -{len(removed)} +{len(added)} rows")
+                return _index
+        _index = TrigramIndex.from_frame(frame, key)
+        _indexed = frame
+        logger.info(f"Name index built: {len(frame)} rows in {_index.build_ms:.0f} ms")
+        return _index
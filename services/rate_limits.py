@@ -0,0 +1,147 @@
+"""Process-wide limits on LLM calls, web searches and page fetches.
+
+Every agent session in the process (single scavenges, background jobs and
+bulk enrichment) draws from the same budgets, so running many sessions at
+once cannot exceed the provider's concurrency or rate limits. Each kind
+caps calls in flight and, optionally, calls started per minute.
+
+The limits are thread-based because agent tools run in worker threads and
+background jobs run in separate event loops; async callers use
+`ServiceLimits.async_slot`.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Optional
+
+LIMIT_KINDS = ("llm", "search", "fetch")
+
+# Defaults: calls in flight, calls started per minute (0 = unlimited)
+DEFAULT_LIMITS = {
+    "llm": (
+        int(os.environ.get("LLM_MAX_CONCURRENT", "8")),
+        float(os.environ.get("LLM_PER_MINUTE", "0")),
+    ),
+    "search": (
+        int(os.environ.get("SEARCH_MAX_CONCURRENT", "3")),
+        float(os.environ.get("SEARCH_PER_MINUTE", "30")),
+    ),
+    "fetch": (
+        int(os.environ.get("FETCH_MAX_CONCURRENT", "8")),
+        float(os.environ.get("FETCH_PER_MINUTE", "0")),
+    ),
+}
+
+
+class Limit:
+    """Concurrency cap plus even spacing of call starts.
+
+    Args:
+        max_concurrent: Calls in flight at once
+        per_minute: Calls started per minute; 0 or None for no rate limit
+    """
+
+    def __init__(self, max_concurrent: int, per_minute: Optional[float] = None):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.per_minute = per_minute or 0
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+        self.calls = 0
+        self.waited = 0.0
+        self.active = 0
+        self.peak = 0
+
+    def acquire(self) -> None:
+        """Block until a call may start."""
+        started = time.monotonic()
+        self._slots.acquire()
+        if self.per_minute:
+            with self._lock:
+                now = time.monotonic()
+                start_at = max(now, self._next_start)
+                self._next_start = start_at + 60.0 / self.per_minute
+            if start_at > now:
+                time.sleep(start_at - now)
+        with self._lock:
+            self.calls += 1
+            self.waited += time.monotonic() - started
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def release(self) -> None:
+        with self._lock:
+            self.active -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "wait_s": round(self.waited, 3),
+                "peak": self.peak,
+                "max_concurrent": self.max_concurrent,
+                "per_minute": self.per_minute,
+            }
+
+
+class ServiceLimits:
+    """One Limit per kind (llm, search, fetch).
+
+    Args:
+        limits: kind -> (max_concurrent, per_minute); missing kinds use
+            DEFAULT_LIMITS
+    """
+
+    def __init__(self, limits: Optional[Dict[str, tuple]] = None):
+        merged = {**DEFAULT_LIMITS, **(limits or {})}
+        self._limits = {kind: Limit(*merged[kind]) for kind in LIMIT_KINDS}
+
+    def __getitem__(self, kind: str) -> Limit:
+        return self._limits[kind]
+
+    @contextmanager
+    def slot(self, kind: str):
+        """Hold one call of `kind` (blocking)."""
+        limit = self._limits[kind]
+        limit.acquire()
+        try:
+            yield
+        finally:
+            limit.release()
+
+    @asynccontextmanager
+    async def async_slot(self, kind: str):
+        """Hold one call of `kind` without blocking the event loop."""
+        limit = self._limits[kind]
+        acquiring = asyncio.ensure_future(asyncio.to_thread(limit.acquire))
+        try:
+            await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # The worker thread still takes the slot; hand it back when it does
+            acquiring.add_done_callback(lambda f: f.cancelled() or f.exception() or limit.release())
+            raise
+        try:
+            yield
+        finally:
+            limit.release()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Calls, total wait, peak concurrency and configuration per kind."""
+        return {kind: limit.stats() for kind, limit in self._limits.items()}
+
+
+_limits = None
+_limits_lock = threading.Lock()
+
+
+def get_service_limits() -> ServiceLimits:
+    """Return the process-wide limits shared by every agent session."""
+    global _limits
+    with _limits_lock:
+        if _limits is None:
+            _limits = ServiceLimits()
+        return _limits
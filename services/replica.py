@@ -0,0 +1,193 @@
+"""On-disk SQLite replica of the 'mousa' table for instant cold starts.
+
+Each read profile is stored in its own table together with the sync
+watermark and the time it was last reconciled with Supabase, so a fresh
+process can render the last known dataset before any network call.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Project root = parent of services/
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPLICA_DIR = os.environ.get("MOUSA_DATA_DIR", os.path.join(PROJECT_ROOT, "data"))
+REPLICA_FILE = "mousa_replica.sqlite"
+# Keys per DELETE when rows of a delta sync are replaced (SQLite variable limit)
+REPLICA_DELETE_CHUNK = 500
+
+_write_lock = threading.Lock()
+
+
+def replica_path() -> str:
+    """Path of the replica database under the configured data dir."""
+    return os.path.join(REPLICA_DIR, REPLICA_FILE)
+
+
+def _connect() -> sqlite3.Connection:
+    os.makedirs(REPLICA_DIR, exist_ok=True)
+    conn = sqlite3.connect(replica_path(), timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS replica_meta ("
+        " profile TEXT PRIMARY KEY, watermark TEXT, synced_at REAL, last_full REAL,"
+        " row_count INTEGER, json_columns TEXT)"
+    )
+    return conn
+
+
+def _table_name(profile: str) -> str:
+    if not profile.isidentifier():
+        raise ValueError(f"Invalid profile name for replica: {profile!r}")
+    return f"buyers_{profile}"
+
+
+def _encode_json(frame: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+    """Copy of `frame` with dict/list cells (e.g. `exporters`) as JSON text."""
+    frame = frame.copy()
+    json_columns = [
+        col for col in frame.columns if frame[col].map(lambda v: isinstance(v, (dict, list))).any()
+    ]
+    for col in json_columns:
+        frame[col] = frame[col].map(
+            lambda v: json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else v
+        )
+    return frame, json_columns
+
+
+def _upsert_rows(
+    conn: sqlite3.Connection,
+    profile: str,
+    changed: pd.DataFrame,
+    removed: Iterable[str],
+    key: str,
+) -> Optional[List[str]]:
+    """Replace the stored rows of the changed and removed keys.
+
+    Returns the table's JSON columns, or None when the stored table cannot
+    take these rows (no snapshot yet, new columns) and needs a full rewrite.
+    """
+    table = _table_name(profile)
+    meta = conn.execute(
+        "SELECT json_columns FROM replica_meta WHERE profile = ?", (profile,)
+    ).fetchone()
+    stored = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if key in changed.columns:
+        changed = changed.drop_duplicates(subset=key, keep="last")
+    rows, json_columns = _encode_json(changed)
+    known_json = json.loads(meta[0] or "[]") if meta else []
+    if (
+        meta is None
+        or key not in stored
+        or set(rows.columns) - stored
+        or set(json_columns) - set(known_json)
+    ):
+        return None
+
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_{key} ON {table} ({key})")
+    keys = list(rows[key]) if key in rows.columns else []
+    keys = list(dict.fromkeys(keys + list(removed)))
+    for start in range(0, len(keys), REPLICA_DELETE_CHUNK):
+        chunk = keys[start : start + REPLICA_DELETE_CHUNK]
+        placeholders = ",".join("?" * len(chunk))
+        conn.execute(f"DELETE FROM {table} WHERE {key} IN ({placeholders})", chunk)
+    if not rows.empty:
+        rows.to_sql(table, conn, if_exists="append", index=False)
+    return known_json
+
+
+def save_replica(
+    profile: str,
+    frame: pd.DataFrame,
+    watermark: Optional[str],
+    synced_at: float,
+    last_full: Optional[float] = None,
+    changed: Optional[pd.DataFrame] = None,
+    removed: Iterable[str] = (),
+    key: str = "buyer_name",
+) -> bool:
+    """Store the snapshot for `profile`.
+
+    Without `changed` the whole table is rewritten. With the rows of a
+    delta sync in `changed` (and keys dropped since in `removed`), only
+    those rows are replaced by `key`, so the cost follows churn; it falls
+    back to a full rewrite when the stored table cannot take them.
+    Dict/list cells (e.g. `exporters`) are stored as JSON text.
+
+    Returns:
+        True on success, False if the replica could not be written.
+    """
+    try:
+        table = _table_name(profile)
+        if not key.isidentifier():
+            raise ValueError(f"Invalid key column for replica: {key!r}")
+        with _write_lock, _connect() as conn:
+            json_columns = None
+            if changed is not None:
+                json_columns = _upsert_rows(conn, profile, changed, removed, key)
+            written = len(changed) if json_columns is not None else len(frame)
+            if json_columns is None:
+                rows, json_columns = _encode_json(frame)
+                rows.to_sql(table, conn, if_exists="replace", index=False)
+                if key in rows.columns:
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_{key} ON {table} ({key})")
+            conn.execute(
+                "INSERT OR REPLACE INTO replica_meta VALUES (?, ?, ?, ?, ?, ?)",
+                (profile, watermark, synced_at, last_full, len(frame), json.dumps(json_columns)),
+            )
+        logger.info(
+            f"Replica saved: {written} of {len(frame)} rows written for profile '{profile}'"
+        )
+        return True
+    except (sqlite3.Error, OSError, ValueError) as e:
+        logger.error(f"Failed to write replica for profile '{profile}': {e}")
+        return False
+
+
+def load_replica(profile: str) -> Optional[Dict[str, Any]]:
+    """Load the stored snapshot for `profile`.
+
+    Returns:
+        Dict with frame, watermark, synced_at, last_full and row_count,
+        or None if there is no usable replica.
+    """
+    if not os.path.exists(replica_path()):
+        return None
+    try:
+        started = time.perf_counter()
+        with _connect() as conn:
+            meta = conn.execute(
+                "SELECT watermark, synced_at, last_full, row_count, json_columns"
+                " FROM replica_meta WHERE profile = ?",
+                (profile,),
+            ).fetchone()
+            if meta is None:
+                return None
+            frame = pd.read_sql_query(f"SELECT * FROM {_table_name(profile)}", conn)
+    except (sqlite3.Error, OSError, ValueError, pd.errors.DatabaseError) as e:
+        logger.error(f"Failed to read replica for profile '{profile}': {e}")
+        return None
+
+    watermark, synced_at, last_full, row_count, json_columns = meta
+    for col in json.loads(json_columns or "[]"):
+        if col in frame.columns:
+            frame[col] = frame[col].map(lambda v: json.loads(v) if isinstance(v, str) else v)
+
+    logger.info(
+        f"Replica loaded: {len(frame)} rows for profile '{profile}' "
+        f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+    )
+    return {
+        "frame": frame,
+        "watermark": watermark,
+        "synced_at": synced_at,
+        "last_full": last_full,
+        "row_count": row_count,
+    }
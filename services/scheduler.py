@@ -0,0 +1,336 @@
+"""Value- and staleness-aware enrichment scheduler.
+
+Ranks buyers by what enriching them is expected to be worth and feeds the
+best ones to the agent from a background loop, so the limited LLM and
+search budget goes to the highest-value leads first:
+
+    priority = log1p(total_usd)                 import volume
+             * missing-field weight             email 0.6, phone 0.25, website 0.15
+             * (0.5 + 0.5 * staleness)          0 right after a scavenge, 1 after STALE_DAYS
+             * 0.5 ** misses                    earlier "not found" results
+
+Buyers scavenged within the skip window are left alone, aliases are
+skipped, and a company the agent found nothing for is retried only after
+an exponentially growing back-off (BACKOFF_BASE, doubling, capped at
+BACKOFF_MAX). Back-off state is kept in data/enrichment.sqlite.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .buyer_frame import FLAG_COLUMNS
+from .enrichment import (
+    DEFAULT_CONCURRENCY,
+    LEDGER_FILE,
+    EnrichmentLedger,
+    enrich_buyers,
+    select_candidates,
+)
+from .rate_limits import ServiceLimits
+from .replica import REPLICA_DIR
+
+logger = logging.getLogger(__name__)
+
+# Weight of each missing contact field in the expected value
+FIELD_WEIGHTS = {"email": 0.6, "phone": 0.25, "website": 0.15}
+# Not rescheduled within this window after a scavenge
+SKIP_WINDOW = timedelta(days=float(os.environ.get("ENRICH_SKIP_DAYS", "30")))
+# Age at which a previous scavenge no longer lowers the priority
+STALE_DAYS = 180
+# Back-off after "not found": BACKOFF_BASE * 2 ** (misses - 1), capped
+BACKOFF_BASE = timedelta(days=1)
+BACKOFF_MAX = timedelta(days=90)
+# Retry delay after an error (not counted as a miss)
+ERROR_RETRY = timedelta(hours=1)
+
+SCHEDULER_INTERVAL = float(os.environ.get("ENRICH_SCHEDULER_INTERVAL", "300"))
+SCHEDULER_BATCH = int(os.environ.get("ENRICH_SCHEDULER_BATCH", "25"))
+
+
+def backoff_delay(misses: int) -> timedelta:
+    """Wait before retrying a company the agent found nothing for `misses` times."""
+    if misses <= 0:
+        return timedelta(0)
+    return min(BACKOFF_BASE * 2 ** min(misses - 1, 16), BACKOFF_MAX)
+
+
+class BackoffStore:
+    """Per-company "not found" counts and next allowed attempt, in SQLite.
+
+    Args:
+        path: Database file; defaults to the enrichment ledger's file
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(REPLICA_DIR, LEDGER_FILE)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS enrichment_backoff ("
+                " buyer_name TEXT PRIMARY KEY, misses INTEGER NOT NULL, last_attempt TEXT, next_attempt TEXT)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        return sqlite3.connect(self.path, timeout=30)
+
+    def record(self, buyer_name: str, status: str, now: Optional[datetime] = None) -> None:
+        """Update a company after an attempt (enriched, not_found or error).
+
+        Enriched companies reset their misses and are held for SKIP_WINDOW,
+        also covering the time until the buyer frame shows the new data.
+        """
+        now = now or datetime.now(timezone.utc)
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT misses FROM enrichment_backoff WHERE buyer_name = ?", (buyer_name,)
+            ).fetchone()
+            if status == "enriched":
+                misses, delay = 0, SKIP_WINDOW
+            elif status == "not_found":
+                misses = (row[0] if row else 0) + 1
+                delay = backoff_delay(misses)
+            else:
+                misses, delay = (row[0] if row else 0), ERROR_RETRY
+            conn.execute(
+                "INSERT OR REPLACE INTO enrichment_backoff VALUES (?, ?, ?, ?)",
+                (buyer_name, misses, now.isoformat(), (now + delay).isoformat()),
+            )
+
+    def state(self) -> pd.DataFrame:
+        """buyer_name, misses and next_attempt (UTC) of every company tried so far."""
+        with self._connect() as conn:
+            frame = pd.read_sql_query(
+                "SELECT buyer_name, misses, next_attempt FROM enrichment_backoff", conn
+            )
+        frame["next_attempt"] = pd.to_datetime(frame["next_attempt"], utc=True, format="ISO8601")
+        return frame
+
+
+def rank_candidates(
+    frame: pd.DataFrame,
+    backoff: Optional[pd.DataFrame] = None,
+    aliases: Optional[Dict[str, str]] = None,
+    now: Optional[datetime] = None,
+    skip_window: timedelta = SKIP_WINDOW,
+    limit: Optional[int] = None,
+) -> pd.DataFrame:
+    """Buyers worth enriching now, highest priority first.
+
+    Args:
+        frame: Typed buyer frame; last_scavenged_at is used when present
+        backoff: BackoffStore.state()
+        aliases: {alias_name: canonical_name}; aliases are skipped
+        now: Reference time (UTC)
+        skip_window: Buyers scavenged more recently are skipped
+        limit: At most this many rows
+
+    Returns:
+        select_candidates() columns plus value, need, staleness, misses
+        and priority
+    """
+    now = pd.Timestamp(now or datetime.now(timezone.utc))
+    need = np.zeros(len(frame))
+    for flag, field in FLAG_COLUMNS.items():
+        need += FIELD_WEIGHTS[field] * ~frame[flag].to_numpy(dtype=bool)
+
+    if "last_scavenged_at" in frame.columns:
+        age_days = ((now - frame["last_scavenged_at"]).dt.total_seconds() / 86400).to_numpy(
+            dtype=float, na_value=np.inf
+        )
+    else:
+        age_days = np.full(len(frame), np.inf)
+    staleness = np.clip(age_days / STALE_DAYS, 0.0, 1.0)
+
+    misses = np.zeros(len(frame), dtype=int)
+    blocked = np.zeros(len(frame), dtype=bool)
+    if backoff is not None and len(backoff):
+        state = backoff.set_index("buyer_name")
+        names = frame["buyer_name"].astype(object)
+        misses = names.map(state["misses"]).fillna(0).to_numpy(dtype=int)
+        next_attempt = names.map(state["next_attempt"])
+        blocked = (pd.to_datetime(next_attempt, utc=True) > now).to_numpy(dtype=bool)
+
+    value = np.log1p(frame["total_usd"].clip(lower=0).to_numpy(dtype=float))
+    scored = frame.assign(
+        value=value,
+        need=need,
+        staleness=staleness,
+        misses=misses,
+        priority=value * need * (0.5 + 0.5 * staleness) * 0.5**misses,
+    )
+    eligible = (need > 0) & (age_days >= skip_window.total_seconds() / 86400) & ~blocked
+    candidates = select_candidates(scored[eligible], missing=[], aliases=aliases)
+    extra = ["value", "need", "staleness", "misses", "priority"]
+    ranked = candidates.merge(
+        scored.loc[eligible, ["buyer_name"] + extra], on="buyer_name", how="left"
+    )
+    ranked = ranked.sort_values(["priority", "buyer_name"], ascending=[False, True], kind="stable")
+    return ranked.head(limit).reset_index(drop=True) if limit else ranked.reset_index(drop=True)
+
+
+def _default_frame() -> pd.DataFrame:
+    from .dataset import get_dataset
+
+    return get_dataset().frame("enrichment", background=False).frame
+
+
+def _default_aliases() -> Dict[str, str]:
+    from .database import fetch_aliases
+
+    return fetch_aliases() or {}
+
+
+class EnrichmentScheduler:
+    """Background loop enriching the top-ranked buyers every `interval` seconds.
+
+    Args:
+        load_frame: Returns the current typed buyer frame
+        load_aliases: Returns {alias_name: canonical_name}
+        batch_size: Companies per cycle (the budget per interval)
+        interval: Seconds between cycles
+        concurrency: Agent sessions in flight within a cycle
+        skip_window: Buyers scavenged more recently are skipped
+        backoff: Back-off store
+        ledger: Enrichment ledger; each cycle is one run
+        limits: Call budgets (process-wide default)
+        find, save: Passed to enrich_buyers (agent and database defaults)
+        on_cycle: Called with each cycle's summary
+    """
+
+    def __init__(
+        self,
+        load_frame: Callable[[], pd.DataFrame] = _default_frame,
+        load_aliases: Callable[[], Dict[str, str]] = _default_aliases,
+        batch_size: int = SCHEDULER_BATCH,
+        interval: float = SCHEDULER_INTERVAL,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        skip_window: timedelta = SKIP_WINDOW,
+        backoff: Optional[BackoffStore] = None,
+        ledger: Optional[EnrichmentLedger] = None,
+        limits: Optional[ServiceLimits] = None,
+        find=None,
+        save=None,
+        on_cycle: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.load_frame = load_frame
+        self.load_aliases = load_aliases
+        self.batch_size = batch_size
+        self.interval = interval
+        self.concurrency = concurrency
+        self.skip_window = skip_window
+        self.backoff = backoff or BackoffStore()
+        self.ledger = ledger
+        self.limits = limits
+        self.find = find
+        self.save = save
+        self.on_cycle = on_cycle
+        self.cycles = 0
+        self.last_summary: Optional[Dict[str, Any]] = None
+        self.last_cycle_at: Optional[datetime] = None
+        self._cycle_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def next_batch(self) -> pd.DataFrame:
+        """The companies the next cycle would enrich, in priority order."""
+        return rank_candidates(
+            self.load_frame(),
+            backoff=self.backoff.state(),
+            aliases=self.load_aliases(),
+            skip_window=self.skip_window,
+            limit=self.batch_size,
+        )
+
+    def run_cycle(self) -> Dict[str, Any]:
+        """Enrich one batch now (in this thread) and return its summary."""
+        with self._cycle_lock:
+            batch = self.next_batch()
+            summary = asyncio.run(
+                enrich_buyers(
+                    batch,
+                    concurrency=self.concurrency,
+                    limits=self.limits,
+                    ledger=self.ledger,
+                    find=self.find,
+                    save=self.save,
+                    on_result=self.backoff.record,
+                )
+            )
+            self.cycles += 1
+            self.last_summary = summary
+            self.last_cycle_at = datetime.now(timezone.utc)
+        if self.on_cycle:
+            self.on_cycle(summary)
+        return summary
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the background loop (no-op if already running)."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="mousa-enrichment-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop after the current cycle."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                summary = self.run_cycle()
+                logger.info(
+                    f"Enrichment cycle {self.cycles}: {summary.get('companies', 0)} companies"
+                )
+            except Exception as e:
+                logger.error(f"Enrichment cycle failed: {e}")
+            self._stop.wait(self.interval)
+
+    def status(self) -> Dict[str, Any]:
+        """running, stopping, cycles, last_cycle_at and last_summary."""
+        return {
+            "running": self.running,
+            "stopping": self.running and self._stop.is_set(),
+            "cycles": self.cycles,
+            "last_cycle_at": self.last_cycle_at,
+            "last_summary": self.last_summary,
+        }
+
+
+def _record_write(summary: Dict[str, Any]) -> None:
+    if summary.get("enriched"):
+        from .database import refresh_country_rollup
+        from .dataset import get_dataset
+
+        get_dataset().record_write()
+        refresh_country_rollup()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> EnrichmentScheduler:
+    """Return the process-wide scheduler (not started)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = EnrichmentScheduler(on_cycle=_record_write)
+        return _scheduler
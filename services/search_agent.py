@@ -6,6 +6,8 @@ import asyncio
 from typing import Dict, Any
 from dotenv import load_dotenv
 
+from .rate_limits import get_service_limits
+
 # Load env variables (API Keys)
 load_dotenv()
 
@@ -31,16 +33,20 @@ except ImportError:
         raise
 
 class SearchAgent:
-    def __init__(self):
+    def __init__(self, limits=None):
         """
         Initialize the SearchAgent with advanced DeepSeekClient.
+        
+        Args:
+            limits: ServiceLimits for LLM calls, searches and page fetches
+                (defaults to the process-wide limits)
         """
         api_key = os.getenv("DEEPSEEK_API_KEY")
         if not api_key:
             logger.warning("DEEPSEEK_API_KEY not found in environment variables.")
         
         # Initialize Advanced DeepSeek Client with Tool Calling
-        self.client = DeepSeekClient(api_key=api_key)
+        self.client = DeepSeekClient(api_key=api_key, limits=limits or get_service_limits())
 
     async def find_company_leads(self, company_name: str, country: str = "", callback=None) -> Dict[str, Any]:
         """
@@ -0,0 +1,131 @@
+"""Write-behind queue that coalesces single-row writes into batched upserts.
+
+Rows are keyed by buyer_name: repeated writes to the same company before a
+flush are merged into one row. A background thread flushes every
+`flush_interval` seconds, or as soon as `max_batch` distinct rows are
+pending. Each submit returns a Future that resolves to the repo's usual
+status dict once the row has been written (or failed).
+"""
+
+import atexit
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """Coalescing background writer for 'mousa' rows.
+
+    Args:
+        writer: Callable taking a list of rows and returning a
+            bulk_upsert_buyers-style result dict.
+        flush_interval: Seconds between background flushes.
+        max_batch: Pending rows that trigger an immediate flush.
+        key: Column used to merge rows.
+        merge: merge(pending, row) folds a new row into the pending one in
+            place; defaults to dict.update (later values win).
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[List[Dict[str, Any]]], Dict[str, Any]],
+        flush_interval: float = 1.0,
+        max_batch: int = 500,
+        key: str = "buyer_name",
+        merge: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+    ):
+        self._writer = writer
+        self._flush_interval = flush_interval
+        self._max_batch = max_batch
+        self._key = key
+        self._merge = merge or dict.update
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._futures: Dict[str, List[Future]] = {}
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="mousa-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, row: Dict[str, Any]) -> Future:
+        """Queue a row for writing; merges with any pending row for the same key.
+
+        Returns:
+            Future resolving to a dict with status success/error.
+        """
+        future: Future = Future()
+        name = row.get(self._key)
+        if not name:
+            future.set_result({"status": "error", "message": f"Row has no {self._key}"})
+            return future
+
+        with self._cond:
+            if self._closed:
+                future.set_result({"status": "error", "message": "Write queue is closed"})
+                return future
+            self._merge(self._pending.setdefault(name, {}), row)
+            self._futures.setdefault(name, []).append(future)
+            if len(self._pending) >= self._max_batch:
+                self._cond.notify()
+        return future
+
+    def pending(self) -> int:
+        """Number of distinct rows waiting to be written."""
+        with self._cond:
+            return len(self._pending)
+
+    def flush(self) -> None:
+        """Write everything pending now, in the calling thread."""
+        with self._flush_lock:
+            with self._cond:
+                rows = list(self._pending.values())
+                futures = self._futures
+                self._pending = {}
+                self._futures = {}
+            if rows:
+                self._write(rows, futures)
+
+    def _write(self, rows: List[Dict[str, Any]], futures: Dict[str, List[Future]]) -> None:
+        try:
+            result = self._writer(rows)
+        except Exception as e:
+            logger.error(f"Write-behind flush of {len(rows)} rows failed: {e}")
+            result = {"status": "error", "message": str(e), "failed_names": list(futures)}
+
+        failed = set(result.get("failed_names") or [])
+        if result.get("status") == "error" and not failed:
+            failed = set(futures)
+
+        for name, waiters in futures.items():
+            if name in failed:
+                outcome = {"status": "error", "message": result.get("message", "Write failed")}
+            else:
+                outcome = {"status": "success"}
+            for future in waiters:
+                future.set_result(outcome)
+
+        logger.info(f"Write-behind flushed {len(rows)} rows ({len(failed)} failed)")
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self._max_batch:
+                    self._cond.wait(self._flush_interval)
+                if self._closed:
+                    return
+            self.flush()
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Stop the background thread and flush whatever is still pending."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        self.flush()
+        atexit.unregister(self.close)
@@ -5,3 +5,23 @@ ADD COLUMN IF NOT EXISTS phone text,
 ADD COLUMN IF NOT EXISTS website text,
 ADD COLUMN IF NOT EXISTS address text,
 ADD COLUMN IF NOT EXISTS last_scavenged_at timestamptz;
+
+-- Incremental sync: updated_at is bumped by trigger on every insert/update
+-- so clients can fetch only rows changed since their last high-water mark.
+ALTER TABLE mousa
+ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now();
+
+CREATE OR REPLACE FUNCTION mousa_touch_updated_at()
+RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS mousa_set_updated_at ON mousa;
+CREATE TRIGGER mousa_set_updated_at
+BEFORE INSERT OR UPDATE ON mousa
+FOR EACH ROW EXECUTE FUNCTION mousa_touch_updated_at();
+
+CREATE INDEX IF NOT EXISTS mousa_updated_at_idx ON mousa (updated_at);
@@ -0,0 +1,56 @@
+-- Phase 5 Migration: Normalized Contacts
+-- Run this in Supabase SQL Editor. One row per (buyer, kind, value) instead
+-- of comma-joined text in mousa.email / mousa.phone / mousa.website, so
+-- dedupe, "has email" counts and per-domain lookups are indexed queries.
+
+CREATE TABLE IF NOT EXISTS buyer_contacts (
+    id bigint GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    buyer_name text NOT NULL,
+    kind text NOT NULL CHECK (kind IN ('email', 'phone', 'website')),
+    value text NOT NULL CHECK (btrim(value) <> ''),
+    -- Email domain for per-domain lookups; NULL for phones and websites
+    domain text GENERATED ALWAYS AS (
+        CASE WHEN kind = 'email' THEN lower(split_part(value, '@', 2)) END
+    ) STORED,
+    source_url text,
+    found_at timestamptz NOT NULL DEFAULT now(),
+    CONSTRAINT buyer_contacts_unique UNIQUE (buyer_name, kind, value)
+);
+
+-- buyer_name lookups are served by the unique constraint's index
+CREATE INDEX IF NOT EXISTS buyer_contacts_kind_value_idx ON buyer_contacts (kind, value);
+CREATE INDEX IF NOT EXISTS buyer_contacts_domain_idx ON buyer_contacts (domain) WHERE domain IS NOT NULL;
+
+-- Buyers and contacts per kind (e.g. the "has email" count)
+CREATE OR REPLACE VIEW buyer_contact_counts
+WITH (security_invoker = true) AS
+SELECT
+    kind,
+    count(DISTINCT buyer_name)::bigint AS buyers,
+    count(*)::bigint AS contacts
+FROM buyer_contacts
+GROUP BY kind;
+
+-- Backfill from the comma-joined columns. Emails are stored lower-case
+-- (services.database.normalize_contact); safe to re-run.
+INSERT INTO buyer_contacts (buyer_name, kind, value, found_at)
+SELECT m.buyer_name, c.kind, c.value, coalesce(m.last_scavenged_at, now())
+FROM mousa m
+CROSS JOIN LATERAL (
+    SELECT 'email' AS kind, lower(btrim(v)) AS value
+    FROM unnest(string_to_array(m.email, ',')) AS v
+    WHERE btrim(v) LIKE '%_@_%'
+    UNION ALL
+    SELECT 'phone', btrim(v)
+    FROM unnest(string_to_array(m.phone, ',')) AS v
+    WHERE length(btrim(v)) >= 10
+    UNION ALL
+    SELECT 'website', rtrim(btrim(v), '/')
+    FROM unnest(string_to_array(m.website, ',')) AS v
+    WHERE nullif(btrim(v), '') IS NOT NULL
+      AND lower(btrim(v)) NOT IN ('none', 'nan', 'null')
+) AS c
+ON CONFLICT ON CONSTRAINT buyer_contacts_unique DO NOTHING;
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON buyer_contacts TO anon, authenticated;
+GRANT SELECT ON buyer_contact_counts TO anon, authenticated;
@@ -2,3 +2,23 @@
 -- Run this in Supabase SQL Editor to track email outreach
 ALTER TABLE mousa
 ADD COLUMN IF NOT EXISTS last_contacted_at timestamptz;
+
+-- Batched outreach tracking: stamp many companies in one statement
+-- (services.database.mark_contacted). Only existing rows are updated;
+-- returns the number of rows stamped.
+CREATE OR REPLACE FUNCTION mousa_mark_contacted(
+    buyer_names text[],
+    contacted_at timestamptz DEFAULT now()
+)
+RETURNS integer
+LANGUAGE sql VOLATILE AS $$
+    WITH stamped AS (
+        UPDATE mousa
+        SET last_contacted_at = contacted_at
+        WHERE buyer_name = ANY (buyer_names)
+        RETURNING 1
+    )
+    SELECT count(*)::integer FROM stamped;
+$$;
+
+GRANT EXECUTE ON FUNCTION mousa_mark_contacted(text[], timestamptz) TO anon, authenticated;
@@ -0,0 +1,53 @@
+-- Phase 3 Migration: Server-side Metrics
+-- Run this in Supabase SQL Editor so the header and dashboard KPIs are
+-- computed in Postgres instead of downloading every row.
+
+-- Single-row KPI summary (Total Companies / Enriched Leads / Potential Value)
+CREATE OR REPLACE VIEW mousa_summary
+WITH (security_invoker = true) AS
+SELECT
+    count(*)::bigint AS total_companies,
+    count(*) FILTER (
+        WHERE nullif(btrim(email), '') IS NOT NULL
+          AND lower(btrim(email)) NOT IN ('none', 'nan', 'null')
+    )::bigint AS enriched_count,
+    coalesce(sum(total_usd), 0)::float8 AS total_value
+FROM mousa;
+
+-- Per-country breakdown, grouped by destination_country or country_english
+CREATE OR REPLACE FUNCTION mousa_country_breakdown(
+    country_column text DEFAULT 'destination_country',
+    max_rows integer DEFAULT NULL
+)
+RETURNS TABLE (
+    country text,
+    companies bigint,
+    enriched bigint,
+    total_value float8
+)
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    IF country_column NOT IN ('destination_country', 'country_english') THEN
+        RAISE EXCEPTION 'Unsupported country column: %', country_column;
+    END IF;
+
+    RETURN QUERY EXECUTE format(
+        'SELECT %1$I::text AS country,
+                count(*)::bigint AS companies,
+                count(*) FILTER (
+                    WHERE nullif(btrim(email), '''') IS NOT NULL
+                      AND lower(btrim(email)) NOT IN (''none'', ''nan'', ''null'')
+                )::bigint AS enriched,
+                coalesce(sum(total_usd), 0)::float8 AS total_value
+         FROM mousa
+         WHERE nullif(btrim(%1$I::text), '''') IS NOT NULL
+         GROUP BY 1
+         ORDER BY companies DESC, country
+         LIMIT $1',
+        country_column
+    ) USING max_rows;
+END;
+$$;
+
+GRANT SELECT ON mousa_summary TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION mousa_country_breakdown(text, integer) TO anon, authenticated;
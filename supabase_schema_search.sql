@@ -0,0 +1,13 @@
+-- Phase 4 Migration: Filter & Search Indexes
+-- Run this in Supabase SQL Editor. Backs the country filter and the
+-- case-insensitive company-name search pushed down by query_buyers().
+
+-- Country multiselect: destination_country = ANY(...)
+CREATE INDEX IF NOT EXISTS mousa_destination_country_idx
+ON mousa (destination_country);
+
+-- "Search Company Name": buyer_name ILIKE '%...%' via trigram GIN index
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS mousa_buyer_name_trgm_idx
+ON mousa USING gin (buyer_name gin_trgm_ops);
@@ -0,0 +1,129 @@
+"""Offline benchmark of services.database against the PostgREST fake.
+
+Measures the data layer end to end (supabase-py, httpx pool, JSON
+encoding) with a configurable per-request latency standing in for the
+network round trip:
+
+    python -m tests.bench_database --rows 100000 --latency 0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from services import database
+from services.buyer_sync import BuyerSync
+from tests.fake_postgrest import FakePostgrest
+
+COUNTRIES = ["USA", "GERMANY", "JAPAN", "CHINA", "INDIA", "BRAZIL", "FRANCE", "ITALY"]
+
+
+def synthetic_buyers(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    epoch = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "buyer_name": f"Buyer {i:07d}",
+            "destination_country": rng.choice(COUNTRIES),
+            "total_usd": round(rng.uniform(1_000, 5_000_000), 2),
+            "email": f"sales@buyer{i}.com" if rng.random() < 0.4 else None,
+            "phone": None,
+            "website": None,
+            "address": None,
+            "updated_at": (epoch + timedelta(minutes=i)).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def run_case(fake: FakePostgrest, name: str, fn: Callable[[], object]) -> None:
+    requests_before, in_before, out_before = len(fake.requests), fake.bytes_in, fake.bytes_out
+    started = time.perf_counter()
+    detail = fn()
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<38} {elapsed * 1000:>10.1f} ms {len(fake.requests) - requests_before:>7} req "
+        f"{(fake.bytes_in - in_before) / 1024:>9.0f} KiB up {(fake.bytes_out - out_before) / 1024:>9.0f} KiB down"
+        + (f"  {detail}" if detail else "")
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000, help="Rows seeded into 'mousa'")
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds added per request")
+    parser.add_argument(
+        "--changes", type=int, default=500, help="Rows changed before the delta sync"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of requests failing with 503"
+    )
+    args = parser.parse_args()
+
+    os.environ.setdefault("SUPABASE_URL", "http://fake-postgrest.local")
+    os.environ.setdefault("SUPABASE_KEY", "fake-anon-key")
+
+    rows = synthetic_buyers(args.rows)
+    fake = FakePostgrest(latency=args.latency, error_rate=args.error_rate)
+    fake.seed("mousa", rows)
+    database.set_http_transport(fake)
+
+    print(f"{args.rows} rows, {args.latency * 1000:.1f} ms latency, error rate {args.error_rate}\n")
+
+    for page_size in (500, database.DEFAULT_PAGE_SIZE):
+        for prefetch in (False, True):
+            run_case(
+                fake,
+                f"iter_buyers page={page_size} prefetch={prefetch}",
+                lambda page_size=page_size, prefetch=prefetch: (
+                    f"{sum(1 for _ in database.iter_buyers(page_size, profile='table', prefetch=prefetch))} rows"
+                ),
+            )
+
+    run_case(
+        fake,
+        "query_buyers countries+name, count",
+        lambda: (
+            f"count={database.query_buyers(countries=COUNTRIES[:2], name_pattern='00', limit=100)['count']}"
+        ),
+    )
+
+    updates = [{"buyer_name": r["buyer_name"], "total_usd": r["total_usd"] + 1} for r in rows]
+    for chunk_size, workers in (
+        (500, 1),
+        (500, database.UPSERT_MAX_WORKERS),
+        (1000, database.UPSERT_MAX_WORKERS),
+    ):
+        run_case(
+            fake,
+            f"bulk_upsert chunk={chunk_size} workers={workers}",
+            lambda chunk_size=chunk_size, workers=workers: database.bulk_upsert_buyers(
+                updates, chunk_size=chunk_size, max_workers=workers
+            )["status"],
+        )
+
+    fake.seed("mousa", rows)
+    sync = BuyerSync(profile="table")
+    run_case(fake, "BuyerSync full load", lambda: f"{len(sync.refresh(max_age=0))} rows")
+    changed = random.Random(1).sample(rows, min(args.changes, len(rows)))
+    database.bulk_upsert_buyers(
+        [{"buyer_name": r["buyer_name"], "total_usd": 0.0} for r in changed]
+    )
+    sync.mark_stale()
+
+    def delta_sync() -> str:
+        sync.refresh(max_age=0)
+        return f"{sync.last_delta_rows} rows fetched"
+
+    run_case(fake, f"BuyerSync delta ({len(changed)} changed)", delta_sync)
+
+    database.set_http_transport(None)
+
+
+if __name__ == "__main__":
+    main()
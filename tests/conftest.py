@@ -86,3 +86,27 @@ def empty_data_file() -> Generator[str, None, None]:
     yield path
 
     os.unlink(path)
+
+
+@pytest.fixture
+def fake_postgrest(
+    monkeypatch: pytest.MonkeyPatch, sample_buyers: list[dict[str, Any]]
+) -> Generator[Any, None, None]:
+    """Route the Supabase clients to an in-process PostgREST fake seeded with sample buyers.
+
+    Yields the FakePostgrest instance. The real transport is restored afterwards.
+    """
+    from services import database
+    from tests.fake_postgrest import FakePostgrest
+
+    monkeypatch.setenv("SUPABASE_URL", "http://fake-postgrest.local")
+    monkeypatch.setenv("SUPABASE_KEY", "fake-anon-key")
+    monkeypatch.setattr(database, "RETRY_BASE_DELAY", 0.0)
+
+    fake = FakePostgrest()
+    fake.seed("mousa", sample_buyers, key="buyer_name")
+    database.set_http_transport(fake)
+
+    yield fake
+
+    database.set_http_transport(None)
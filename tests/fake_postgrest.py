@@ -0,0 +1,452 @@
+"""In-process PostgREST stand-in for offline tests and benchmarks.
+
+`FakePostgrest` is an httpx transport (sync and async) that serves the
+subset of PostgREST that supabase-py issues from services.database:
+
+- GET    /rest/v1/<table>   select, eq/neq/gt/gte/lt/lte/like/ilike/in/is
+                            filters, order, limit/offset, Prefer count=
+- POST   /rest/v1/<table>   insert, or upsert with resolution=merge-duplicates
+                            and on_conflict; return=minimal|representation
+- PATCH  /rest/v1/<table>   update rows matching filters
+- DELETE /rest/v1/<table>   delete rows matching filters
+- POST   /rest/v1/rpc/<fn>  functions registered with `register_rpc`
+- GET    /rest/v1/<view>    read-only views registered with `register_view`
+
+Latency and error injection make it usable for load tests:
+
+    fake = FakePostgrest(latency=0.002, error_rate=0.01)
+    fake.seed("mousa", rows, key="buyer_name")
+    database.set_http_transport(fake)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+
+REST_PREFIX = "/rest/v1/"
+_RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+def _error(status: int, message: str, code: str | None = None) -> httpx.Response:
+    body = {"message": message, "code": code or str(status), "hint": None, "details": None}
+    return httpx.Response(status, json=body)
+
+
+def _split_list(text: str) -> list[str]:
+    """Split a PostgREST `(a,"b,c",d)` list into its values."""
+    values, current, quoted, escaped = [], [], False, False
+    for char in text:
+        if escaped:
+            current.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif char == "," and not quoted:
+            values.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    values.append("".join(current))
+    return values
+
+
+def _like_regex(pattern: str, case_insensitive: bool) -> re.Pattern:
+    parts, escaped = [], False
+    for char in pattern:
+        if escaped:
+            parts.append(re.escape(char))
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in "*%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return re.compile("".join(parts), re.DOTALL | (re.IGNORECASE if case_insensitive else 0))
+
+
+def _comparable(value: Any, literal: str) -> tuple[Any, Any] | None:
+    """Coerce a row value and a filter literal to comparable types."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return value, literal.lower() == "true"
+    if isinstance(value, (int, float)):
+        try:
+            return value, float(literal)
+        except ValueError:
+            return None
+    text = str(value)
+    try:
+        return datetime.fromisoformat(text), datetime.fromisoformat(literal)
+    except ValueError:
+        return text, literal
+
+
+def _matches(row: dict, column: str, expression: str) -> bool:
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, literal = expression.partition(".")
+    value = row.get(column)
+
+    if op == "is":
+        result = value is None if literal == "null" else value is (literal == "true")
+    elif op == "in":
+        result = value is not None and str(value) in _split_list(literal.strip("()"))
+    elif op in ("like", "ilike"):
+        result = value is not None and bool(
+            _like_regex(literal, op == "ilike").fullmatch(str(value))
+        )
+    elif op in ("eq", "neq", "gt", "gte", "lt", "lte"):
+        pair = _comparable(value, literal)
+        if pair is None:
+            result = False
+        else:
+            left, right = pair
+            try:
+                result = {
+                    "eq": left == right,
+                    "neq": left != right,
+                    "gt": left > right,
+                    "gte": left >= right,
+                    "lt": left < right,
+                    "lte": left <= right,
+                }[op]
+            except TypeError:
+                result = False
+    else:
+        raise ValueError(f"Unsupported filter operator: {op}")
+    return result != negate
+
+
+def _sort_key(value: Any) -> tuple:
+    # Postgres default: NULLS LAST for ascending order
+    return (value is None, value if value is not None else 0)
+
+
+class FakePostgrest(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """In-memory PostgREST backend usable as an httpx transport.
+
+    Args:
+        latency: Seconds added to every request, or a (min, max) range.
+        error_rate: Probability that a request fails with `error_status`.
+        error_status: HTTP status used for injected failures.
+        touch_column: Column stamped with the current time on every write
+            (mirrors the updated_at trigger); None to disable.
+        seed: Random seed for latency/error injection.
+    """
+
+    def __init__(
+        self,
+        latency: float | tuple[float, float] = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        touch_column: str | None = "updated_at",
+        seed: int | None = 0,
+    ) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.touch_column = touch_column
+        self.tables: dict[str, list[dict]] = {}
+        self.keys: dict[str, str] = {}
+        self.rpcs: dict[str, Callable[[FakePostgrest, dict], Any]] = {}
+        self.views: dict[str, Callable[[FakePostgrest], list[dict]]] = {}
+        self.requests: list[httpx.Request] = []
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._fail_next: list[int] = []
+        self._versions: dict[str, int] = {}
+        self._sort_cache: dict[tuple, tuple[int, list[dict]]] = {}
+        self._index_cache: dict[tuple, tuple[int, dict]] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+
+    # --- Setup -----------------------------------------------------------
+
+    def seed(self, table: str, rows: list[dict], key: str = "buyer_name") -> None:
+        """Replace the contents of `table`; `key` is its unique column."""
+        with self._lock:
+            self.keys[table] = key
+            self.tables[table] = [dict(r) for r in rows]
+            self._bump(table)
+
+    def register_rpc(self, name: str, handler: Callable[[FakePostgrest, dict], Any]) -> None:
+        """Serve POST /rpc/<name> with handler(fake, params) -> JSON result."""
+        self.rpcs[name] = handler
+
+    def register_view(self, name: str, handler: Callable[[FakePostgrest], list[dict]]) -> None:
+        """Serve GET /<name> from handler(fake) -> rows (filters still apply)."""
+        self.views[name] = handler
+
+    def fail_next(self, count: int = 1, status: int | None = None) -> None:
+        """Make the next `count` requests fail with `status`."""
+        with self._lock:
+            self._fail_next.extend([status or self.error_status] * count)
+
+    def rows(self, table: str = "mousa") -> list[dict]:
+        with self._lock:
+            return [dict(r) for r in self.tables.get(table, [])]
+
+    # --- Transport -------------------------------------------------------
+
+    def _delay(self) -> float:
+        if isinstance(self.latency, tuple):
+            return self._random.uniform(*self.latency)
+        return self.latency
+
+    def _injected_failure(self) -> httpx.Response | None:
+        with self._lock:
+            if self._fail_next:
+                return _error(self._fail_next.pop(0), "Injected failure")
+            if self.error_rate and self._random.random() < self.error_rate:
+                return _error(self.error_status, "Injected failure")
+        return None
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        request.read()
+        return self._respond(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        await request.aread()
+        return self._respond(request)
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        self.bytes_in += len(request.content)
+        response = self._injected_failure() or self._dispatch(request)
+        self.bytes_out += len(response.content)
+        return response
+
+    def _dispatch(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if not path.startswith(REST_PREFIX):
+            return _error(404, f"Unknown path {path}")
+        target = path[len(REST_PREFIX) :]
+        prefer = {
+            item.split("=", 1)[0].strip(): item.split("=", 1)[1].strip() if "=" in item else ""
+            for item in request.headers.get("prefer", "").split(",")
+            if item.strip()
+        }
+        body = json.loads(request.content) if request.content else None
+
+        try:
+            with self._lock:
+                if target.startswith("rpc/"):
+                    return self._rpc(target[4:], body or {})
+                if request.method in ("GET", "HEAD"):
+                    return self._select(target, request.url.params, prefer)
+                if request.method == "POST":
+                    return self._insert(target, request.url.params, prefer, body)
+                if request.method == "PATCH":
+                    return self._update(target, request.url.params, prefer, body)
+                if request.method == "DELETE":
+                    return self._delete(target, request.url.params, prefer)
+        except ValueError as e:
+            return _error(400, str(e), "PGRST100")
+        return _error(405, f"Unsupported method {request.method}")
+
+    # --- Operations ------------------------------------------------------
+
+    def _bump(self, table: str) -> None:
+        self._versions[table] = self._versions.get(table, 0) + 1
+
+    @staticmethod
+    def _filters(params: httpx.QueryParams) -> list[tuple[str, str]]:
+        return [(c, e) for c, e in params.multi_items() if c not in _RESERVED_PARAMS]
+
+    @classmethod
+    def _filtered(cls, rows: list[dict], params: httpx.QueryParams) -> list[dict]:
+        filters = cls._filters(params)
+        return [r for r in rows if all(_matches(r, c, e) for c, e in filters)]
+
+    @staticmethod
+    def _project(rows: list[dict], select: str | None) -> list[dict]:
+        if not select or select == "*":
+            return [dict(r) for r in rows]
+        columns = [c.strip() for c in select.split(",") if c.strip()]
+        return [{c: r.get(c) for c in columns} for r in rows]
+
+    def _sorted_rows(self, table: str, orders: list[tuple[str, bool]]) -> list[dict]:
+        """Rows of `table` sorted by `orders`, cached until the next write (an 'index')."""
+        cache_key = (table, tuple(orders))
+        version = self._versions.get(table, 0)
+        cached = self._sort_cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        rows = self.tables[table]
+        for column, descending in reversed(orders):
+            rows = sorted(rows, key=lambda r, c=column: _sort_key(r.get(c)), reverse=descending)
+        self._sort_cache[cache_key] = (version, rows)
+        return rows
+
+    @staticmethod
+    def _seek(rows: list[dict], column: str, filters: list[tuple[str, str]]) -> int:
+        """Binary-search the first row passing a gt/gte filter on the sort column."""
+        bound = next(
+            (e for c, e in filters if c == column and e.split(".", 1)[0] in ("gt", "gte")), None
+        )
+        if bound is None:
+            return 0
+        lo, hi = 0, len(rows)
+        while lo < hi:  # nulls sort last: find where they start
+            mid = (lo + hi) // 2
+            if rows[mid].get(column) is None:
+                hi = mid
+            else:
+                lo = mid + 1
+        lo, hi = 0, lo
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _matches(rows[mid], column, bound):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def _select(self, target: str, params: httpx.QueryParams, prefer: dict) -> httpx.Response:
+        orders = []
+        for spec in params.get("order", "").split(","):
+            if spec:
+                column, _, direction = spec.partition(".")
+                orders.append((column, direction.startswith("desc")))
+
+        filters = self._filters(params)
+        start = 0
+        if target in self.views:
+            rows = self.views[target](self)
+            for column, descending in reversed(orders):
+                rows = sorted(rows, key=lambda r, c=column: _sort_key(r.get(c)), reverse=descending)
+        elif target in self.tables:
+            rows = self._sorted_rows(target, orders) if orders else self.tables[target]
+            if orders and not orders[0][1]:
+                start = self._seek(rows, orders[0][0], filters)
+        else:
+            return _error(404, f'relation "public.{target}" does not exist', "42P01")
+
+        offset = int(params.get("offset", 0))
+        limit = params.get("limit")
+        stop = offset + int(limit) if limit is not None and "count" not in prefer else None
+
+        matched = []
+        for index in range(start, len(rows)):
+            row = rows[index]
+            if all(_matches(row, c, e) for c, e in filters):
+                matched.append(row)
+                if stop is not None and len(matched) >= stop:
+                    break
+
+        total = len(matched)
+        page = matched[offset : offset + int(limit)] if limit is not None else matched[offset:]
+
+        headers = {}
+        if "count" in prefer:
+            end = offset + len(page) - 1
+            headers["content-range"] = f"{offset}-{end}/{total}" if page else f"*/{total}"
+        return httpx.Response(200, json=self._project(page, params.get("select")), headers=headers)
+
+    def _key_index(self, table: str, column: str) -> dict:
+        """Position of each row by `column` (comma-separated for composite keys).
+
+        Kept in step by _insert, rebuilt after other writes.
+        """
+        version = self._versions.get(table, 0)
+        cached = self._index_cache.get((table, column))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        columns = column.split(",")
+        index = {tuple(r.get(c) for c in columns): i for i, r in enumerate(self.tables[table])}
+        self._index_cache[(table, column)] = (version, index)
+        return index
+
+    def _touch(self, row: dict) -> None:
+        if self.touch_column:
+            row[self.touch_column] = datetime.now(timezone.utc).isoformat()
+
+    def _insert(self, target: str, params, prefer: dict, body: Any) -> httpx.Response:
+        if target not in self.tables:
+            return _error(404, f'relation "public.{target}" does not exist', "42P01")
+        table = self.tables[target]
+        records = body if isinstance(body, list) else [body]
+        conflict = params.get("on_conflict") or self.keys.get(target, "buyer_name")
+        merge = prefer.get("resolution") == "merge-duplicates"
+        ignore = prefer.get("resolution") == "ignore-duplicates"
+
+        index = self._key_index(target, conflict)
+        written = []
+        columns = conflict.split(",")
+        for record in records:
+            key = tuple(record.get(c) for c in columns)
+            existing = index.get(key)
+            if existing is None:
+                row = dict(record)
+                self._touch(row)
+                index[key] = len(table)
+                table.append(row)
+            elif merge:
+                row = table[existing]
+                row.update(record)
+                self._touch(row)
+            elif ignore:
+                continue
+            else:
+                return _error(409, "duplicate key value violates unique constraint", "23505")
+            written.append(dict(row))
+
+        self._bump(target)
+        self._index_cache[(target, conflict)] = (self._versions[target], index)
+        if prefer.get("return") == "minimal":
+            return httpx.Response(201)
+        return httpx.Response(201, json=self._project(written, params.get("select")))
+
+    def _update(self, target: str, params, prefer: dict, body: dict) -> httpx.Response:
+        if target not in self.tables:
+            return _error(404, f'relation "public.{target}" does not exist', "42P01")
+        matched = self._filtered(self.tables[target], params)
+        for row in matched:
+            row.update(body)
+            self._touch(row)
+        self._bump(target)
+        return self._written(matched, prefer)
+
+    def _delete(self, target: str, params, prefer: dict) -> httpx.Response:
+        if target not in self.tables:
+            return _error(404, f'relation "public.{target}" does not exist', "42P01")
+        matched = self._filtered(self.tables[target], params)
+        doomed = {id(r) for r in matched}
+        self.tables[target] = [r for r in self.tables[target] if id(r) not in doomed]
+        self._bump(target)
+        return self._written(matched, prefer)
+
+    @staticmethod
+    def _written(matched: list[dict], prefer: dict) -> httpx.Response:
+        headers = {"content-range": f"*/{len(matched)}"} if "count" in prefer else {}
+        if prefer.get("return") == "minimal":
+            return httpx.Response(204, headers=headers)
+        return httpx.Response(200, json=[dict(r) for r in matched], headers=headers)
+
+    def _rpc(self, name: str, params: dict) -> httpx.Response:
+        if name not in self.rpcs:
+            return _error(404, f"Could not find the function public.{name}", "PGRST202")
+        return httpx.Response(200, json=self.rpcs[name](self, params))
@@ -0,0 +1,137 @@
+"""Tests for services.buyer_frame module."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from services import buyer_frame
+from services.buyer_frame import EDITOR_COLUMNS, build_buyer_frame, editable, get_buyer_frame
+
+
+@pytest.fixture
+def raw() -> list[dict]:
+    return [
+        {
+            "buyer_name": " Alpha ",
+            "destination_country": "USA",
+            "total_usd": "100.5",
+            "email": "a@alpha.com",
+            "phone": "None",
+            "website": "",
+            "address": None,
+            "updated_at": "2024-01-01T00:00:00+00:00",
+        },
+        {
+            "buyer_name": "Beta",
+            "destination_country": "GERMANY",
+            "total_usd": None,
+            "email": "nan",
+            "phone": "+49 30 1234567",
+            "website": "beta.de",
+            "address": "Berlin",
+            "updated_at": "2024-01-02T00:00:00.123+00:00",
+        },
+        {
+            "buyer_name": "Gamma",
+            "destination_country": "USA",
+            "total_usd": 7,
+            "email": ["g@gamma.jp", "info@gamma.jp"],
+            "phone": None,
+            "website": None,
+            "address": "null",
+            "updated_at": None,
+        },
+    ]
+
+
+class TestBuildBuyerFrame:
+    """Tests for dtype normalization and precomputed columns."""
+
+    def test_dtypes(self, raw) -> None:
+        frame = build_buyer_frame(raw).frame
+
+        assert isinstance(frame["buyer_name"].dtype, pd.StringDtype)
+        assert isinstance(frame["destination_country"].dtype, pd.CategoricalDtype)
+        assert frame["total_usd"].dtype == "float64"
+        assert frame["has_email"].dtype == bool
+        assert str(frame["updated_at"].dtype).startswith("datetime64")
+
+    def test_missing_tokens_become_na(self, raw) -> None:
+        frame = build_buyer_frame(raw).frame
+
+        assert frame["buyer_name"].tolist()[0] == "Alpha"
+        assert pd.isna(frame.loc[0, "phone"])
+        assert pd.isna(frame.loc[0, "website"])
+        assert pd.isna(frame.loc[1, "email"])
+        assert pd.isna(frame.loc[2, "address"])
+        assert frame["total_usd"].tolist() == [100.5, 0.0, 7.0]
+
+    def test_lists_are_joined(self, raw) -> None:
+        frame = build_buyer_frame(raw).frame
+        assert frame.loc[2, "email"] == "g@gamma.jp, info@gamma.jp"
+
+    def test_flags(self, raw) -> None:
+        frame = build_buyer_frame(raw).frame
+
+        assert frame["has_email"].tolist() == [True, False, True]
+        assert frame["has_phone"].tolist() == [False, True, False]
+        assert frame["has_website"].tolist() == [False, True, False]
+
+    def test_options_are_sorted_and_shared(self, raw) -> None:
+        full = build_buyer_frame(raw)
+        page = build_buyer_frame(raw[:1], categories=full.options)
+
+        assert full.options["destination_country"] == ["GERMANY", "USA"]
+        assert page.options["destination_country"] == ["GERMANY", "USA"]
+
+    def test_empty_input_has_core_columns(self) -> None:
+        built = build_buyer_frame([])
+
+        assert built.frame.empty
+        assert set(EDITOR_COLUMNS) <= set(built.frame.columns)
+        assert built.stats["rows"] == 0
+
+    def test_source_frame_is_not_modified(self, raw) -> None:
+        source = pd.DataFrame(raw)
+        build_buyer_frame(source)
+        assert source.loc[1, "email"] == "nan"
+
+    def test_stats(self, raw) -> None:
+        stats = build_buyer_frame(raw).stats
+
+        assert stats["rows"] == 3
+        assert stats["memory_bytes"] > 0
+        assert stats["build_ms"] >= 0
+
+
+class TestEditable:
+    """Tests for the editor copy of a typed frame."""
+
+    def test_drops_derived_columns_and_uncategorizes(self, raw) -> None:
+        editor = editable(build_buyer_frame(raw).frame)
+
+        assert list(editor.columns) == EDITOR_COLUMNS
+        assert isinstance(editor["destination_country"].dtype, pd.StringDtype)
+
+
+class TestGetBuyerFrame:
+    """Tests for memoization on the synced source frame."""
+
+    def test_rebuilt_only_when_source_changes(self, monkeypatch, raw) -> None:
+        sources = [pd.DataFrame(raw)]
+
+        class _Sync:
+            def refresh(self, **kwargs):
+                return sources[-1]
+
+        monkeypatch.setattr(buyer_frame, "get_buyer_sync", lambda profile: _Sync())
+        monkeypatch.setattr(buyer_frame, "_frames", {})
+
+        first = get_buyer_frame("table")
+        assert get_buyer_frame("table") is first
+
+        sources.append(pd.DataFrame(raw[:1]))
+        second = get_buyer_frame("table")
+        assert second is not first
+        assert second.stats["rows"] == 1
@@ -0,0 +1,174 @@
+"""Tests for services.buyer_sync module."""
+
+from __future__ import annotations
+
+import threading
+
+import pandas as pd
+import pytest
+
+from services import buyer_sync
+from services.buyer_sync import BuyerSync, merge_rows
+from services.replica import save_replica
+
+
+class _Table:
+    """In-memory 'mousa' table that honours the `since` watermark filter."""
+
+    def __init__(self) -> None:
+        self.rows: dict[str, dict] = {}
+        self.requests: list = []
+
+    def put(self, name: str, ts: str, **fields) -> None:
+        self.rows[name] = {"buyer_name": name, "updated_at": ts, **fields}
+
+    def iter_buyers(self, since=None, as_frame=False, **kwargs):
+        self.requests.append(since)
+        rows = sorted(self.rows.values(), key=lambda r: r["buyer_name"])
+        if since is not None:
+            rows = [r for r in rows if pd.Timestamp(r["updated_at"]) > pd.Timestamp(since)]
+        if rows:
+            yield pd.DataFrame(rows)
+
+
+@pytest.fixture
+def table(monkeypatch) -> _Table:
+    table = _Table()
+    table.put("Alpha", "2024-01-01T00:00:00+00:00", email=None)
+    table.put("Beta", "2024-01-02T00:00:00+00:00", email="b@beta.de")
+    monkeypatch.setattr(buyer_sync, "iter_buyers", table.iter_buyers)
+    return table
+
+
+class TestBuyerSync:
+    """Tests for watermark-based delta sync."""
+
+    def test_first_refresh_is_full_load(self, table) -> None:
+        sync = BuyerSync()
+        frame = sync.refresh()
+
+        assert list(frame["buyer_name"]) == ["Alpha", "Beta"]
+        assert table.requests == [None]
+        assert sync.watermark == "2024-01-02T00:00:00+00:00"
+
+    def test_fresh_frame_is_not_refetched(self, table) -> None:
+        sync = BuyerSync()
+        sync.refresh()
+        sync.refresh(max_age=300)
+        assert len(table.requests) == 1
+
+    def test_delta_merges_changed_rows(self, table) -> None:
+        sync = BuyerSync()
+        sync.refresh()
+        table.put("Alpha", "2024-02-01T00:00:00+00:00", email="a@alpha.com")
+        table.put("Gamma", "2024-02-01T00:00:00+00:00", email=None)
+
+        sync.mark_stale()
+        frame = sync.refresh()
+
+        assert table.requests[-1] is not None  # delta, not a full reload
+        assert sync.last_delta_rows == 3  # Beta is re-read inside the overlap window
+        assert list(frame["buyer_name"]) == ["Alpha", "Beta", "Gamma"]
+        assert frame.set_index("buyer_name").loc["Alpha", "email"] == "a@alpha.com"
+        assert sync.watermark == "2024-02-01T00:00:00+00:00"
+
+    def test_discard_drops_deleted_rows(self, table) -> None:
+        sync = BuyerSync()
+        sync.refresh()
+        sync.discard(["Beta"])
+        assert list(sync.refresh()["buyer_name"]) == ["Alpha"]
+
+    def test_failed_refresh_keeps_last_frame(self, table, monkeypatch) -> None:
+        sync = BuyerSync()
+        sync.refresh()
+
+        def broken(**kwargs):
+            raise ConnectionError("offline")
+            yield
+
+        monkeypatch.setattr(buyer_sync, "iter_buyers", broken)
+        sync.mark_stale()
+        assert len(sync.refresh()) == 2
+
+    def test_write_marked_during_a_sync_is_not_dropped(self, table, monkeypatch) -> None:
+        sync = BuyerSync()
+        sync.refresh()
+        fetching, release = threading.Event(), threading.Event()
+        fetch = sync._fetch
+
+        def slow_fetch(since=None):
+            frame = fetch(since)
+            fetching.set()
+            release.wait(5)
+            return frame
+
+        monkeypatch.setattr(sync, "_fetch", slow_fetch)
+        sync.mark_stale()
+        worker = threading.Thread(target=sync.refresh)
+        worker.start()
+        assert fetching.wait(5)
+
+        # A write lands (and is announced) while that sync is still fetching
+        table.put("Gamma", "2024-03-01T00:00:00+00:00")
+        sync.mark_stale()
+        release.set()
+        worker.join(5)
+        monkeypatch.setattr(sync, "_fetch", fetch)
+
+        assert "Gamma" in sync.refresh(max_age=300)["buyer_name"].tolist()
+
+
+class TestMergeRows:
+    def test_merge_into_empty(self) -> None:
+        changed = pd.DataFrame([{"buyer_name": "A"}])
+        assert merge_rows(None, changed).equals(changed)
+
+    def test_latest_duplicate_wins(self) -> None:
+        frame = pd.DataFrame([{"buyer_name": "A", "v": 1}])
+        changed = pd.DataFrame([{"buyer_name": "A", "v": 2}, {"buyer_name": "A", "v": 3}])
+        assert merge_rows(frame, changed)["v"].tolist() == [3]
+
+
+class TestReplicaColdStart:
+    """Tests for BuyerSync backed by the on-disk replica."""
+
+    @pytest.fixture(autouse=True)
+    def replica_dir(self, tmp_path, monkeypatch):
+        from services import replica
+
+        monkeypatch.setattr(replica, "REPLICA_DIR", str(tmp_path))
+
+    def test_cold_start_serves_replica_then_reconciles(self, table) -> None:
+        BuyerSync(replica=True).refresh()  # first process populates the replica
+        table.put("Gamma", "2024-03-01T00:00:00+00:00")
+        table.requests.clear()
+
+        sync = BuyerSync(replica=True)
+        assert sync.from_replica
+        frame = sync.refresh(max_age=0, background=True)
+        assert list(frame["buyer_name"]) == ["Alpha", "Beta"]  # served before any fetch
+
+        with sync._lock:  # wait for the background reconcile
+            pass
+        assert "Gamma" in sync.refresh(max_age=300)["buyer_name"].tolist()
+        assert table.requests[0] is not None  # reconciled with a delta, not a full reload
+
+    def test_delta_sync_upserts_into_replica(self, table, monkeypatch) -> None:
+        sync = BuyerSync(replica=True)
+        sync.refresh()
+        del table.rows["Beta"]
+        sync.discard(["Beta"])
+        table.put("Alpha", "2024-02-01T00:00:00+00:00", email="a@alpha.com")
+        saves = []
+        monkeypatch.setattr(
+            buyer_sync, "save_replica", lambda *a, **kw: saves.append(kw) or save_replica(*a, **kw)
+        )
+
+        sync.mark_stale()
+        sync.refresh()
+
+        assert saves[0]["changed"]["buyer_name"].tolist() == ["Alpha"]
+        assert saves[0]["removed"] == {"Beta"}
+        stored = BuyerSync(replica=True).frame
+        assert stored["buyer_name"].tolist() == ["Alpha"]
+        assert stored["email"].tolist() == ["a@alpha.com"]
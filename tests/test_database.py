@@ -0,0 +1,660 @@
+"""Tests for services.database module."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from postgrest import APIError
+
+from services import database
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    """Give every test its own client registry."""
+    monkeypatch.setattr(database, "_registry", database._ClientRegistry())
+    monkeypatch.setenv("SUPABASE_URL", "https://example.supabase.co")
+    monkeypatch.setenv("SUPABASE_KEY", "test-key")
+    yield
+    database.reset_supabase()
+
+
+class TestClientRegistry:
+    """Tests for the pooled, process-wide Supabase client."""
+
+    def test_client_is_reused(self) -> None:
+        first = database.get_supabase()
+        second = database.get_supabase()
+
+        assert first is not None
+        assert first is second
+        stats = database.get_pool_stats()
+        assert stats["builds"] == 1
+        assert stats["reuses"] == 1
+
+    def test_rebuilt_when_credentials_change(self, monkeypatch) -> None:
+        first = database.get_supabase()
+        monkeypatch.setenv("SUPABASE_KEY", "rotated-key")
+        second = database.get_supabase()
+
+        assert second is not first
+        assert database.get_pool_stats()["builds"] == 2
+
+    def test_rotation_leaves_old_pool_open_for_in_flight_requests(self, monkeypatch) -> None:
+        database.get_supabase()
+        old_http = database._registry._http
+        monkeypatch.setenv("SUPABASE_KEY", "rotated-key")
+        database.get_supabase()
+
+        assert not old_http.is_closed
+
+    def test_missing_credentials_returns_none(self, monkeypatch) -> None:
+        monkeypatch.delenv("SUPABASE_URL")
+        assert database.get_supabase() is None
+        assert database.get_pool_stats()["configured"] is False
+
+    def test_reset_drops_client(self) -> None:
+        first = database.get_supabase()
+        database.reset_supabase()
+        assert database.get_supabase() is not first
+
+
+class _StubQuery:
+    """Minimal stand-in for a PostgREST select builder over a sorted list."""
+
+    def __init__(self, rows: list[dict], calls: list) -> None:
+        self._rows = rows
+        self._calls = calls
+        self._key = None
+        self._after = None
+        self._limit = None
+
+    def select(self, columns: str) -> _StubQuery:
+        return self
+
+    def order(self, key: str) -> _StubQuery:
+        self._key = key
+        return self
+
+    def limit(self, n: int) -> _StubQuery:
+        self._limit = n
+        return self
+
+    def gt(self, key: str, value) -> _StubQuery:
+        self._after = value
+        return self
+
+    def execute(self):
+        self._calls.append(self._after)
+        rows = sorted(self._rows, key=lambda r: r[self._key])
+        if self._after is not None:
+            rows = [r for r in rows if r[self._key] > self._after]
+
+        class _Response:
+            data = rows[: self._limit]
+
+        return _Response()
+
+
+class _StubClient:
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+        self.calls: list = []
+
+    def table(self, name: str) -> _StubQuery:
+        return _StubQuery(self.rows, self.calls)
+
+
+@pytest.fixture
+def stub_client(monkeypatch):
+    rows = [{"buyer_name": f"Buyer {i:04d}", "total_usd": float(i)} for i in range(2500)]
+    client = _StubClient(rows)
+    monkeypatch.setattr(database, "get_supabase", lambda: client)
+    return client
+
+
+class TestIterBuyers:
+    """Tests for keyset-paginated streaming reads."""
+
+    def test_reads_past_default_limit(self, stub_client) -> None:
+        records = list(database.iter_buyers(page_size=1000))
+
+        assert len(records) == 2500
+        assert stub_client.calls == [None, "Buyer 0999", "Buyer 1999"]
+
+    def test_prefetch_matches_sequential(self, stub_client) -> None:
+        sequential = list(database.iter_buyers(page_size=700))
+        prefetched = list(database.iter_buyers(page_size=700, prefetch=True))
+        assert prefetched == sequential
+
+    def test_frame_chunks(self, stub_client) -> None:
+        chunks = list(database.iter_buyers(page_size=1000, as_frame=True))
+        assert [len(c) for c in chunks] == [1000, 1000, 500]
+
+    def test_exact_multiple_stops_on_empty_page(self, stub_client) -> None:
+        stub_client.rows = stub_client.rows[:2000]
+        assert len(list(database.iter_buyers(page_size=1000))) == 2000
+
+    def test_fetch_all_buyers_returns_every_row(self, stub_client) -> None:
+        assert len(database.fetch_all_buyers()) == 2500
+
+
+class TestReadProfiles:
+    """Tests for named column projections."""
+
+    def test_full_profile_selects_everything(self) -> None:
+        assert database.profile_columns("full") == "*"
+
+    def test_profile_skips_wide_columns(self) -> None:
+        columns = database.profile_columns("table").split(",")
+        assert "exporters" not in columns
+        assert columns[0] == "buyer_name"
+
+    def test_pagination_key_always_selected(self) -> None:
+        assert database.profile_columns("dashboard", key="id").startswith("id,")
+
+    def test_unknown_profile_raises(self) -> None:
+        with pytest.raises(ValueError):
+            database.profile_columns("everything")
+
+
+class _UpsertStub:
+    """Records upsert requests; fails chunks containing names in `fail`."""
+
+    def __init__(self, fail: dict[str, Exception] | None = None, transient_once: set | None = None):
+        self.fail = fail or {}
+        self.transient_once = transient_once or set()
+        self.requests: list[list[dict]] = []
+
+    def table(self, name: str) -> _UpsertStub:
+        return self
+
+    def upsert(self, rows, **kwargs) -> _UpsertStub:
+        self._rows = rows
+        return self
+
+    def execute(self):
+        self.requests.append(self._rows)
+        for row in self._rows:
+            name = row["buyer_name"]
+            if name in self.transient_once:
+                self.transient_once.discard(name)
+                raise httpx.ConnectError("connection reset")
+            if name in self.fail:
+                raise self.fail[name]
+        return None
+
+
+class TestBulkUpsertBuyers:
+    """Tests for chunked, retrying bulk upserts."""
+
+    @pytest.fixture(autouse=True)
+    def no_backoff(self, monkeypatch):
+        monkeypatch.setattr(database, "RETRY_BASE_DELAY", 0)
+
+    def _install(self, monkeypatch, stub) -> None:
+        monkeypatch.setattr(database, "get_supabase", lambda: stub)
+
+    def test_chunks_requests(self, monkeypatch) -> None:
+        stub = _UpsertStub()
+        self._install(monkeypatch, stub)
+        records = [{"buyer_name": f"B{i}", "email": None} for i in range(1050)]
+
+        res = database.bulk_upsert_buyers(records, chunk_size=500, max_workers=3)
+
+        assert res["status"] == "success"
+        assert res["upserted"] == 1050
+        assert sorted(len(r) for r in stub.requests) == [50, 500, 500]
+
+    def test_rows_with_different_keys_never_share_a_chunk(self, monkeypatch) -> None:
+        stub = _UpsertStub()
+        self._install(monkeypatch, stub)
+        records = [
+            {"buyer_name": "A", "email": "a@a.com"},
+            {"buyer_name": "B", "last_contacted_at": "2024-01-01"},
+            {"buyer_name": "C", "email": "c@c.com"},
+        ]
+
+        database.bulk_upsert_buyers(records)
+
+        assert all(len({tuple(sorted(r)) for r in req}) == 1 for req in stub.requests)
+        assert len(stub.requests) == 2
+
+    def test_duplicate_names_are_merged_before_chunking(self, monkeypatch) -> None:
+        stub = _UpsertStub()
+        self._install(monkeypatch, stub)
+        records = [
+            {"buyer_name": "Unknown", "email": "first@a.com"},
+            {"buyer_name": "B", "email": None},
+            {"buyer_name": "Unknown", "email": "last@a.com"},
+        ]
+
+        res = database.bulk_upsert_buyers(records, chunk_size=500)
+
+        assert res["status"] == "success"
+        assert res["upserted"] == 2
+        assert stub.requests == [
+            [{"buyer_name": "Unknown", "email": "last@a.com"}, {"buyer_name": "B", "email": None}]
+        ]
+
+    def test_transient_errors_are_retried(self, monkeypatch) -> None:
+        stub = _UpsertStub(transient_once={"B1"})
+        self._install(monkeypatch, stub)
+
+        res = database.bulk_upsert_buyers([{"buyer_name": "B1"}, {"buyer_name": "B2"}])
+
+        assert res["status"] == "success"
+        assert res["chunks"][0]["attempts"] == 2
+
+    def test_partial_failure_reports_failed_names(self, monkeypatch) -> None:
+        error = APIError({"message": "value too long", "code": "22001"})
+        stub = _UpsertStub(fail={"B3": error})
+        self._install(monkeypatch, stub)
+        records = [{"buyer_name": f"B{i}"} for i in range(6)]
+
+        res = database.bulk_upsert_buyers(records, chunk_size=2)
+
+        assert res["status"] == "partial"
+        assert res["failed_names"] == ["B2", "B3"]
+        assert res["upserted"] == 4
+        failed = [c for c in res["chunks"] if c["status"] == "error"]
+        assert failed[0]["attempts"] == 1  # not transient, no retry
+
+
+class _RpcStub:
+    def __init__(self, data=None, error: Exception | None = None) -> None:
+        self.data = data
+        self.error = error
+        self.calls: list = []
+
+    def table(self, name: str) -> _RpcStub:
+        self.calls.append(("table", name))
+        return self
+
+    def select(self, columns: str) -> _RpcStub:
+        return self
+
+    def rpc(self, fn: str, params: dict) -> _RpcStub:
+        self.calls.append(("rpc", fn, params))
+        return self
+
+    def execute(self):
+        if self.error:
+            raise self.error
+        return self
+
+
+class TestServerSideMetrics:
+    """Tests for the aggregate view/RPC wrappers."""
+
+    def test_summary_reads_view(self, monkeypatch) -> None:
+        stub = _RpcStub(data=[{"total_companies": 3, "enriched_count": 2, "total_value": 9.5}])
+        monkeypatch.setattr(database, "get_supabase", lambda: stub)
+
+        assert database.fetch_buyer_summary()["enriched_count"] == 2
+        assert stub.calls == [("table", "mousa_summary")]
+
+    def test_breakdown_calls_rpc(self, monkeypatch) -> None:
+        stub = _RpcStub(data=[{"country": "Japan", "companies": 1}])
+        monkeypatch.setattr(database, "get_supabase", lambda: stub)
+
+        rows = database.fetch_country_breakdown("country_english", limit=10)
+
+        assert rows == [{"country": "Japan", "companies": 1}]
+        assert stub.calls == [
+            (
+                "rpc",
+                "mousa_country_breakdown",
+                {"country_column": "country_english", "max_rows": 10},
+            )
+        ]
+
+    def test_missing_view_returns_none(self, monkeypatch) -> None:
+        stub = _RpcStub(error=APIError({"message": "relation does not exist", "code": "42P01"}))
+        monkeypatch.setattr(database, "get_supabase", lambda: stub)
+
+        assert database.fetch_buyer_summary() is None
+        assert database.fetch_country_breakdown() is None
+
+
+class _Recorder:
+    """Records every builder call made on it; execute() returns canned rows."""
+
+    def __init__(self, rows: list[dict], count: int | None = None) -> None:
+        self.rows = rows
+        self.count = count
+        self.calls: list[tuple] = []
+
+    def __getattr__(self, name: str):
+        def method(*args, **kwargs):
+            self.calls.append((name, *args))
+            return self
+
+        return method
+
+    def execute(self):
+        class _Response:
+            data = self.rows
+            count = self.count
+
+        return _Response()
+
+
+class TestQueryBuyers:
+    """Tests for database-side filtering and paging."""
+
+    def test_filters_are_pushed_down(self, monkeypatch) -> None:
+        stub = _Recorder([{"buyer_name": "Alpha"}], count=1)
+        monkeypatch.setattr(database, "get_supabase", lambda: stub)
+
+        res = database.query_buyers(countries=["USA", "JAPAN"], name_pattern=" 50%_off ", limit=2)
+
+        assert ("in_", "destination_country", ["USA", "JAPAN"]) in stub.calls
+        assert ("ilike", "buyer_name", "*50\\%\\_off*") in stub.calls
+        assert ("limit", 2) in stub.calls
+        assert res == {"rows": [{"buyer_name": "Alpha"}], "count": 1, "next_after": None}
+
+        database.query_buyers(name_pattern="a*z", limit=2)
+        assert ("ilike", "buyer_name", "*a_z*") in stub.calls  # `*` is no wildcard
+
+    def test_keyset_cursor(self, monkeypatch) -> None:
+        stub = _Recorder([{"buyer_name": "A"}, {"buyer_name": "B"}])
+        monkeypatch.setattr(database, "get_supabase", lambda: stub)
+
+        res = database.query_buyers(limit=2, after="0", count=None)
+
+        assert ("gt", "buyer_name", "0") in stub.calls
+        assert not any(call[0] == "offset" for call in stub.calls)
+        assert res["next_after"] == "B"
+
+    def test_secondary_sort_breaks_ties(self, monkeypatch) -> None:
+        stub = _Recorder([])
+        monkeypatch.setattr(database, "get_supabase", lambda: stub)
+
+        database.query_buyers(order_by="total_usd", descending=True, offset=100)
+
+        orders = [call for call in stub.calls if call[0] == "order"]
+        assert orders == [("order", "total_usd"), ("order", "buyer_name")]
+        assert ("offset", 100) in stub.calls
+
+
+def _mark_contacted_rpc(fake, params: dict) -> int:
+    names = set(params["buyer_names"])
+    stamped = [r for r in fake.tables["mousa"] if r["buyer_name"] in names]
+    for row in stamped:
+        row["last_contacted_at"] = params["contacted_at"]
+    return len(stamped)
+
+
+class TestMarkContacted:
+    """Batched last_contacted_at updates via the mousa_mark_contacted RPC."""
+
+    def test_one_rpc_call_per_chunk(self, fake_postgrest) -> None:
+        fake_postgrest.seed("mousa", [{"buyer_name": f"Co {i}"} for i in range(10)])
+        fake_postgrest.register_rpc("mousa_mark_contacted", _mark_contacted_rpc)
+
+        names = [f"Co {i}" for i in range(10)] + ["Unknown Co"]
+        result = database.mark_contacted(names, contacted_at="2024-05-01T00:00:00", chunk_size=4)
+
+        assert result["status"] == "success"
+        assert result["updated"] == 10
+        assert result["requested"] == 11
+        assert len(fake_postgrest.requests) == 3
+        assert {r["last_contacted_at"] for r in fake_postgrest.rows()} == {"2024-05-01T00:00:00"}
+        assert "Unknown Co" not in {r["buyer_name"] for r in fake_postgrest.rows()}
+
+    def test_names_are_cleaned_and_deduplicated(self, fake_postgrest) -> None:
+        fake_postgrest.register_rpc("mousa_mark_contacted", _mark_contacted_rpc)
+
+        result = database.mark_contacted([" Beta Industries ", "Beta Industries", "", None])
+
+        assert result["requested"] == 1
+        assert result["updated"] == 1
+
+    def test_falls_back_to_patch_without_rpc(self, fake_postgrest) -> None:
+        result = database.mark_contacted(
+            ["Beta Industries", "Gamma Trading"], contacted_at="2024-05-01T00:00:00"
+        )
+
+        assert result["status"] == "success"
+        assert result["updated"] == 2
+        assert [r.method for r in fake_postgrest.requests] == ["POST", "PATCH"]
+        stamped = {r["buyer_name"] for r in fake_postgrest.rows() if r.get("last_contacted_at")}
+        assert stamped == {"Beta Industries", "Gamma Trading"}
+
+    def test_queued_timestamp_is_written_on_flush(self, fake_postgrest, monkeypatch) -> None:
+        fake_postgrest.seed("mousa", [{"buyer_name": "Gamma Trading"}])
+        monkeypatch.setattr(database, "WRITE_BEHIND_FLUSH_INTERVAL", 60)
+        monkeypatch.setattr(database, "_write_queue", None)
+
+        future = database.queue_contact_timestamp("  Gamma Trading ")
+        assert not fake_postgrest.requests  # nothing is written before the flush
+        database.flush_writes()
+
+        assert future.result(1)["status"] == "success"
+        assert fake_postgrest.rows()[0]["last_contacted_at"]
+        database.get_write_queue().close()
+
+    def test_failed_chunk_is_reported(self, fake_postgrest) -> None:
+        fake_postgrest.seed("mousa", [{"buyer_name": f"Co {i}"} for i in range(4)])
+        fake_postgrest.register_rpc("mousa_mark_contacted", _mark_contacted_rpc)
+        fake_postgrest.fail_next(1, status=400)
+
+        result = database.mark_contacted([f"Co {i}" for i in range(4)], chunk_size=2)
+
+        assert result["status"] == "partial"
+        assert result["updated"] == 2
+        assert result["failed_names"] == ["Co 0", "Co 1"]
+
+
+class TestContacts:
+    """Normalized buyer_contacts rows and their read/write APIs."""
+
+    def test_contact_rows_normalize_and_dedupe(self) -> None:
+        rows = database.contact_rows(
+            "Alpha",
+            {
+                "email": "Sales@Alpha.com, sales@alpha.com ,broken, none",
+                "phone": ["+1-555-0100-22", "123"],
+                "website": "https://alpha.com/",
+            },
+            found_at="2024-01-01T00:00:00",
+        )
+
+        assert [(r["kind"], r["value"]) for r in rows] == [
+            ("email", "sales@alpha.com"),
+            ("phone", "+1-555-0100-22"),
+            ("website", "https://alpha.com"),
+        ]
+        assert all(
+            r["buyer_name"] == "Alpha" and r["found_at"] == "2024-01-01T00:00:00" for r in rows
+        )
+
+    def test_unknown_kind_raises(self) -> None:
+        with pytest.raises(ValueError):
+            database.normalize_contact("fax", "123")
+
+    def test_save_skips_existing_contacts(self, fake_postgrest) -> None:
+        fake_postgrest.seed("buyer_contacts", [], key="buyer_name,kind,value")
+        first = database.contact_rows(
+            "Alpha", {"email": ["a@alpha.com"]}, source_url="https://alpha.com"
+        )
+        database.save_contacts(first)
+
+        again = database.contact_rows("Alpha", {"email": ["A@alpha.com", "b@alpha.com"]})
+        result = database.save_contacts(again)
+
+        assert result == {"status": "success", "saved": 2}
+        stored = {r["value"]: r for r in fake_postgrest.rows("buyer_contacts")}
+        assert set(stored) == {"a@alpha.com", "b@alpha.com"}
+        assert stored["a@alpha.com"]["source_url"] == "https://alpha.com"
+
+    def test_scavenge_save_writes_contacts(self, fake_postgrest) -> None:
+        fake_postgrest.seed("buyer_contacts", [], key="buyer_name,kind,value")
+
+        database.save_scavenged_data(
+            "Gamma Trading", {"emails": ["Info@Gamma.jp"], "website": "gamma.jp"}
+        )
+
+        assert {
+            (r["buyer_name"], r["kind"], r["value"]) for r in fake_postgrest.rows("buyer_contacts")
+        } == {
+            ("Gamma Trading", "email", "info@gamma.jp"),
+            ("Gamma Trading", "website", "gamma.jp"),
+        }
+
+    def test_queued_scavenges_write_contacts(self, fake_postgrest, monkeypatch) -> None:
+        fake_postgrest.seed("buyer_contacts", [], key="buyer_name,kind,value")
+        monkeypatch.setattr(database, "WRITE_BEHIND_FLUSH_INTERVAL", 60)
+        monkeypatch.setattr(database, "_write_queue", None)
+
+        first = database.queue_scavenged_data("Gamma Trading", {"emails": ["info@gamma.jp"]})
+        second = database.queue_scavenged_data(
+            "Gamma Trading", {"emails": ["sales@gamma.jp"], "website": "gamma.jp"}
+        )
+        database.get_write_queue().close()
+
+        assert first.result(1)["status"] == second.result(1)["status"] == "success"
+        stored = {r["buyer_name"]: r for r in fake_postgrest.rows()}
+        assert stored["Gamma Trading"]["email"] == "sales@gamma.jp"
+        assert {(r["kind"], r["value"]) for r in fake_postgrest.rows("buyer_contacts")} == {
+            ("email", "info@gamma.jp"),
+            ("email", "sales@gamma.jp"),
+            ("website", "gamma.jp"),
+        }
+
+    def test_fetch_and_lookups(self, fake_postgrest) -> None:
+        fake_postgrest.seed(
+            "buyer_contacts",
+            [
+                {
+                    "id": 1,
+                    "buyer_name": "Beta",
+                    "kind": "email",
+                    "value": "x@beta.de",
+                    "domain": "beta.de",
+                },
+                {"id": 2, "buyer_name": "Alpha", "kind": "phone", "value": "+1-555-0100"},
+                {
+                    "id": 3,
+                    "buyer_name": "Alpha",
+                    "kind": "email",
+                    "value": "y@beta.de",
+                    "domain": "beta.de",
+                },
+            ],
+            key="buyer_name,kind,value",
+        )
+        fake_postgrest.register_view(
+            "buyer_contact_counts", lambda fake: [{"kind": "email", "buyers": 2}]
+        )
+
+        assert [r["buyer_name"] for r in database.fetch_contacts()] == ["Alpha", "Alpha", "Beta"]
+        assert [r["value"] for r in database.fetch_contacts(["Alpha"], kind="email")] == [
+            "y@beta.de"
+        ]
+        assert database.count_buyers_with_contact("email") == 2
+        assert database.count_buyers_with_contact("phone") == 0
+        assert [r["buyer_name"] for r in database.find_contacts_by_domain("@Beta.de")] == [
+            "Alpha",
+            "Beta",
+        ]
+
+    def test_missing_table_returns_none(self, fake_postgrest) -> None:
+        assert database.fetch_contacts(["Alpha"]) is None
+
+
+class TestCountryRollup:
+    """Materialized per-country rollup reads and refresh."""
+
+    def test_reads_one_country_column_largest_first(self, fake_postgrest) -> None:
+        fake_postgrest.seed(
+            "mousa_country_rollup",
+            [
+                {"country_column": "country_english", "country": "Japan", "companies": 5},
+                {"country_column": "country_english", "country": "Germany", "companies": 9},
+                {"country_column": "destination_country", "country": "JAPAN", "companies": 50},
+            ],
+            key="country",
+        )
+
+        rows = database.fetch_country_rollup("country_english", limit=1)
+
+        assert [r["country"] for r in rows] == ["Germany"]
+
+    def test_missing_view_returns_none(self, fake_postgrest) -> None:
+        assert database.fetch_country_rollup() is None
+
+    def test_refresh_calls_rpc(self, fake_postgrest) -> None:
+        fake_postgrest.register_rpc(
+            "mousa_refresh_country_rollup", lambda fake, params: "2024-05-01T00:00:00+00:00"
+        )
+
+        assert database.refresh_country_rollup() == {
+            "status": "success",
+            "refreshed_at": "2024-05-01T00:00:00+00:00",
+        }
+
+
+def _country_counts(fake: object, column: str = "country_english") -> list[dict]:
+    counts: dict = {}
+    for row in fake.rows("mousa"):
+        counts[row.get(column)] = counts.get(row.get(column), 0) + 1
+    return [
+        {"country": c, "companies": n}
+        for c, n in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    ]
+
+
+def _refresh_rollup(fake: object, params: dict) -> str:
+    refreshed_at = datetime.now(timezone.utc).isoformat()
+    fake.seed(
+        "mousa_country_rollup",
+        [
+            {"country_column": "country_english", "refreshed_at": refreshed_at, **r}
+            for r in _country_counts(fake)
+        ],
+        key="country",
+    )
+    return refreshed_at
+
+
+class TestTopCountries:
+    """The dashboard's country list stays consistent with writes."""
+
+    @pytest.fixture(autouse=True)
+    def rpcs(self, fake_postgrest) -> None:
+        fake_postgrest.register_rpc("mousa_refresh_country_rollup", _refresh_rollup)
+        fake_postgrest.register_rpc(
+            "mousa_country_breakdown",
+            lambda fake, params: _country_counts(fake, params["country_column"])[
+                : params["max_rows"]
+            ],
+        )
+
+    def test_write_then_refresh_shows_new_country(self, fake_postgrest) -> None:
+        database.refresh_country_rollup()
+        database.bulk_upsert_buyers([{"buyer_name": "Delta SA", "country_english": "France"}])
+
+        # What import_to_db and finished jobs do after writing
+        database.refresh_country_rollup()
+
+        assert "France" in [r["country"] for r in database.fetch_top_countries("country_english")]
+
+    def test_stale_rollup_falls_back_to_live(self, fake_postgrest) -> None:
+        database.refresh_country_rollup()
+        database.bulk_upsert_buyers([{"buyer_name": "Delta SA", "country_english": "France"}])
+
+        fresh = database.fetch_top_countries("country_english")
+        live = database.fetch_top_countries("country_english", max_age=0)
+
+        assert "France" not in [r["country"] for r in fresh]
+        assert "France" in [r["country"] for r in live]
+
+    def test_missing_rollup_reads_live(self, fake_postgrest) -> None:
+        rows = database.fetch_top_countries("country_english", limit=1)
+
+        assert len(rows) == 1
+        assert "refreshed_at" not in rows[0]
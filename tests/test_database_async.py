@@ -0,0 +1,161 @@
+"""Tests for services.database_async module."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from services import database, database_async
+
+
+@pytest.fixture(autouse=True)
+def credentials(monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", "https://example.supabase.co")
+    monkeypatch.setenv("SUPABASE_KEY", "test-key")
+    monkeypatch.setattr(database, "RETRY_BASE_DELAY", 0)
+
+
+class _AsyncTable:
+    """Async stand-in for the Supabase client used by database_async."""
+
+    def __init__(self, rows: list[dict] | None = None, transient_once: set | None = None) -> None:
+        self.rows = sorted(rows or [], key=lambda r: r["buyer_name"])
+        self.transient_once = transient_once or set()
+        self.upserts: list[list[dict]] = []
+
+    def table(self, name: str) -> _AsyncRequest:
+        return _AsyncRequest(self)
+
+
+class _AsyncRequest:
+    """One request builder; concurrent requests never share state."""
+
+    def __init__(self, table: _AsyncTable) -> None:
+        self.table = table
+        self.mode = None
+        self.after = None
+        self.limit_to = None
+        self.rows: list[dict] = []
+
+    def select(self, columns: str) -> _AsyncRequest:
+        self.mode = "select"
+        return self
+
+    def order(self, key: str) -> _AsyncRequest:
+        return self
+
+    def limit(self, n: int) -> _AsyncRequest:
+        self.limit_to = n
+        return self
+
+    def gt(self, key: str, value) -> _AsyncRequest:
+        self.after = value
+        return self
+
+    def upsert(self, rows, **kwargs) -> _AsyncRequest:
+        self.mode = "upsert"
+        self.rows = rows if isinstance(rows, list) else [rows]
+        return self
+
+    async def execute(self):
+        await asyncio.sleep(0)
+
+        class _Response:
+            data: list = []
+
+        if self.mode == "select":
+            rows = [
+                r for r in self.table.rows if self.after is None or r["buyer_name"] > self.after
+            ]
+            _Response.data = rows[: self.limit_to]
+        else:
+            for row in self.rows:
+                if row["buyer_name"] in self.table.transient_once:
+                    self.table.transient_once.discard(row["buyer_name"])
+                    raise httpx.ReadTimeout("timed out")
+            self.table.upserts.append(self.rows)
+            _Response.data = self.rows
+        return _Response()
+
+
+def _install(monkeypatch, stub) -> None:
+    async def get_stub():
+        return stub
+
+    monkeypatch.setattr(database_async, "get_supabase", get_stub)
+
+
+class TestAsyncClient:
+    def test_one_client_per_loop(self) -> None:
+        async def twice():
+            first = await database_async.get_supabase()
+            second = await database_async.get_supabase()
+            await database_async.close_supabase()
+            return first, second
+
+        first, second = asyncio.run(twice())
+        assert first is second
+        assert asyncio.run(twice())[0] is not first
+
+    def test_concurrent_first_calls_build_one_client(self, monkeypatch) -> None:
+        created = []
+
+        async def slow_create(url, key, options=None):
+            await asyncio.sleep(0.01)  # let the other callers reach get_supabase
+            created.append(object())
+            return created[-1]
+
+        monkeypatch.setattr(database_async, "acreate_client", slow_create)
+
+        async def together():
+            clients = await asyncio.gather(*(database_async.get_supabase() for _ in range(5)))
+            await database_async.close_supabase()
+            return clients
+
+        clients = asyncio.run(together())
+        assert len(created) == 1
+        assert all(c is created[0] for c in clients)
+
+    def test_missing_credentials(self, monkeypatch) -> None:
+        monkeypatch.delenv("SUPABASE_KEY")
+        assert asyncio.run(database_async.get_supabase()) is None
+
+
+class TestAsyncOperations:
+    def test_fetch_all_pages(self, monkeypatch) -> None:
+        stub = _AsyncTable([{"buyer_name": f"B{i:03d}"} for i in range(250)])
+        _install(monkeypatch, stub)
+
+        records = asyncio.run(database_async.fetch_all_buyers(page_size=100))
+
+        assert [r["buyer_name"] for r in records] == [r["buyer_name"] for r in stub.rows]
+
+    def test_bulk_upsert_retries_and_reports(self, monkeypatch) -> None:
+        stub = _AsyncTable(transient_once={"B1"})
+        _install(monkeypatch, stub)
+        records = [{"buyer_name": f"B{i}"} for i in range(5)]
+
+        res = asyncio.run(database_async.bulk_upsert_buyers(records, chunk_size=2, max_workers=2))
+
+        assert res["status"] == "success"
+        assert res["upserted"] == 5
+        assert [c["attempts"] for c in res["chunks"]] == [2, 1, 1]
+
+    def test_save_and_timestamp_share_a_loop(self, monkeypatch) -> None:
+        stub = _AsyncTable()
+        _install(monkeypatch, stub)
+
+        async def pipeline():
+            return await asyncio.gather(
+                database_async.save_scavenged_data(" Alpha ", {"emails": ["a@alpha.com"]}),
+                database_async.update_contact_timestamp("Beta"),
+            )
+
+        saved, touched = asyncio.run(pipeline())
+
+        assert saved["status"] == "success"
+        assert saved["message"] == "Saved 1 emails, 0 phones"
+        assert touched == {"status": "success"}
+        assert {rows[0]["buyer_name"] for rows in stub.upserts} == {"Alpha", "Beta"}
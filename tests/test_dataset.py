@@ -0,0 +1,85 @@
+"""Tests for services.dataset module."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from services import dataset as dataset_module
+from services.buyer_frame import build_buyer_frame
+from services.dataset import BuyerDataset
+
+
+class _Sync:
+    """Stands in for a BuyerSync; records discard/mark_stale calls."""
+
+    def __init__(self) -> None:
+        self.discarded: list = []
+        self.stale = 0
+
+    def discard(self, keys) -> None:
+        self.discarded.extend(keys)
+
+    def mark_stale(self) -> None:
+        self.stale += 1
+
+
+@pytest.fixture
+def frames(monkeypatch) -> dict:
+    frames = {"table": build_buyer_frame([{"buyer_name": "Alpha", "email": "a@alpha.com"}])}
+    syncs = [_Sync(), _Sync()]
+    monkeypatch.setattr(
+        dataset_module, "get_buyer_frame", lambda profile, **kwargs: frames[profile]
+    )
+    monkeypatch.setattr(dataset_module, "get_buyer_syncs", lambda: syncs)
+    frames["syncs"] = syncs
+    return frames
+
+
+class TestBuyerDataset:
+    """Tests for versioned snapshots and per-version views."""
+
+    def test_first_load_keeps_version(self, frames) -> None:
+        dataset = BuyerDataset()
+        assert dataset.frame("table") is frames["table"]
+        assert dataset.version == 0
+
+    def test_new_snapshot_bumps_version(self, frames) -> None:
+        dataset = BuyerDataset()
+        dataset.frame("table")
+        frames["table"] = build_buyer_frame([])
+
+        dataset.frame("table")
+        dataset.frame("table")
+
+        assert dataset.version == 1
+
+    def test_view_memoized_per_version(self, frames) -> None:
+        dataset = BuyerDataset()
+        builds = []
+
+        def count(buyers):
+            builds.append(1)
+            return len(buyers.frame)
+
+        assert dataset.view("rows", count) == 1
+        assert dataset.view("rows", count) == 1
+        assert len(builds) == 1
+
+        frames["table"] = build_buyer_frame(pd.DataFrame({"buyer_name": ["A", "B"]}))
+        assert dataset.view("rows", count) == 2
+        assert len(builds) == 2
+
+    def test_record_write_bumps_and_invalidates(self, frames) -> None:
+        dataset = BuyerDataset()
+        builds = []
+        dataset.view("rows", lambda b: builds.append(1))
+
+        version = dataset.record_write(deleted=["Alpha"])
+        dataset.view("rows", lambda b: builds.append(1))
+
+        assert version == dataset.version == 1
+        assert len(builds) == 2
+        for sync in frames["syncs"]:
+            assert sync.discarded == ["Alpha"]
+            assert sync.stale == 1
@@ -0,0 +1,131 @@
+"""Tests for services.db_metrics module."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from services import database, db_metrics
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(monkeypatch):
+    """Give every test its own metrics registry."""
+    monkeypatch.setattr(db_metrics, "registry", db_metrics.MetricsRegistry(slow_threshold=0.05))
+
+
+def _op(name: str) -> dict:
+    return next(m for m in db_metrics.get_metrics() if m["operation"] == name)
+
+
+class TestMetricsRegistry:
+    """Histogram percentiles, counters and the slow-call log."""
+
+    def test_percentiles_follow_distribution(self) -> None:
+        registry = db_metrics.registry
+        for i in range(100):
+            registry.record(db_metrics._Call("op"), 0.010 if i < 90 else 0.500)
+
+        stats = _op("op")
+
+        assert stats["calls"] == 100
+        assert 10 <= stats["p50_ms"] <= 12  # bucket upper bound within ~19%
+        assert stats["p99_ms"] == 500.0
+        assert stats["max_ms"] == 500.0
+
+    def test_slow_calls_are_kept_slowest_first(self) -> None:
+        registry = db_metrics.registry
+        registry.record(db_metrics._Call("fast"), 0.001)
+        registry.record(db_metrics._Call("slow"), 0.2)
+        registry.record(db_metrics._Call("slower"), 0.9, error=True)
+
+        slow = db_metrics.get_slow_calls()
+
+        assert [c["operation"] for c in slow] == ["slower", "slow"]
+        assert slow[0]["error"] is True
+
+    def test_reset(self) -> None:
+        db_metrics.registry.record(db_metrics._Call("op"), 0.1)
+        db_metrics.reset_metrics()
+        assert db_metrics.get_metrics() == []
+        assert db_metrics.get_slow_calls() == []
+
+
+class TestInstrumented:
+    """Decorated functions record timing, rows and errors."""
+
+    def test_rows_and_errors_from_result(self) -> None:
+        @db_metrics.instrumented("listing")
+        def listing():
+            return [1, 2, 3]
+
+        @db_metrics.instrumented("saving")
+        def saving(ok):
+            return (
+                {"status": "success", "upserted": 7} if ok else {"status": "error", "message": "x"}
+            )
+
+        listing()
+        saving(True)
+        saving(False)
+
+        assert _op("listing")["rows"] == 3
+        assert _op("saving")["calls"] == 2
+        assert _op("saving")["errors"] == 1
+        assert _op("saving")["rows"] == 7
+
+    def test_exception_counts_as_error(self) -> None:
+        @db_metrics.instrumented("boom")
+        def boom():
+            raise RuntimeError("down")
+
+        with pytest.raises(RuntimeError):
+            boom()
+
+        assert _op("boom")["errors"] == 1
+
+    def test_async_functions(self) -> None:
+        @db_metrics.instrumented("async_op")
+        async def fetch():
+            await asyncio.sleep(0.06)
+            return [1]
+
+        asyncio.run(fetch())
+
+        assert _op("async_op")["rows"] == 1
+        assert db_metrics.get_slow_calls()[0]["operation"] == "async_op"
+
+    def test_track_block(self) -> None:
+        with db_metrics.track("block") as call:
+            call.rows = 4
+            time.sleep(0.001)
+
+        assert _op("block")["rows"] == 4
+
+
+class TestDatabaseInstrumentation:
+    """HTTP bytes, requests and retries are attributed through the real client."""
+
+    def test_bytes_and_requests_per_operation(self, fake_postgrest) -> None:
+        fake_postgrest.seed("mousa", [{"buyer_name": f"B{i:03d}"} for i in range(25)])
+
+        rows = database.fetch_all_buyers(profile="table", page_size=10)
+
+        outer, page = _op("fetch_all_buyers"), _op("fetch_buyer_page")
+        assert outer["rows"] == len(rows) == 25
+        assert outer["requests"] == 3  # prefetched pages count towards the caller
+        assert page["calls"] == 3
+        assert outer["bytes_received"] == fake_postgrest.bytes_out > 0
+
+    def test_retries_counted_across_worker_threads(self, fake_postgrest) -> None:
+        fake_postgrest.fail_next(1, status=503)
+        records = [{"buyer_name": f"N{i}"} for i in range(6)]
+
+        database.bulk_upsert_buyers(records, chunk_size=2, max_workers=3)
+
+        stats = _op("bulk_upsert_buyers")
+        assert stats["retries"] == 1
+        assert stats["requests"] == 4
+        assert stats["bytes_sent"] == fake_postgrest.bytes_in
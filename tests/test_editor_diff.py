@@ -0,0 +1,84 @@
+"""Tests for services.editor_diff module."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from services.editor_diff import diff_frames
+
+
+@pytest.fixture
+def original() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "buyer_name": ["Alpha", "Beta", "Gamma"],
+            "email": ["a@alpha.com", None, "g@gamma.jp"],
+            "total_usd": [100.0, 200.0, 300.0],
+        }
+    )
+
+
+class TestDiffFrames:
+    """Tests for minimal editor changesets."""
+
+    def test_no_changes(self, original) -> None:
+        changes = diff_frames(original, original.copy())
+        assert changes["upserts"] == []
+        assert changes["deletes"] == []
+        assert changes["wire_bytes"] == 0
+
+    def test_single_cell_edit_sends_one_row(self, original) -> None:
+        edited = original.copy()
+        edited.loc[1, "email"] = "b@beta.de"
+
+        changes = diff_frames(original, edited)
+
+        assert changes["edited"] == 1
+        assert changes["upserts"] == [
+            {"buyer_name": "Beta", "email": "b@beta.de", "total_usd": 200.0}
+        ]
+        assert changes["wire_bytes"] > 0
+
+    def test_missing_values_compare_equal(self, original) -> None:
+        edited = original.copy()
+        edited["email"] = edited["email"].astype(object)
+        assert diff_frames(original, edited)["edited"] == 0
+
+    def test_inserts_and_deletes(self, original) -> None:
+        edited = pd.concat(
+            [
+                original[original["buyer_name"] != "Gamma"],
+                pd.DataFrame([{"buyer_name": "Delta", "email": None, "total_usd": 5.0}]),
+            ],
+            ignore_index=True,
+        )
+
+        changes = diff_frames(original, edited)
+
+        assert changes["inserted"] == 1
+        assert changes["upserts"][0]["buyer_name"] == "Delta"
+        assert changes["upserts"][0]["email"] is None
+        assert changes["deletes"] == ["Gamma"]
+
+    def test_rows_without_key_are_skipped(self, original) -> None:
+        edited = pd.concat(
+            [original, pd.DataFrame([{"buyer_name": None, "email": "x@y.com", "total_usd": 1.0}])],
+            ignore_index=True,
+        )
+
+        changes = diff_frames(original, edited)
+
+        assert changes["skipped"] == 1
+        assert changes["upserts"] == []
+
+    def test_nullable_string_columns(self, original) -> None:
+        original = original.astype({"email": "string"})
+        edited = original.copy()
+        edited.loc[1, "email"] = "b@beta.de"
+
+        changes = diff_frames(original, edited)
+
+        assert changes["edited"] == 1
+        assert changes["upserts"][0]["buyer_name"] == "Beta"
+        assert diff_frames(original, original.copy())["edited"] == 0
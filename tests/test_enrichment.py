@@ -0,0 +1,274 @@
+"""Tests for services.enrichment and services.rate_limits modules."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from services.buyer_frame import build_buyer_frame
+from services.enrichment import EnrichmentLedger, describe_summary, enrich_buyers, select_candidates
+from services.rate_limits import Limit, ServiceLimits
+
+
+@pytest.fixture
+def frame():
+    return build_buyer_frame(
+        [
+            {
+                "buyer_name": "Alpha",
+                "destination_country": "USA",
+                "total_usd": 10,
+                "email": None,
+                "phone": "+15550100222",
+            },
+            {
+                "buyer_name": "Beta",
+                "destination_country": "USA",
+                "total_usd": 30,
+                "email": "b@beta.com",
+            },
+            {"buyer_name": "Gamma", "destination_country": "JAPAN", "total_usd": 20, "email": ""},
+            {
+                "buyer_name": "Gamma Co",
+                "destination_country": "JAPAN",
+                "total_usd": 5,
+                "email": None,
+            },
+            {"buyer_name": "Delta", "destination_country": "USA", "total_usd": 40, "email": None},
+        ]
+    ).frame
+
+
+@pytest.fixture
+def ledger(tmp_path) -> EnrichmentLedger:
+    return EnrichmentLedger(str(tmp_path / "enrichment.sqlite"))
+
+
+@pytest.fixture
+def limits() -> ServiceLimits:
+    return ServiceLimits({"llm": (4, 0), "search": (2, 0), "fetch": (4, 0)})
+
+
+def fake_find(results: dict, delay: float = 0.0):
+    async def find(name, country):
+        await asyncio.sleep(delay)
+        outcome = results.get(name, {"emails": [f"info@{name.lower()}.com"]})
+        if isinstance(outcome, Exception):
+            raise outcome
+        return {"status": "success", **outcome}
+
+    return find
+
+
+class TestSelectCandidates:
+    """Tests for choosing which buyers to enrich."""
+
+    def test_missing_email_largest_first(self, frame) -> None:
+        candidates = select_candidates(frame)
+
+        assert candidates["buyer_name"].tolist() == ["Delta", "Gamma", "Alpha", "Gamma Co"]
+
+    def test_countries_aliases_and_limit(self, frame) -> None:
+        candidates = select_candidates(frame, countries=["JAPAN"], aliases={"Gamma Co": "Gamma"})
+        assert candidates["buyer_name"].tolist() == ["Gamma"]
+        assert candidates["country"].tolist() == ["JAPAN"]
+
+        assert select_candidates(frame, limit=2)["buyer_name"].tolist() == ["Delta", "Gamma"]
+
+    def test_several_fields_and_names(self, frame) -> None:
+        candidates = select_candidates(frame, missing=["email", "phone"], names=["Alpha", "Beta"])
+
+        assert candidates["buyer_name"].tolist() == ["Beta", "Alpha"]
+
+    def test_unknown_field_raises(self, frame) -> None:
+        with pytest.raises(ValueError):
+            select_candidates(frame, missing=["fax"])
+
+
+class TestEnrichBuyers:
+    """Tests for the concurrent enrichment pipeline."""
+
+    def test_saves_each_company_and_summarizes(self, frame, ledger, limits) -> None:
+        saved = {}
+
+        async def save(name, found):
+            saved[name] = found
+            return {"status": "success"}
+
+        find = fake_find({"Gamma": {"emails": []}, "Gamma Co": RuntimeError("timeout")}, delay=0.01)
+        messages = []
+        summary = asyncio.run(
+            enrich_buyers(
+                select_candidates(frame),
+                concurrency=3,
+                limits=limits,
+                ledger=ledger,
+                progress=messages.append,
+                find=find,
+                save=save,
+            )
+        )
+
+        assert summary["status"] == "partial"
+        assert (
+            summary["companies"],
+            summary["enriched"],
+            summary["not_found"],
+            summary["errors"],
+        ) == (4, 2, 1, 1)
+        assert set(saved) == {"Delta", "Alpha"}
+        # The stored phone survives a result without phones
+        assert saved["Alpha"]["phones"] == ["+15550100222"]
+        assert len(messages) == 4
+        assert summary["latency_ms"]["p50"] >= 10
+        assert ledger.run(summary["run_id"])["counts"] == {
+            "enriched": 2,
+            "not_found": 1,
+            "error": 1,
+        }
+        assert "4 companies" in describe_summary(summary)
+
+    def test_sessions_run_concurrently(self, frame, ledger, limits) -> None:
+        async def save(name, found):
+            return {"status": "success"}
+
+        started = time.perf_counter()
+        summary = asyncio.run(
+            enrich_buyers(
+                select_candidates(frame),
+                concurrency=4,
+                limits=limits,
+                ledger=ledger,
+                find=fake_find({}, delay=0.2),
+                save=save,
+            )
+        )
+
+        assert summary["enriched"] == 4
+        assert time.perf_counter() - started < 0.6
+
+    def test_resume_skips_finished_and_retries_errors(self, frame, ledger, limits) -> None:
+        calls = []
+
+        async def save(name, found):
+            return {"status": "success"}
+
+        def counting(find):
+            async def wrapped(name, country):
+                calls.append(name)
+                return await find(name, country)
+
+            return wrapped
+
+        candidates = select_candidates(frame)
+        first = asyncio.run(
+            enrich_buyers(
+                candidates,
+                limits=limits,
+                ledger=ledger,
+                find=counting(fake_find({"Alpha": RuntimeError("boom")})),
+                save=save,
+            )
+        )
+        calls.clear()
+        again = asyncio.run(
+            enrich_buyers(
+                candidates,
+                limits=limits,
+                ledger=ledger,
+                run_id=first["run_id"],
+                find=counting(fake_find({})),
+                save=save,
+            )
+        )
+
+        assert calls == ["Alpha"]
+        assert (again["skipped"], again["enriched"], again["errors"]) == (3, 1, 0)
+
+    def test_done_counts_skipped_companies_of_a_resumed_run(self, frame, ledger, limits) -> None:
+        async def save(name, found):
+            return {"status": "success"}
+
+        candidates = select_candidates(frame)
+        first = asyncio.run(
+            enrich_buyers(
+                candidates,
+                limits=limits,
+                ledger=ledger,
+                find=fake_find({"Alpha": RuntimeError("boom")}),
+                save=save,
+            )
+        )
+        resumed_at = datetime.now(timezone.utc).isoformat()
+
+        # Before any event of the resumed run: three done, Alpha to retry
+        assert ledger.done(first["run_id"], since=resumed_at) == 3
+        asyncio.run(
+            enrich_buyers(
+                candidates,
+                limits=limits,
+                ledger=ledger,
+                run_id=first["run_id"],
+                find=fake_find({}),
+                save=save,
+            )
+        )
+        assert ledger.done(first["run_id"], since=resumed_at) == len(candidates)
+
+    def test_nothing_left(self, ledger, limits) -> None:
+        summary = asyncio.run(
+            enrich_buyers([], limits=limits, ledger=ledger, find=fake_find({}), save=None)
+        )
+
+        assert summary["status"] == "skipped"
+        assert summary["companies"] == 0
+
+
+class TestServiceLimits:
+    """Tests for the shared call budgets."""
+
+    def test_caps_calls_in_flight(self) -> None:
+        limits = ServiceLimits({"search": (2, 0)})
+
+        def call():
+            with limits.slot("search"):
+                time.sleep(0.05)
+
+        threads = [threading.Thread(target=call) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = limits.stats()["search"]
+        assert stats["calls"] == 6
+        assert stats["peak"] == 2
+
+    def test_spaces_call_starts(self) -> None:
+        limit = Limit(5, per_minute=600)  # one start every 0.1s
+
+        started = time.perf_counter()
+        for _ in range(3):
+            limit.acquire()
+            limit.release()
+
+        assert time.perf_counter() - started >= 0.2
+
+    def test_async_slot(self) -> None:
+        limits = ServiceLimits({"llm": (1, 0)})
+
+        async def call():
+            async with limits.async_slot("llm"):
+                await asyncio.sleep(0.02)
+
+        async def main():
+            await asyncio.gather(*(call() for _ in range(3)))
+
+        asyncio.run(main())
+
+        assert limits.stats()["llm"]["peak"] == 1
+        assert limits.stats()["llm"]["calls"] == 3
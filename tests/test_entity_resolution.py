@@ -0,0 +1,180 @@
+"""Tests for services.entity_resolution module."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from services import database, entity_resolution
+from services.entity_resolution import canonical_key, canonical_names, resolve_entities
+
+
+@pytest.fixture
+def buyers() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "buyer_name": [
+                "Ferro Metal Inc.",
+                "FERRO METAL, INC",
+                "Fero Metal LLC",
+                "Muller GmbH",
+                "Müller GmbH",
+                "Alpha Steel 1",
+                "Alpha Steel 2",
+                "Zeta Trading",
+                None,
+            ],
+            "total_usd": [5.0, 9.0, 1.0, 2.0, 1.0, 1.0, 1.0, 3.0, 4.0],
+        }
+    )
+
+
+class TestCanonicalKey:
+    """Tests for the merge key of a company name."""
+
+    def test_drops_case_punctuation_and_legal_suffix(self) -> None:
+        assert canonical_key("FERRO-METAL, Inc.") == "ferro metal"
+        assert canonical_key("Acme Trading S.A.") == "acme trading"
+
+    def test_folds_accents_and_drops_stop_words(self) -> None:
+        assert canonical_key("The Müller Group of Companies") == "muller group companies"
+
+    def test_suffix_only_name_is_kept(self) -> None:
+        assert canonical_key("Co. Ltd") == "co"
+
+    def test_missing_name(self) -> None:
+        assert canonical_key(None) == ""
+        assert canonical_key(float("nan")) == ""
+
+
+class TestResolveEntities:
+    """Tests for clustering duplicate names into aliases."""
+
+    def test_clusters_keep_highest_value_name(self, buyers) -> None:
+        result = resolve_entities(buyers)
+
+        clusters = {c["canonical_name"]: sorted(c["members"]) for c in result["clusters"]}
+        assert clusters == {
+            "FERRO METAL, INC": ["FERRO METAL, INC", "Fero Metal LLC", "Ferro Metal Inc."],
+            "Muller GmbH": ["Muller GmbH", "Müller GmbH"],
+        }
+
+    def test_alias_rows(self, buyers) -> None:
+        aliases = {a["alias_name"]: a for a in resolve_entities(buyers)["aliases"]}
+
+        assert set(aliases) == {"Ferro Metal Inc.", "Fero Metal LLC", "Müller GmbH"}
+        assert aliases["Ferro Metal Inc."]["method"] == "exact"
+        assert aliases["Ferro Metal Inc."]["score"] == 1.0
+        assert aliases["Fero Metal LLC"]["method"] == "fuzzy"
+        assert 0.85 <= aliases["Fero Metal LLC"]["score"] < 1.0
+        assert all(
+            a["canonical_name"] == "FERRO METAL, INC" for n, a in aliases.items() if "Fe" in n
+        )
+
+    def test_different_numbers_never_merge(self, buyers) -> None:
+        names = {a["alias_name"] for a in resolve_entities(buyers, threshold=0.5)["aliases"]}
+
+        assert not names & {"Alpha Steel 1", "Alpha Steel 2"}
+
+    def test_threshold_controls_fuzzy_merges(self, buyers) -> None:
+        names = {a["alias_name"] for a in resolve_entities(buyers, threshold=0.99)["aliases"]}
+
+        assert names == {"Ferro Metal Inc.", "Müller GmbH"}
+
+    def test_large_block_is_windowed(self) -> None:
+        names = [f"Acme Branch {i:04d}x" for i in range(3 * entity_resolution.MAX_BLOCK_SIZE)]
+        names += ["Acme Branch 0001x Ltd"]
+
+        result = resolve_entities([{"buyer_name": n} for n in names])
+
+        assert result["stats"]["blocks"] > 2
+        assert [a["alias_name"] for a in result["aliases"]] == ["Acme Branch 0001x Ltd"]
+
+    def test_stats_and_empty_input(self, buyers) -> None:
+        stats = resolve_entities(buyers)["stats"]
+        assert stats["names"] == 8
+        assert stats["clusters"] == 2 and stats["aliases"] == 3
+
+        empty = resolve_entities([])
+        assert empty["clusters"] == [] and empty["aliases"] == []
+        assert empty["stats"]["names"] == 0
+
+    def test_canonical_names(self) -> None:
+        aliases = {"Ferro Metal Inc.": "FERRO METAL, INC"}
+
+        assert canonical_names(["Ferro Metal Inc.", "FERRO METAL, INC", "Zeta", ""], aliases) == [
+            "FERRO METAL, INC",
+            "Zeta",
+        ]
+
+
+class TestStoredAliases:
+    """Tests for saving and reading buyer_aliases."""
+
+    def test_run_saves_and_prunes_stale_aliases(self, fake_postgrest, buyers) -> None:
+        fake_postgrest.seed("mousa", buyers.dropna().to_dict("records"), key="buyer_name")
+        fake_postgrest.seed(
+            "buyer_aliases",
+            [
+                {
+                    "alias_name": "Gone Co",
+                    "canonical_name": "Zeta Trading",
+                    "method": "fuzzy",
+                    "resolved_at": "2020-01-01T00:00:00+00:00",
+                },
+                {
+                    "alias_name": "Zeta Trdg",
+                    "canonical_name": "Zeta Trading",
+                    "method": "manual",
+                    "resolved_at": "2020-01-01T00:00:00+00:00",
+                },
+            ],
+            key="alias_name",
+        )
+
+        result = entity_resolution.run_entity_resolution()
+
+        assert result["status"] == "success"
+        assert result["save"] == {"status": "success", "saved": 3, "pruned": 1, "manual": 0}
+        aliases = database.fetch_aliases()
+        assert aliases["Fero Metal LLC"] == "FERRO METAL, INC"
+        assert aliases["Zeta Trdg"] == "Zeta Trading"
+        assert "Gone Co" not in aliases
+
+    def test_manual_alias_survives_a_rerun(self, fake_postgrest, buyers) -> None:
+        fake_postgrest.seed("mousa", buyers.dropna().to_dict("records"), key="buyer_name")
+        fake_postgrest.seed(
+            "buyer_aliases",
+            [
+                {
+                    "alias_name": "Fero Metal LLC",
+                    "canonical_name": "Zeta Trading",
+                    "method": "manual",
+                    "resolved_at": "2020-01-01T00:00:00+00:00",
+                }
+            ],
+            key="alias_name",
+        )
+
+        first = entity_resolution.run_entity_resolution()
+        again = entity_resolution.run_entity_resolution()
+
+        assert first["save"]["manual"] == again["save"]["manual"] == 1
+        stored = {r["alias_name"]: r for r in fake_postgrest.rows("buyer_aliases")}
+        assert stored["Fero Metal LLC"]["canonical_name"] == "Zeta Trading"
+        assert stored["Fero Metal LLC"]["method"] == "manual"
+
+    def test_dry_run_writes_nothing(self, fake_postgrest, buyers) -> None:
+        fake_postgrest.seed("mousa", buyers.dropna().to_dict("records"), key="buyer_name")
+        fake_postgrest.seed("buyer_aliases", [], key="alias_name")
+
+        result = entity_resolution.run_entity_resolution(dry_run=True)
+
+        assert len(result["aliases"]) == 3
+        assert fake_postgrest.rows("buyer_aliases") == []
+
+    def test_missing_table(self, fake_postgrest) -> None:
+        assert database.fetch_aliases() is None
+        assert (
+            database.save_aliases([{"alias_name": "A", "canonical_name": "B"}])["status"] == "error"
+        )
@@ -0,0 +1,78 @@
+"""Tests for services.export module."""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from services.buyer_frame import build_buyer_frame
+from services.export import export_bytes, export_file_name, export_mime
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    rows = [
+        {
+            "buyer_name": f"Buyer {i:02d}",
+            "destination_country": ["USA", "JAPAN"][i % 2],
+            "total_usd": float(i),
+            "email": f"b{i}@x.com" if i % 3 == 0 else None,
+            "updated_at": "2024-01-01T00:00:00+00:00",
+        }
+        for i in range(25)
+    ]
+    return build_buyer_frame(rows).frame
+
+
+class TestExportBytes:
+    """Tests for chunked serialization per format."""
+
+    def test_ndjson(self, frame) -> None:
+        lines = export_bytes(frame, "ndjson", chunk_rows=10).decode().splitlines()
+
+        assert len(lines) == 25
+        first = json.loads(lines[0])
+        assert first["buyer_name"] == "Buyer 00"
+        assert first["email"] == "b0@x.com"
+        assert json.loads(lines[1])["email"] is None
+
+    def test_csv_has_one_header(self, frame) -> None:
+        data = export_bytes(frame, "csv", chunk_rows=10)
+
+        parsed = pd.read_csv(io.BytesIO(data))
+        assert len(parsed) == 25
+        assert parsed["buyer_name"].tolist() == frame["buyer_name"].tolist()
+
+    def test_parquet_row_groups(self, frame) -> None:
+        pq = pytest.importorskip("pyarrow.parquet")
+
+        data = export_bytes(frame, "parquet", chunk_rows=10)
+
+        parquet = pq.ParquetFile(io.BytesIO(data))
+        assert parquet.metadata.num_rows == 25
+        assert parquet.metadata.num_row_groups == 3
+
+    def test_gzip(self, frame) -> None:
+        plain = export_bytes(frame, "ndjson")
+        assert gzip.decompress(export_bytes(frame, "ndjson", compress=True)) == plain
+
+    def test_empty_csv_keeps_header(self, frame) -> None:
+        assert export_bytes(frame.iloc[0:0], "csv").decode().startswith("buyer_name,")
+
+    def test_unknown_format(self, frame) -> None:
+        with pytest.raises(ValueError):
+            export_bytes(frame, "xml")
+
+
+class TestExportNames:
+    """Tests for file names and MIME types."""
+
+    def test_names(self) -> None:
+        assert export_file_name("mousa_export", "csv") == "mousa_export.csv"
+        assert export_file_name("mousa_export", "ndjson", compress=True) == "mousa_export.ndjson.gz"
+        assert export_mime("parquet") == "application/vnd.apache.parquet"
+        assert export_mime("csv", compress=True) == "application/gzip"
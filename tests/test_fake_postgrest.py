@@ -0,0 +1,164 @@
+"""End-to-end tests of services.database against the in-process PostgREST fake.
+
+These run the real supabase-py clients; only the network is replaced.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from services import database, database_async
+from services.buyer_sync import BuyerSync
+
+
+def _rows(count: int) -> list[dict]:
+    return [
+        {
+            "buyer_name": f"Buyer {i:04d}",
+            "destination_country": ["USA", "GERMANY", "JAPAN"][i % 3],
+            "total_usd": float(i),
+            "email": f"sales@buyer{i}.com" if i % 2 else None,
+        }
+        for i in range(count)
+    ]
+
+
+class TestFakeReads:
+    """Keyset pagination, profiles and pushed-down filters over HTTP."""
+
+    def test_iter_buyers_pages_with_keyset(self, fake_postgrest):
+        fake_postgrest.seed("mousa", _rows(25))
+
+        names = [r["buyer_name"] for r in database.iter_buyers(page_size=10, prefetch=True)]
+
+        assert names == sorted(f"Buyer {i:04d}" for i in range(25))
+        gets = [r for r in fake_postgrest.requests if r.method == "GET"]
+        assert len(gets) == 3
+        assert gets[1].url.params["buyer_name"] == "gt.Buyer 0009"
+
+    def test_profile_projects_columns(self, fake_postgrest):
+        rows = database.fetch_all_buyers(profile="dashboard")
+
+        assert len(rows) == 3
+        assert set(rows[0]) == {"buyer_name", "total_usd", "country_english", "updated_at"}
+
+    def test_query_buyers_filters_and_counts(self, fake_postgrest):
+        fake_postgrest.seed("mousa", _rows(30))
+
+        result = database.query_buyers(countries=["USA", "JAPAN"], name_pattern="buyer 00", limit=5)
+
+        assert result["count"] == 20
+        assert len(result["rows"]) == 5
+        assert all(r["destination_country"] in ("USA", "JAPAN") for r in result["rows"])
+        assert result["next_after"] == result["rows"][-1]["buyer_name"]
+
+    def test_query_buyers_escapes_like_metacharacters(self, fake_postgrest):
+        fake_postgrest.seed("mousa", [{"buyer_name": "100% Cotton"}, {"buyer_name": "1000 Cotton"}])
+
+        result = database.query_buyers(name_pattern="100%")
+
+        assert [r["buyer_name"] for r in result["rows"]] == ["100% Cotton"]
+
+    def test_summary_view_and_breakdown_rpc(self, fake_postgrest):
+        fake_postgrest.register_view(
+            "mousa_summary",
+            lambda fake: [{"total_companies": len(fake.tables["mousa"])}],
+        )
+        fake_postgrest.register_rpc(
+            "mousa_country_breakdown",
+            lambda fake, params: [
+                {"country": params["country_column"], "companies": params["max_rows"]}
+            ],
+        )
+
+        assert database.fetch_buyer_summary() == {"total_companies": 3}
+        assert database.fetch_country_breakdown("country_english", limit=5) == [
+            {"country": "country_english", "companies": 5}
+        ]
+
+
+class TestFakeWrites:
+    """Upserts, retries, deletes and the updated_at watermark."""
+
+    def test_bulk_upsert_merges_and_retries_transient_errors(self, fake_postgrest):
+        fake_postgrest.fail_next(1, status=503)
+        records = [
+            {"buyer_name": "Beta Industries", "total_usd": 1.0},
+            {"buyer_name": "New Co", "total_usd": 2.0},
+        ]
+
+        result = database.bulk_upsert_buyers(records, chunk_size=10)
+
+        assert result["status"] == "success"
+        assert result["chunks"][0]["attempts"] == 2
+        stored = {r["buyer_name"]: r for r in fake_postgrest.rows()}
+        assert stored["Beta Industries"]["total_usd"] == 1.0
+        assert stored["Beta Industries"]["destination_country"] == "GERMANY"  # merged, not replaced
+        assert stored["New Co"]["updated_at"]
+
+    def test_bulk_upsert_reports_permanent_failure(self, fake_postgrest):
+        fake_postgrest.fail_next(1, status=400)
+
+        result = database.bulk_upsert_buyers([{"buyer_name": "New Co"}])
+
+        assert result["status"] == "error"
+        assert result["failed_names"] == ["New Co"]
+        assert "New Co" not in {r["buyer_name"] for r in fake_postgrest.rows()}
+
+    def test_delete_buyers(self, fake_postgrest):
+        result = database.delete_buyers(["Gamma Trading", "Missing Co"])
+
+        assert result == {"status": "success", "deleted": 1}
+        assert {r["buyer_name"] for r in fake_postgrest.rows()} == {
+            "Test Corp Alpha",
+            "Beta Industries",
+        }
+
+    def test_save_scavenged_data_round_trip(self, fake_postgrest):
+        result = database.save_scavenged_data(
+            "Gamma Trading ", {"emails": ["a@gamma.jp", "broken"], "phones": ["+81312345678"]}
+        )
+
+        assert result["status"] == "success"
+        row = next(r for r in fake_postgrest.rows() if r["buyer_name"] == "Gamma Trading")
+        assert row["email"] == "a@gamma.jp"
+        assert row["total_usd"] == 75000.0
+
+    def test_delta_sync_picks_up_remote_writes(self, fake_postgrest, monkeypatch):
+        monkeypatch.setattr("services.buyer_sync.SYNC_OVERLAP_SECONDS", 0)
+        fake_postgrest.seed(
+            "mousa", [{**r, "updated_at": "2024-01-01T00:00:00+00:00"} for r in _rows(50)]
+        )
+        sync = BuyerSync(profile="table")
+        assert len(sync.refresh(max_age=0)) == 50
+
+        database.bulk_upsert_buyers([{"buyer_name": "Buyer 0007", "total_usd": 7e6}])
+        sync.mark_stale()
+        frame = sync.refresh(max_age=0)
+
+        assert sync.last_delta_rows == 1
+        assert frame.loc[frame["buyer_name"] == "Buyer 0007", "total_usd"].item() == 7e6
+
+
+class TestFakeAsync:
+    """The async client goes through the same fake transport."""
+
+    def test_async_fetch_and_upsert(self, fake_postgrest):
+        fake_postgrest.seed("mousa", _rows(12))
+
+        async def run():
+            try:
+                rows = await database_async.fetch_all_buyers(profile="table", page_size=5)
+                report = await database_async.bulk_upsert_buyers(
+                    [{"buyer_name": f"Async {i}"} for i in range(7)], chunk_size=3
+                )
+                return rows, report
+            finally:
+                await database_async.close_supabase()
+
+        rows, report = asyncio.run(run())
+
+        assert len(rows) == 12
+        assert report["status"] == "success"
+        assert report["upserted"] == 7
+        assert len(fake_postgrest.rows()) == 19
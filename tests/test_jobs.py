@@ -0,0 +1,133 @@
+"""Tests for services.jobs module."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from services.jobs import JobRunner, JobStore
+
+
+@pytest.fixture
+def store(tmp_path) -> JobStore:
+    return JobStore(str(tmp_path / "jobs.sqlite"))
+
+
+async def echo(params, progress):
+    progress("step 1")
+    await asyncio.sleep(0)
+    progress("step 2")
+    return {"status": "success", "echo": params["value"]}
+
+
+async def broken(params, progress):
+    progress("about to fail")
+    raise RuntimeError("boom")
+
+
+class TestJobStore:
+    """Tests for persisted jobs and events."""
+
+    def test_create_update_and_events(self, store) -> None:
+        job = store.create("scavenge", "Acme", {"company_name": "Acme"})
+        store.add_event(job["id"], "first")
+        store.add_event(job["id"], "second")
+        store.update(job["id"], status="success", result={"status": "success", "n": 1})
+
+        stored = store.get(job["id"])
+        assert stored["status"] == "success"
+        assert stored["params"] == {"company_name": "Acme"}
+        assert stored["result"] == {"status": "success", "n": 1}
+        assert [e["message"] for e in store.events(job["id"])] == ["first", "second"]
+        assert [e["seq"] for e in store.events(job["id"], after=1)] == [2]
+
+    def test_active_and_listing(self, store) -> None:
+        first = store.create("scavenge", "Acme", {})
+        store.update(first["id"], status="error")
+        second = store.create("scavenge", "Acme", {})
+
+        assert store.active("scavenge", "Acme")["id"] == second["id"]
+        assert store.active("scavenge", "Beta") is None
+        assert [j["id"] for j in store.jobs(statuses=["error"])] == [first["id"]]
+
+    def test_recover_fails_running_and_returns_queued(self, store) -> None:
+        running = store.create("scavenge", "Acme", {})
+        store.update(running["id"], status="running")
+        queued = store.create("scavenge", "Beta", {})
+
+        assert [j["id"] for j in store.recover()] == [queued["id"]]
+        assert store.get(running["id"])["status"] == "error"
+        assert store.get(running["id"])["message"] == "Interrupted by a restart"
+
+
+class TestJobRunner:
+    """Tests for running jobs in the background."""
+
+    def test_runs_job_and_records_progress(self, store) -> None:
+        finished = []
+        runner = JobRunner(store, {"echo": echo}, max_workers=2, on_finish=finished.append)
+
+        job = runner.wait(runner.submit("echo", {"value": 7}), timeout=5)
+
+        assert job["status"] == "success"
+        assert job["result"]["echo"] == 7
+        assert job["started_at"] and job["finished_at"]
+        assert [e["message"] for e in store.events(job["id"])] == ["step 1", "step 2"]
+        assert [j["id"] for j in finished] == [job["id"]]
+        runner.close(wait=True)
+
+    def test_handler_exception_marks_error(self, store) -> None:
+        runner = JobRunner(store, {"broken": broken})
+
+        job = runner.wait(runner.submit("broken", {}), timeout=5)
+
+        assert job["status"] == "error"
+        assert job["message"] == "boom"
+        assert [e["message"] for e in store.events(job["id"])] == ["about to fail"]
+        runner.close(wait=True)
+
+    def test_error_status_result_marks_error(self, store) -> None:
+        async def not_found(params, progress):
+            return {"status": "error", "message": "AI search returned no results"}
+
+        runner = JobRunner(store, {"scavenge": not_found})
+
+        job = runner.wait(runner.submit("scavenge", {}), timeout=5)
+
+        assert job["status"] == "error"
+        assert job["message"] == "AI search returned no results"
+        runner.close(wait=True)
+
+    def test_same_key_reuses_job_in_flight(self, store) -> None:
+        release = threading.Event()
+
+        async def slow(params, progress):
+            await asyncio.to_thread(release.wait, 5)
+            return {"status": "success"}
+
+        runner = JobRunner(store, {"slow": slow}, max_workers=2)
+        first = runner.submit("slow", {}, key="Acme")
+        again = runner.submit("slow", {}, key="Acme")
+        other = runner.submit("slow", {}, key="Beta")
+        release.set()
+
+        assert first == again != other
+        assert runner.wait(first, timeout=5)["status"] == "success"
+        assert runner.wait(other, timeout=5)["status"] == "success"
+        runner.close(wait=True)
+
+    def test_queued_jobs_resume_after_restart(self, store) -> None:
+        queued = store.create("echo", None, {"value": 3})
+
+        runner = JobRunner(store, {"echo": echo})
+
+        assert runner.wait(queued["id"], timeout=5)["result"]["echo"] == 3
+        runner.close(wait=True)
+
+    def test_unknown_kind_raises(self, store) -> None:
+        runner = JobRunner(store, {"echo": echo})
+        with pytest.raises(ValueError):
+            runner.submit("nope", {})
+        runner.close()
@@ -0,0 +1,169 @@
+"""Tests for services.name_index module."""
+
+from __future__ import annotations
+
+import threading
+
+import pandas as pd
+import pytest
+
+from services import name_index
+from services.buyer_frame import build_buyer_frame
+from services.name_index import TrigramIndex, normalize_name
+
+
+@pytest.fixture
+def index() -> TrigramIndex:
+    return TrigramIndex(
+        ["ferro", "fero", "acme", "muller"],
+        [
+            ["Ferro Metal Inc.", None],
+            ["FERO METAL INC", "Fero Metal"],
+            ["Acme Trading Co", "ACME"],
+            ["Müller GmbH", None],
+        ],
+    )
+
+
+class TestNormalizeName:
+    """Tests for name normalization."""
+
+    def test_punctuation_and_case(self) -> None:
+        assert normalize_name("  FERRO-METAL, Inc. ") == "ferro metal inc"
+
+    def test_keeps_non_ascii_letters(self) -> None:
+        assert normalize_name("Müller GmbH & Co.") == "müller gmbh co"
+
+
+class TestTrigramIndex:
+    """Tests for ranked fuzzy search."""
+
+    def test_exact_name_ranks_first(self, index) -> None:
+        results = index.search("fero metal inc")
+        assert results[0] == ("fero", 1.0)
+        assert [key for key, _ in results] == ["fero", "ferro"]
+
+    def test_misspelling_matches(self, index) -> None:
+        assert index.search("ferro metal")[0][0] == "ferro"
+        assert "fero" in [key for key, _ in index.search("ferro metal")]
+
+    def test_second_name_column(self, index) -> None:
+        assert index.search("acme")[0][0] == "acme"
+
+    def test_one_result_per_row(self, index) -> None:
+        keys = [key for key, _ in index.search("fero metal")]
+        assert len(keys) == len(set(keys))
+
+    def test_no_match(self, index) -> None:
+        assert index.search("zzzz qqqq") == []
+        assert index.search("  ") == []
+
+    def test_limit(self, index) -> None:
+        assert len(index.search("metal", limit=1)) == 1
+
+    def test_empty_index(self) -> None:
+        assert TrigramIndex().search("ferro") == []
+
+    def test_remove_and_add(self, index) -> None:
+        removed = index.remove(["ferro"])
+        assert "ferro" not in [key for key, _ in removed.search("ferro metal")]
+
+        added = removed.add(["ferrum"], [["Ferro Metals Ltd"]])
+        assert "ferrum" in [key for key, _ in added.search("ferro metal")]
+        assert added.delta_docs == 1
+        assert len(added) == 4
+
+    def test_patches_leave_the_original_untouched(self, index) -> None:
+        before = index.search("ferro metal")
+
+        index.remove(["ferro"]).add(["ferrum"], [["Ferro Metals Ltd"]])
+
+        assert index.search("ferro metal") == before
+        assert index.delta_docs == 0
+
+    def test_from_frame(self) -> None:
+        frame = build_buyer_frame(
+            [
+                {"buyer_name": "Alpha Steel", "company_name_english": "Alpha Iron Works"},
+                {"buyer_name": "Beta Foods", "company_name_english": None},
+            ]
+        ).frame
+        index = TrigramIndex.from_frame(frame)
+
+        assert index.search("alpha iron")[0][0] == "Alpha Steel"
+        assert index.search("beta food")[0][0] == "Beta Foods"
+
+
+class TestRefresh:
+    """Tests for patching the process-wide index between snapshots."""
+
+    @pytest.fixture(autouse=True)
+    def fresh(self, monkeypatch) -> None:
+        monkeypatch.setattr(name_index, "_index", None)
+        monkeypatch.setattr(name_index, "_indexed", None)
+        monkeypatch.setattr(name_index, "REBUILD_FRACTION", 10.0)
+
+    def test_same_frame_is_not_rebuilt(self) -> None:
+        frame = pd.DataFrame({"buyer_name": ["Alpha Steel"]})
+        assert name_index.refresh(frame) is name_index.refresh(frame)
+
+    def test_changes_are_patched(self) -> None:
+        first = name_index.refresh(
+            pd.DataFrame(
+                {
+                    "buyer_name": ["Alpha Steel", "Beta Foods"],
+                    "company_name_english": [None, "Beta Food Co"],
+                }
+            )
+        )
+
+        second = name_index.refresh(
+            pd.DataFrame(
+                {
+                    "buyer_name": ["Alpha Steel", "Gamma Textiles"],
+                    "company_name_english": ["Alpha Iron Works", None],
+                }
+            )
+        )
+
+        assert second.delta_docs > 0
+        assert first.search("beta food")[0][0] == "Beta Foods"
+        assert second.search("alpha iron")[0][0] == "Alpha Steel"
+        assert second.search("gamma textile")[0][0] == "Gamma Textiles"
+        assert second.search("beta food") == []
+
+    def test_large_delta_rebuilds(self, monkeypatch) -> None:
+        monkeypatch.setattr(name_index, "REBUILD_FRACTION", 0.0)
+        first = name_index.refresh(pd.DataFrame({"buyer_name": ["Alpha Steel"]}))
+        second = name_index.refresh(pd.DataFrame({"buyer_name": ["Alpha Steel", "Beta Foods"]}))
+
+        assert second is not first
+        assert second.delta_docs == 0
+
+    def test_searches_during_refresh_see_a_consistent_snapshot(self) -> None:
+        frames = [
+            pd.DataFrame({"buyer_name": [f"Company {i} Steel" for i in range(n)]})
+            for n in (200, 260)
+        ]
+        name_index.refresh(frames[0])
+        errors, stop = [], threading.Event()
+
+        def search() -> None:
+            while not stop.is_set():
+                try:
+                    for key, _ in name_index._index.search("company 5 steel", limit=50):
+                        assert key.startswith("Company ")
+                except Exception as e:  # pragma: no cover - reported below
+                    errors.append(e)
+                    return
+
+        threads = [threading.Thread(target=search) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for i in range(200):
+            name_index.refresh(frames[(i + 1) % 2].copy())
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
@@ -0,0 +1,73 @@
+"""Tests for services.replica module."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from services import replica
+
+
+@pytest.fixture(autouse=True)
+def replica_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(replica, "REPLICA_DIR", str(tmp_path))
+    return tmp_path
+
+
+class TestReplica:
+    """Tests for the on-disk SQLite replica."""
+
+    def test_missing_replica_returns_none(self) -> None:
+        assert replica.load_replica("table") is None
+
+    def test_round_trip(self) -> None:
+        frame = pd.DataFrame(
+            {
+                "buyer_name": ["Alpha", "Beta"],
+                "total_usd": [1.5, 2.5],
+                "exporters": [{"Exporter A": 5}, None],
+            }
+        )
+        assert replica.save_replica("full", frame, "2024-01-02T00:00:00+00:00", 1700000000.0)
+
+        snapshot = replica.load_replica("full")
+
+        assert snapshot["watermark"] == "2024-01-02T00:00:00+00:00"
+        assert snapshot["synced_at"] == 1700000000.0
+        assert snapshot["row_count"] == 2
+        assert snapshot["frame"]["exporters"][0] == {"Exporter A": 5}
+        assert snapshot["frame"]["total_usd"].tolist() == [1.5, 2.5]
+
+    def test_profiles_are_stored_separately(self) -> None:
+        replica.save_replica("table", pd.DataFrame({"buyer_name": ["A"]}), None, 1.0)
+        replica.save_replica("email", pd.DataFrame({"buyer_name": ["B", "C"]}), None, 2.0)
+
+        assert len(replica.load_replica("table")["frame"]) == 1
+        assert len(replica.load_replica("email")["frame"]) == 2
+        assert replica.load_replica("dashboard") is None
+
+    def test_invalid_profile_name_is_rejected(self) -> None:
+        assert not replica.save_replica("x; DROP TABLE", pd.DataFrame({"a": [1]}), None, 1.0)
+
+    def test_delta_rewrites_only_changed_rows(self) -> None:
+        frame = pd.DataFrame(
+            {"buyer_name": ["Alpha", "Beta", "Gamma"], "email": [None, "b@beta.de", None]}
+        )
+        replica.save_replica("table", frame, None, 1.0)
+
+        changed = pd.DataFrame({"buyer_name": ["Alpha", "Delta"], "email": ["a@alpha.com", None]})
+        current = pd.concat([frame[frame["buyer_name"] == "Beta"], changed], ignore_index=True)
+        assert replica.save_replica("table", current, None, 2.0, changed=changed, removed={"Gamma"})
+
+        stored = replica.load_replica("table")["frame"].set_index("buyer_name")
+        assert sorted(stored.index) == ["Alpha", "Beta", "Delta"]
+        assert stored.loc["Alpha", "email"] == "a@alpha.com"
+        assert stored.loc["Beta", "email"] == "b@beta.de"
+
+    def test_delta_with_new_columns_rewrites_the_table(self) -> None:
+        replica.save_replica("table", pd.DataFrame({"buyer_name": ["Alpha"]}), None, 1.0)
+
+        frame = pd.DataFrame({"buyer_name": ["Alpha"], "exporters": [{"Exporter A": 5}]})
+        assert replica.save_replica("table", frame, None, 2.0, changed=frame)
+
+        assert replica.load_replica("table")["frame"]["exporters"][0] == {"Exporter A": 5}
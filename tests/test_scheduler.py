@@ -0,0 +1,168 @@
+"""Tests for services.scheduler module."""
+
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services import scheduler as scheduler_module
+from services.buyer_frame import build_buyer_frame
+from services.enrichment import EnrichmentLedger
+from services.rate_limits import ServiceLimits
+from services.scheduler import BackoffStore, EnrichmentScheduler, backoff_delay, rank_candidates
+
+# The scheduler itself ranks against the current time
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+@pytest.fixture
+def frame():
+    return build_buyer_frame(
+        [
+            {"buyer_name": "Big", "total_usd": 1e6, "email": None},
+            {
+                "buyer_name": "Recent",
+                "total_usd": 1e7,
+                "email": None,
+                "last_scavenged_at": (NOW - timedelta(days=12)).isoformat(),
+            },
+            {
+                "buyer_name": "Has Email",
+                "total_usd": 1e6,
+                "email": "a@b.com",
+                "last_scavenged_at": (NOW - timedelta(days=200)).isoformat(),
+            },
+            {"buyer_name": "Small", "total_usd": 10, "email": None},
+            {
+                "buyer_name": "Complete",
+                "total_usd": 1e8,
+                "email": "c@d.com",
+                "phone": "+15550100222",
+                "website": "d.com",
+            },
+            {"buyer_name": "Big Co", "total_usd": 1e6, "email": None},
+        ]
+    ).frame
+
+
+@pytest.fixture
+def backoff(tmp_path) -> BackoffStore:
+    return BackoffStore(str(tmp_path / "enrichment.sqlite"))
+
+
+class TestRankCandidates:
+    """Tests for value / staleness ranking."""
+
+    def test_orders_by_value_need_and_staleness(self, frame) -> None:
+        ranked = rank_candidates(frame, now=NOW)
+
+        assert ranked["buyer_name"].tolist() == ["Big", "Big Co", "Has Email", "Small"]
+        assert ranked["priority"].is_monotonic_decreasing
+        assert ranked.loc[ranked["buyer_name"] == "Has Email", "need"].item() == pytest.approx(0.4)
+
+    def test_skip_window_and_aliases(self, frame) -> None:
+        ranked = rank_candidates(
+            frame, now=NOW, skip_window=timedelta(days=7), aliases={"Big Co": "Big"}
+        )
+
+        assert "Recent" in ranked["buyer_name"].tolist()
+        assert "Big Co" not in ranked["buyer_name"].tolist()
+
+    def test_backed_off_companies_wait_and_rank_lower(self, frame, backoff) -> None:
+        backoff.record("Big", "not_found", now=NOW - timedelta(days=2))  # retry after 1 day
+        backoff.record("Small", "not_found", now=NOW)  # still waiting
+
+        ranked = rank_candidates(frame, backoff=backoff.state(), now=NOW)
+
+        assert "Small" not in ranked["buyer_name"].tolist()
+        assert ranked["buyer_name"].tolist()[:2] == ["Big Co", "Big"]
+        assert ranked.loc[ranked["buyer_name"] == "Big", "misses"].item() == 1
+
+    def test_limit(self, frame) -> None:
+        assert len(rank_candidates(frame, now=NOW, limit=2)) == 2
+
+
+class TestBackoff:
+    """Tests for exponential back-off after "not found"."""
+
+    def test_delay_doubles_and_is_capped(self) -> None:
+        assert backoff_delay(0) == timedelta(0)
+        assert backoff_delay(1) == scheduler_module.BACKOFF_BASE
+        assert backoff_delay(3) == scheduler_module.BACKOFF_BASE * 4
+        assert backoff_delay(50) == scheduler_module.BACKOFF_MAX
+
+    def test_store_counts_misses(self, backoff) -> None:
+        backoff.record("Acme", "not_found", now=NOW)
+        backoff.record("Acme", "not_found", now=NOW)
+        backoff.record("Acme", "error", now=NOW)
+
+        state = backoff.state().set_index("buyer_name")
+        assert state.loc["Acme", "misses"] == 2
+        assert state.loc["Acme", "next_attempt"] == NOW + scheduler_module.ERROR_RETRY
+
+        backoff.record("Acme", "enriched", now=NOW)
+        state = backoff.state().set_index("buyer_name")
+        assert state.loc["Acme", "misses"] == 0
+        assert state.loc["Acme", "next_attempt"] == NOW + scheduler_module.SKIP_WINDOW
+
+
+class TestEnrichmentScheduler:
+    """Tests for the background enrichment loop."""
+
+    def make(self, frame, backoff, tmp_path, **kwargs) -> EnrichmentScheduler:
+        calls = []
+
+        async def find(name, country):
+            calls.append(name)
+            return {
+                "status": "success",
+                "emails": [] if name == "Big" else [f"info@{len(calls)}.com"],
+            }
+
+        async def save(name, found):
+            return {"status": "success"}
+
+        scheduler = EnrichmentScheduler(
+            load_frame=lambda: frame,
+            load_aliases=dict,
+            batch_size=2,
+            concurrency=1,
+            backoff=backoff,
+            ledger=EnrichmentLedger(str(tmp_path / "enrichment.sqlite")),
+            limits=ServiceLimits(),
+            find=find,
+            save=save,
+            **kwargs,
+        )
+        scheduler.calls = calls
+        return scheduler
+
+    def test_cycle_feeds_top_leads_in_order(self, frame, backoff, tmp_path) -> None:
+        scheduler = self.make(frame, backoff, tmp_path)
+
+        summary = scheduler.run_cycle()
+
+        assert scheduler.calls == ["Big", "Big Co"]
+        assert (summary["not_found"], summary["enriched"]) == (1, 1)
+        state = backoff.state().set_index("buyer_name")
+        assert state.loc["Big", "misses"] == 1
+
+        # Both are now waiting: the next cycle moves down the ranking
+        scheduler.run_cycle()
+        assert scheduler.calls[2:] == ["Has Email", "Small"]
+        assert scheduler.status()["cycles"] == 2
+
+    def test_background_loop_runs_until_stopped(self, frame, backoff, tmp_path) -> None:
+        cycled = threading.Event()
+        scheduler = self.make(
+            frame, backoff, tmp_path, interval=60, on_cycle=lambda summary: cycled.set()
+        )
+
+        scheduler.start()
+        assert cycled.wait(5)
+        scheduler.stop(timeout=5)
+
+        assert not scheduler.running
+        assert scheduler.status()["last_summary"]["companies"] == 2
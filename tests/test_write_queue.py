@@ -0,0 +1,97 @@
+"""Tests for services.write_queue module."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from services.write_queue import WriteBehindQueue
+
+
+class _Writer:
+    def __init__(self, fail: set | None = None) -> None:
+        self.batches: list[list[dict]] = []
+        self.fail = fail or set()
+        self.called = threading.Event()
+
+    def __call__(self, rows: list[dict]) -> dict:
+        self.batches.append(rows)
+        self.called.set()
+        failed = [r["buyer_name"] for r in rows if r["buyer_name"] in self.fail]
+        return {"status": "partial" if failed else "success", "failed_names": failed}
+
+
+@pytest.fixture
+def writer() -> _Writer:
+    return _Writer()
+
+
+class TestWriteBehindQueue:
+    """Tests for the coalescing write-behind queue."""
+
+    def test_same_key_updates_are_merged(self, writer) -> None:
+        queue = WriteBehindQueue(writer, flush_interval=60)
+        first = queue.submit({"buyer_name": "Alpha", "email": "a@alpha.com"})
+        second = queue.submit({"buyer_name": "Alpha", "last_contacted_at": "2024-01-01"})
+        queue.close()
+
+        assert writer.batches == [
+            [{"buyer_name": "Alpha", "email": "a@alpha.com", "last_contacted_at": "2024-01-01"}]
+        ]
+        assert first.result(1) == {"status": "success"}
+        assert second.result(1) == {"status": "success"}
+
+    def test_max_batch_triggers_flush(self, writer) -> None:
+        queue = WriteBehindQueue(writer, flush_interval=60, max_batch=3)
+        futures = [queue.submit({"buyer_name": f"B{i}"}) for i in range(3)]
+
+        assert all(f.result(5)["status"] == "success" for f in futures)
+        assert len(writer.batches[0]) == 3
+        queue.close()
+
+    def test_interval_flush(self, writer) -> None:
+        queue = WriteBehindQueue(writer, flush_interval=0.05)
+        future = queue.submit({"buyer_name": "Alpha"})
+
+        assert future.result(5) == {"status": "success"}
+        queue.close()
+
+    def test_failed_rows_resolve_with_error(self) -> None:
+        writer = _Writer(fail={"Beta"})
+        queue = WriteBehindQueue(writer, flush_interval=60)
+        ok = queue.submit({"buyer_name": "Alpha"})
+        bad = queue.submit({"buyer_name": "Beta"})
+        queue.flush()
+
+        assert ok.result(1)["status"] == "success"
+        assert bad.result(1)["status"] == "error"
+        queue.close()
+
+    def test_rows_without_key_are_rejected(self, writer) -> None:
+        queue = WriteBehindQueue(writer, flush_interval=60)
+        assert queue.submit({"email": "x@y.com"}).result(1)["status"] == "error"
+        queue.close()
+        assert writer.batches == []
+
+    def test_close_flushes_and_rejects_new_rows(self, writer) -> None:
+        queue = WriteBehindQueue(writer, flush_interval=60)
+        pending = queue.submit({"buyer_name": "Alpha"})
+        queue.close()
+
+        assert pending.result(1)["status"] == "success"
+        assert queue.submit({"buyer_name": "Beta"}).result(1)["status"] == "error"
+
+    def test_custom_merge(self, writer) -> None:
+        def merge(pending: dict, row: dict) -> None:
+            pending["tags"] = pending.get("tags", []) + row.pop("tags")
+            pending.update(row)
+
+        queue = WriteBehindQueue(writer, flush_interval=60, merge=merge)
+        queue.submit({"buyer_name": "Alpha", "tags": ["a"]})
+        queue.submit({"buyer_name": "Alpha", "tags": ["b"], "email": "x@alpha.com"})
+        queue.close()
+
+        assert writer.batches == [
+            [{"buyer_name": "Alpha", "tags": ["a", "b"], "email": "x@alpha.com"}]
+        ]